@@ -108,6 +108,9 @@ STATIC_ROOT_BASE = ENV_TOKENS.get('STATIC_ROOT_BASE', None)
 if STATIC_ROOT_BASE:
     STATIC_ROOT = path(STATIC_ROOT_BASE) / git.revision
 
+# MAKO_PRECOMPILED_ROOT is where the precompile_templates command puts the compiled templates
+MAKO_PRECOMPILED_ROOT = ENV_TOKENS.get('MAKO_PRECOMPILED_ROOT', MAKO_PRECOMPILED_ROOT)
+
 EMAIL_BACKEND = ENV_TOKENS.get('EMAIL_BACKEND', EMAIL_BACKEND)
 EMAIL_FILE_PATH = ENV_TOKENS.get('EMAIL_FILE_PATH', None)
 
@@ -260,6 +263,9 @@ BROKER_URL = "{0}://{1}:{2}@{3}/{4}".format(CELERY_BROKER_TRANSPORT,
 TRACKING_BACKENDS.update(AUTH_TOKENS.get("TRACKING_BACKENDS", {}))
 EVENT_TRACKING_BACKENDS.update(AUTH_TOKENS.get("EVENT_TRACKING_BACKENDS", {}))
 
+# Query budgets
+QUERY_BUDGETS = ENV_TOKENS.get('QUERY_BUDGETS', QUERY_BUDGETS)
+
 SUBDOMAIN_BRANDING = ENV_TOKENS.get('SUBDOMAIN_BRANDING', {})
 VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 
@@ -104,6 +104,10 @@ FEATURES = {
     # Turn off Advanced Security by default
     'ADVANCED_SECURITY': False,
 
+    # Count the SQL queries, Mongo operations and memcached calls of each request
+    # and celery task, and log those that go over their QUERY_BUDGETS
+    'ENABLE_QUERY_BUDGETS': False,
+
     # Toggles Group Configuration editing functionality
     'ENABLE_GROUP_CONFIGURATIONS': os.environ.get('FEATURE_GROUP_CONFIGURATIONS'),
 }
@@ -132,6 +136,9 @@ GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 # This is where we stick our compiled template files.
 from tempdir import mkdtemp_clean
 MAKO_MODULE_DIR = mkdtemp_clean('mako')
+# Where the precompile_templates command puts the compiled templates, so that they
+# don't have to be compiled again by each new worker. Unused when None.
+MAKO_PRECOMPILED_ROOT = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [
     PROJECT_ROOT / 'templates',
@@ -205,6 +212,8 @@ TEMPLATE_LOADERS = (
 
 MIDDLEWARE_CLASSES = (
     'request_cache.middleware.RequestCache',
+    # Goes near the top, to count the queries made by the other middleware too
+    'monitoring.middleware.QueryBudgetMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -639,6 +648,13 @@ for app_name in OPTIONAL_APPS:
 # Empty by default
 ADVANCED_SECURITY_CONFIG = {}
 
+### QUERY_BUDGETS
+# Maximum number of SQL queries, Mongo operations and memcached calls per
+# request or celery task, keyed by view or task name, such as
+# {'courseware.views.progress': {'sql': 50, 'mongo': 100, 'memcache': 200}}.
+# Only checked when FEATURES['ENABLE_QUERY_BUDGETS'] is set.
+QUERY_BUDGETS = {}
+
 ### External auth usage -- prefixes for ENROLLMENT_DOMAIN
 SHIBBOLETH_DOMAIN_PREFIX = 'shib:'
 OPENID_DOMAIN_PREFIX = 'openid:'
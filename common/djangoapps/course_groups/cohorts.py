@@ -3,16 +3,27 @@ This file contains the logic for cohort groups, as exposed internally to the
 forums, and to the cohort admin views.
 """
 
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.http import Http404
 import logging
 import random
 
 from courseware import courses
+from request_cache.middleware import RequestCache
 from student.models import get_user_by_username_or_email
 from .models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# The courses and cohort memberships looked up in the current request are
+# cached in these dicts of the request cache.
+COURSE_CACHE_KEY = 'course_groups.cohorts.courses'
+MEMBERSHIP_CACHE_KEY = 'course_groups.cohorts.memberships'
+
+# The cohorts of this many users are looked up per query
+COHORT_ID_CHUNK_SIZE = 500
+
 
 # tl;dr: global state is bad.  capa reseeds random every time a problem is loaded.  Even
 # if and when that's fixed, it's a good idea to have a local generator to avoid any other
@@ -33,6 +44,42 @@ def local_random():
     return _local_random
 
 
+def _get_request_cache(name):
+    """
+    Return the dict `name` of the request cache, creating it if needed.
+
+    Outside of requests (in celery tasks or management commands), the request
+    cache is never cleared, and changes made by other processes would never be
+    seen. An empty dict which isn't kept is returned instead, so nothing is cached.
+    """
+    if not RequestCache.in_request():
+        return {}
+    return RequestCache.get_request_cache().data.setdefault(name, {})
+
+
+def _get_course(course_key):
+    """
+    Return the course `course_key`, whose cohort configuration is read once per
+    request.
+
+    Raises:
+       Http404 if the course doesn't exist.
+    """
+    cached_courses = _get_request_cache(COURSE_CACHE_KEY)
+    if course_key not in cached_courses:
+        cached_courses[course_key] = courses.get_course_by_id(course_key)
+    return cached_courses[course_key]
+
+
+@receiver(m2m_changed, sender=CourseUserGroup.users.through)
+def _clear_cached_memberships(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Users were added to or removed from a group: forget the cohort memberships
+    cached in this request.
+    """
+    _get_request_cache(MEMBERSHIP_CACHE_KEY).clear()
+
+
 def is_course_cohorted(course_key):
     """
     Given a course key, return a boolean for whether or not the course is
@@ -41,7 +88,7 @@ def is_course_cohorted(course_key):
     Raises:
        Http404 if the course doesn't exist.
     """
-    return courses.get_course_by_id(course_key).is_cohorted
+    return _get_course(course_key).is_cohorted
 
 
 def get_cohort_id(user, course_key):
@@ -65,7 +112,7 @@ def is_commentable_cohorted(course_key, commentable_id):
     Raises:
         Http404 if the course doesn't exist.
     """
-    course = courses.get_course_by_id(course_key)
+    course = _get_course(course_key)
 
     if not course.is_cohorted:
         # this is the easy case :)
@@ -89,7 +136,7 @@ def get_cohorted_commentables(course_key):
     Given a course_key return a list of strings representing cohorted commentables
     """
 
-    course = courses.get_course_by_id(course_key)
+    course = _get_course(course_key)
 
     if not course.is_cohorted:
         # this is the easy case :)
@@ -119,20 +166,30 @@ def get_cohort(user, course_key):
     # First check whether the course is cohorted (users shouldn't be in a cohort
     # in non-cohorted courses, but settings can change after course starts)
     try:
-        course = courses.get_course_by_id(course_key)
+        course = _get_course(course_key)
     except Http404:
         raise ValueError("Invalid course_key")
 
     if not course.is_cohorted:
         return None
 
-    try:
-        return CourseUserGroup.objects.get(course_id=course_key,
-                                            group_type=CourseUserGroup.COHORT,
-                                            users__id=user.id)
-    except CourseUserGroup.DoesNotExist:
-        # Didn't find the group.  We'll go on to create one if needed.
-        pass
+    memberships = _get_request_cache(MEMBERSHIP_CACHE_KEY)
+    membership_key = (course_key, user.id)
+    cohort = memberships.get(membership_key)
+    if cohort is not None:
+        return cohort
+
+    if membership_key not in memberships:
+        try:
+            cohort = CourseUserGroup.objects.get(course_id=course_key,
+                                                 group_type=CourseUserGroup.COHORT,
+                                                 users__id=user.id)
+        except CourseUserGroup.DoesNotExist:
+            # Didn't find the group.  We'll go on to create one if needed.
+            pass
+        memberships[membership_key] = cohort
+        if cohort is not None:
+            return cohort
 
     if not course.auto_cohort:
         return None
@@ -156,9 +213,43 @@ def get_cohort(user, course_key):
     )
 
     user.course_groups.add(group)
+    memberships[membership_key] = group
     return group
 
 
+def get_cohort_ids(users, course_key):
+    """
+    Return a dict mapping the id of each of `users` to the id of their cohort in
+    the course `course_key`, or None if they don't have one (or the course isn't
+    cohorted), in one query per COHORT_ID_CHUNK_SIZE users.
+
+    Unlike get_cohort, this doesn't put users in auto cohorts.
+
+    Raises:
+       ValueError if the CourseKey doesn't exist.
+    """
+    user_ids = [user.id for user in users]
+    cohort_ids = dict.fromkeys(user_ids)
+    try:
+        course = _get_course(course_key)
+    except Http404:
+        raise ValueError("Invalid course_key")
+
+    if not course.is_cohorted:
+        return cohort_ids
+
+    memberships = CourseUserGroup.users.through.objects.filter(
+        courseusergroup__course_id=course_key,
+        courseusergroup__group_type=CourseUserGroup.COHORT,
+    )
+    for start in range(0, len(user_ids), COHORT_ID_CHUNK_SIZE):
+        user_ids_chunk = user_ids[start:start + COHORT_ID_CHUNK_SIZE]
+        cohort_ids.update(
+            memberships.filter(user_id__in=user_ids_chunk).values_list('user_id', 'courseusergroup_id')
+        )
+    return cohort_ids
+
+
 def get_course_cohorts(course_key):
     """
     Get a list of all the cohorts in the given course.
@@ -5,8 +5,10 @@ from django.conf import settings
 from django.test.utils import override_settings
 
 from course_groups.models import CourseUserGroup
-from course_groups.cohorts import (get_cohort, get_course_cohorts,
-                                   is_commentable_cohorted, get_cohort_by_name)
+from course_groups.cohorts import (get_cohort, get_cohort_ids, get_course_cohorts,
+                                   is_commentable_cohorted, get_cohort_by_name,
+                                   add_user_to_cohort)
+from request_cache.middleware import RequestCache
 
 from xmodule.modulestore.django import modulestore, clear_existing_modulestores
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -85,6 +87,7 @@ class TestCohorts(django.test.TestCase):
         Make sure that course is reloaded every time--clear out the modulestore.
         """
         clear_existing_modulestores()
+        RequestCache().clear_request_cache()
         self.toy_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
 
     def test_get_cohort(self):
@@ -254,3 +257,82 @@ class TestCohorts(django.test.TestCase):
         self.assertTrue(
             is_commentable_cohorted(course.id, to_id("Feedback")),
             "Feedback was listed as cohorted.  Should be.")
+
+    def test_cached_memberships(self):
+        """
+        Make sure get_cohort() only queries once per user in a request, and notices changes.
+        """
+        request_cache = RequestCache()
+        request_cache.process_request(None)
+        self.addCleanup(request_cache.process_response, None, None)
+        course = modulestore().get_course(self.toy_course_key)
+        self.config_course_cohorts(course, [], cohorted=True)
+
+        user = User.objects.create(username="test", email="a@b.com")
+        cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                course_id=course.id,
+                                                group_type=CourseUserGroup.COHORT)
+        other_cohort = CourseUserGroup.objects.create(name="OtherCohort",
+                                                      course_id=course.id,
+                                                      group_type=CourseUserGroup.COHORT)
+
+        self.assertIsNone(get_cohort(user, course.id))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_cohort(user, course.id))
+
+        add_user_to_cohort(cohort, user.username)
+        self.assertEquals(get_cohort(user, course.id).id, cohort.id)
+        with self.assertNumQueries(0):
+            self.assertEquals(get_cohort(user, course.id).id, cohort.id)
+
+        add_user_to_cohort(other_cohort, user.username)
+        self.assertEquals(get_cohort(user, course.id).id, other_cohort.id)
+
+        other_cohort.users.remove(user)
+        self.assertIsNone(get_cohort(user, course.id))
+
+    def test_memberships_outside_request(self):
+        """
+        Make sure get_cohort() sees memberships changed by other processes outside of requests.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        self.config_course_cohorts(course, [], cohorted=True)
+
+        user = User.objects.create(username="test", email="a@b.com")
+        cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                course_id=course.id,
+                                                group_type=CourseUserGroup.COHORT)
+        self.assertIsNone(get_cohort(user, course.id))
+
+        # Doesn't send m2m_changed in this process, as another process's change wouldn't
+        CourseUserGroup.users.through.objects.create(courseusergroup=cohort, user=user)
+        self.assertEquals(get_cohort(user, course.id).id, cohort.id)
+
+    def test_get_cohort_ids(self):
+        """
+        Make sure get_cohort_ids() finds the cohorts of many users at once.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        users = [User.objects.create(username="test_{0}".format(i), email="a@b{0}.com".format(i))
+                 for i in range(3)]
+        cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                course_id=course.id,
+                                                group_type=CourseUserGroup.COHORT)
+        cohort.users.add(users[0], users[1])
+        other_course_cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                             course_id=SlashSeparatedCourseKey('a', 'b', 'c'),
+                                                             group_type=CourseUserGroup.COHORT)
+        other_course_cohort.users.add(users[2])
+
+        self.assertEquals(get_cohort_ids(users, course.id),
+                          {users[0].id: None, users[1].id: None, users[2].id: None},
+                          "Course isn't cohorted")
+
+        self.config_course_cohorts(course, [], cohorted=True,
+                                   auto_cohort=True,
+                                   auto_cohort_groups=["AutoGroup"])
+        with self.assertNumQueries(1):
+            self.assertEquals(get_cohort_ids(users, course.id),
+                              {users[0].id: cohort.id, users[1].id: cohort.id, users[2].id: None})
+        self.assertFalse(CourseUserGroup.objects.filter(name="AutoGroup").exists(),
+                         "get_cohort_ids shouldn't auto cohort users")
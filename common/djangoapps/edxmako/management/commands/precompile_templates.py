@@ -0,0 +1,28 @@
+"""
+Compile the Mako templates of all the registered lookups ahead of time, so that
+new workers load them rather than compiling them on first use.
+
+This is meant to run once per deployment, after the templates are in place
+(Mako recompiles modules older than their templates). The modules go to a
+subdirectory of MAKO_PRECOMPILED_ROOT named after the version of the templates,
+which workers started with the same templates find at startup.
+"""
+from django.conf import settings
+from django.core.management.base import CommandError, NoArgsCommand
+
+from edxmako.paths import precompile_templates, templates_version
+
+
+class Command(NoArgsCommand):
+    """
+    Management command to precompile the Mako templates.
+    """
+
+    help = "Precompile the Mako templates into MAKO_PRECOMPILED_ROOT."
+
+    def handle_noargs(self, **options):
+        if not getattr(settings, 'MAKO_PRECOMPILED_ROOT', None):
+            raise CommandError("Set MAKO_PRECOMPILED_ROOT to precompile the Mako templates.")
+
+        compiled = precompile_templates()
+        self.stdout.write("Compiled {} templates for version {}\n".format(compiled, templates_version()))
@@ -15,12 +15,28 @@
 from django.template import RequestContext
 from util.request import safe_get_host
 requestcontext = None
+# requestcontext collapsed to a single dictionary, once per request rather than once per render
+requestcontext_dictionary = None
+
+
+def get_request_context_dictionary():
+    """
+    Return a new dictionary of the variables of the current request context,
+    which is empty if there is none (in various testing contexts).
+    """
+    if requestcontext_dictionary is None:
+        return {}
+    return requestcontext_dictionary.copy()
 
 
 class MakoMiddleware(object):
 
     def process_request(self, request):
-        global requestcontext
+        global requestcontext, requestcontext_dictionary
         requestcontext = RequestContext(request)
         requestcontext['is_secure'] = request.is_secure()
         requestcontext['site'] = safe_get_host(request)
+
+        requestcontext_dictionary = {}
+        for d in requestcontext:
+            requestcontext_dictionary.update(d)
@@ -1,14 +1,25 @@
 """
 Set up lookup paths for mako templates.
+
+Mako compiles each template to a python module in MAKO_MODULE_DIR the first time
+it is used. When MAKO_PRECOMPILED_ROOT is set, the precompile_templates management
+command compiles all the templates of the registered lookups ahead of time, into a
+subdirectory of it named after the version of the templates (a hash of their
+sources), and use_precompiled_templates makes the lookups load them from there.
 """
+import hashlib
+import logging
 import os
 import pkg_resources
 
+import mako
 from django.conf import settings
 from mako.lookup import TemplateLookup
 
 from . import LOOKUP
 
+log = logging.getLogger(__name__)
+
 
 class DynamicTemplateLookup(TemplateLookup):
     """
@@ -59,3 +70,94 @@ def lookup_template(namespace, name):
     Look up a Mako template by namespace and name.
     """
     return LOOKUP[namespace].get_template(name)
+
+
+def _template_uris(directories):
+    """
+    Yields the uri of each file in `directories`, in the order a lookup
+    searches them.
+    """
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                if not filename.startswith('.'):
+                    yield '/' + os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def templates_version():
+    """
+    Return a hash of the sources of the templates of all the registered lookups,
+    and of the version of Mako compiling them.
+    """
+    version = hashlib.sha1(mako.__version__)
+    for namespace in sorted(LOOKUP):
+        lookup = LOOKUP[namespace]
+        version.update(namespace)
+        for index, directory in enumerate(lookup.directories):
+            for uri in _template_uris([directory]):
+                version.update('{}:{}'.format(index, uri))
+                with open(directory + uri, 'rb') as source:
+                    version.update(source.read())
+    return version.hexdigest()
+
+
+def precompiled_module_directory(namespace, version=None):
+    """
+    Return the directory holding the precompiled modules of the templates
+    of `namespace`, for the templates version `version` (the current one by default).
+    """
+    if version is None:
+        version = templates_version()
+    return os.path.join(settings.MAKO_PRECOMPILED_ROOT, version, namespace)
+
+
+def _set_module_directory(lookup, module_directory):
+    """
+    Make `lookup` keep the modules of the templates it loads from now on in `module_directory`.
+    """
+    lookup.module_directory = module_directory
+    lookup.template_args['module_directory'] = module_directory
+
+
+def precompile_templates():
+    """
+    Compile the templates of all the registered lookups to their precompiled
+    module directories, and return the number of templates compiled.
+
+    Files which aren't Mako templates (underscore templates, ...) are skipped.
+    """
+    version = templates_version()
+    compiled = 0
+    for namespace, lookup in LOOKUP.items():
+        _set_module_directory(lookup, precompiled_module_directory(namespace, version))
+        for uri in set(_template_uris(lookup.directories)):
+            try:
+                lookup.get_template(uri)
+            except Exception:  # pylint: disable=broad-except
+                log.debug("Skipping %s, which doesn't compile as a Mako template", uri, exc_info=True)
+            else:
+                compiled += 1
+    return compiled
+
+
+def use_precompiled_templates():
+    """
+    Make the registered lookups load their templates from the modules precompiled
+    for the current templates version, if MAKO_PRECOMPILED_ROOT is set and they
+    were precompiled. Return whether they were.
+
+    This must run after all the lookup directories are added, and before the
+    lookups load any template.
+    """
+    if not getattr(settings, 'MAKO_PRECOMPILED_ROOT', None):
+        return False
+
+    version = templates_version()
+    if not os.path.isdir(os.path.join(settings.MAKO_PRECOMPILED_ROOT, version)):
+        log.warning("The Mako templates weren't precompiled for version %s, run the precompile_templates command", version)
+        return False
+
+    for namespace, lookup in LOOKUP.items():
+        _set_module_directory(lookup, precompiled_module_directory(namespace, version))
+    return True
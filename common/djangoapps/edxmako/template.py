@@ -45,12 +45,7 @@ class Template(MakoTemplate):
         it to a render call on the mako template.
         """
         # collapse context_instance to a single dictionary for mako
-        context_dictionary = {}
-
-        # In various testing contexts, there might not be a current request context.
-        if edxmako.middleware.requestcontext is not None:
-            for d in edxmako.middleware.requestcontext:
-                context_dictionary.update(d)
+        context_dictionary = edxmako.middleware.get_request_context_dictionary()
         for d in context_instance:
             context_dictionary.update(d)
         context_dictionary['settings'] = settings
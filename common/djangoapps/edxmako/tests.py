@@ -1,7 +1,12 @@
+import os
+import shutil
+import tempfile
+
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
 from edxmako import add_lookup, LOOKUP
+from edxmako.paths import precompile_templates, precompiled_module_directory, use_precompiled_templates
 from edxmako.shortcuts import marketing_link
 from mock import patch
 from util.testing import UrlResetMixin
@@ -37,3 +42,44 @@ class AddLookupTests(TestCase):
         dirs = LOOKUP['test'].directories
         self.assertEqual(len(dirs), 1)
         self.assertTrue(dirs[0].endswith('management'))
+
+
+@patch.dict('edxmako.LOOKUP', {}, clear=True)
+class PrecompiledTemplatesTests(TestCase):
+    """
+    Test precompiling the templates of the lookups.
+    """
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.template_dir)
+        self.precompiled_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.precompiled_root)
+        self.write_template('hello.html', 'Hello ${name}')
+        self.write_template('not_mako.underscore', '<% if (name) { %>')
+
+    def write_template(self, name, source):
+        """Write the template `name` to the template directory."""
+        with open(os.path.join(self.template_dir, name), 'w') as template:
+            template.write(source)
+
+    def test_not_configured(self):
+        add_lookup('test', self.template_dir)
+        self.assertFalse(use_precompiled_templates())
+
+    def test_precompile(self):
+        with override_settings(MAKO_PRECOMPILED_ROOT=self.precompiled_root):
+            add_lookup('test', self.template_dir)
+            self.assertFalse(use_precompiled_templates(), "Not precompiled yet")
+
+            self.assertEqual(precompile_templates(), 1)
+            module_directory = precompiled_module_directory('test')
+            self.assertTrue(os.path.exists(os.path.join(module_directory, 'hello.html.py')))
+
+            self.assertTrue(use_precompiled_templates())
+            self.assertEqual(LOOKUP['test'].template_args['module_directory'], module_directory)
+            self.assertEqual(LOOKUP['test'].get_template('hello.html').render_unicode(name='you'), 'Hello you')
+
+            # Changing a template changes the version of the templates
+            self.write_template('hello.html', 'Hi ${name}')
+            self.assertNotEqual(precompiled_module_directory('test'), module_directory)
+            self.assertFalse(use_precompiled_templates())
@@ -0,0 +1,48 @@
+"""
+Middleware tracking the queries made by each request; see monitoring.queries.
+"""
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from monitoring.queries import BACKENDS, start_tracking, stop_tracking, report_queries
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Counts the SQL queries, Mongo operations and memcached calls made by each
+    request, reports them by view name, and logs the requests that go over
+    the budget of their view in settings.QUERY_BUDGETS.
+
+    In debug mode, the counts and times are also returned in X-Query-Count-*
+    and X-Query-Time-* response headers.
+
+    Enabled by FEATURES['ENABLE_QUERY_BUDGETS'].
+    """
+    def __init__(self):
+        if not settings.FEATURES.get('ENABLE_QUERY_BUDGETS', False):
+            raise MiddlewareNotUsed()
+
+    def process_request(self, request):
+        """Start tracking the queries of the request."""
+        request.query_stats = start_tracking()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        """Remember the name of the view the queries are reported under."""
+        request.query_view_name = u'{}.{}'.format(view_func.__module__, view_func.__name__)
+
+    def process_response(self, request, response):
+        """Stop tracking the queries of the request, and report them."""
+        stats = getattr(request, 'query_stats', None)
+        if stats is None:
+            return response
+        stop_tracking(stats)
+
+        # Requests that didn't get to a view (404s, redirects by other middleware)
+        # are reported together.
+        report_queries('view', getattr(request, 'query_view_name', 'unknown'), stats)
+
+        if settings.DEBUG:
+            for backend in BACKENDS:
+                response['X-Query-Count-{}'.format(backend.title())] = str(stats.counts[backend])
+                response['X-Query-Time-{}'.format(backend.title())] = '{:.4f}'.format(stats.times[backend])
+        return response
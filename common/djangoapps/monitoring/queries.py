@@ -0,0 +1,333 @@
+"""
+Counting of the SQL queries, Mongo operations and memcached calls made while
+handling a request or running a celery task, and of the time spent in each.
+
+`install_query_tracking()` hooks into the Django database connections, pymongo
+and the memcached cache backend. The hooks do nothing unless something is being
+tracked in the current thread, which is the case while a request goes through
+`monitoring.middleware.QueryBudgetMiddleware`, while a celery task runs, or
+inside `track_queries()`::
+
+    with track_queries() as stats:
+        grade(student, course)
+    log.info("Grading made %d SQL queries", stats.counts[SQL])
+
+The totals are sent to DataDog tagged by view or task name, and compared to
+the budgets set in settings.QUERY_BUDGETS, for instance::
+
+    QUERY_BUDGETS = {
+        'courseware.views.progress': {'sql': 50, 'mongo': 100},
+        'instructor_task.tasks.calculate_grades_csv': {'sql': 100000},
+    }
+
+Requests and tasks that go over their budget are logged, so that regressions
+such as looking up StudentModules one at a time show up right away.
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from time import time
+
+from django.conf import settings
+
+from xmodule.util.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+SQL = 'sql'
+MONGO = 'mongo'
+MEMCACHE = 'memcache'
+BACKENDS = (SQL, MONGO, MEMCACHE)
+
+# The modulestore methods that Mongo operations are attributed to. When they
+# call each other, the operations are attributed to the outermost one.
+MODULESTORE_METHODS = (
+    'get_item', 'get_items', 'has_item', 'get_course', 'get_courses', 'has_course',
+    'get_parent_location', 'get_orphans', 'create_item', 'create_course', 'update_item',
+    'delete_item', 'publish', 'unpublish',
+)
+
+_TRACKING = threading.local()
+
+
+class QueryStats(object):
+    """
+    The queries made by a request or task: how many were made, and how many
+    seconds they took, for each of BACKENDS, along with the number of Mongo
+    operations made on each collection and from each modulestore method.
+    """
+    def __init__(self):
+        self.counts = dict.fromkeys(BACKENDS, 0)
+        self.times = dict.fromkeys(BACKENDS, 0.0)
+        self.mongo_collections = defaultdict(int)
+        self.modulestore_methods = defaultdict(int)
+
+    def record(self, backend, seconds, collection=None, modulestore_method=None):
+        """
+        Record a query to `backend` that took `seconds`.
+        """
+        self.counts[backend] += 1
+        self.times[backend] += seconds
+        if collection is not None:
+            self.mongo_collections[collection] += 1
+        if modulestore_method is not None:
+            self.modulestore_methods[modulestore_method] += 1
+
+    def over_budget(self, budget):
+        """
+        Return a dict of the backends for which more queries were made than
+        allowed by `budget`, a dict of maximum counts keyed by backend, with
+        the number of queries made for each.
+        """
+        return {
+            backend: self.counts[backend]
+            for backend, limit in budget.iteritems()
+            if backend in self.counts and self.counts[backend] > limit
+        }
+
+
+def start_tracking():
+    """
+    Start tracking the queries made in the current thread, and return the
+    QueryStats they are recorded to.
+
+    Tracking can be nested: the queries are recorded in every QueryStats of
+    the thread until its tracking is stopped.
+    """
+    stats = QueryStats()
+    _active_stats().append(stats)
+    return stats
+
+
+def stop_tracking(stats):
+    """
+    Stop recording queries to `stats`.
+    """
+    active = _active_stats()
+    if stats in active:
+        active.remove(stats)
+
+
+@contextmanager
+def track_queries():
+    """
+    Context manager tracking the queries made in its body, in the QueryStats it yields.
+    """
+    stats = start_tracking()
+    try:
+        yield stats
+    finally:
+        stop_tracking(stats)
+
+
+def _active_stats():
+    """Return the QueryStats that queries made in this thread are being recorded to."""
+    try:
+        return _TRACKING.stats
+    except AttributeError:
+        _TRACKING.stats = []
+        return _TRACKING.stats
+
+
+def _timed_call(backend, func, args, kwargs, collection=None):
+    """
+    Call `func`, recording the call as a query to `backend` if queries are being tracked.
+    """
+    active = _active_stats()
+    if not active:
+        return func(*args, **kwargs)
+
+    modulestore_method = getattr(_TRACKING, 'modulestore_method', None) if backend == MONGO else None
+    start = time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        duration = time() - start
+        for stats in active:
+            stats.record(backend, duration, collection, modulestore_method)
+
+
+def _tracked_method(backend, func, get_collection=None):
+    """
+    Wrap the method `func` so that calls to it are tracked as queries to `backend`.
+    `get_collection` returns the name of the Mongo collection being queried,
+    given the object whose method is called.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        """Call the wrapped method, tracking it."""
+        collection = get_collection(self) if get_collection is not None and _active_stats() else None
+        return _timed_call(backend, func, (self,) + args, kwargs, collection)
+    wrapper.query_tracking = True
+    return wrapper
+
+
+def _modulestore_method(name, func):
+    """
+    Wrap the modulestore method `func` so that the Mongo operations it makes
+    are attributed to it.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        """Call the wrapped method, attributing Mongo operations to it."""
+        if getattr(_TRACKING, 'modulestore_method', None) is not None or not _active_stats():
+            return func(*args, **kwargs)
+        _TRACKING.modulestore_method = name
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _TRACKING.modulestore_method = None
+    wrapper.query_tracking = True
+    return wrapper
+
+
+def _patch_methods(cls, method_names, wrap):
+    """
+    Replace the methods of `cls` named `method_names` by `wrap(name, method)`.
+    Methods that `cls` only inherits, and methods already wrapped, are left alone.
+    """
+    for name in method_names:
+        method = cls.__dict__.get(name)
+        if method is None or getattr(method, 'query_tracking', False):
+            continue
+        setattr(cls, name, wrap(name, method))
+
+
+class _TrackedCursor(object):
+    """
+    Wraps a database cursor, tracking the queries it executes.
+    """
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        """Execute a query, tracking it."""
+        return _timed_call(SQL, self.cursor.execute, args, kwargs)
+
+    def executemany(self, *args, **kwargs):
+        """Execute a query against several sets of parameters, tracking it."""
+        return _timed_call(SQL, self.cursor.executemany, args, kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+
+def _install_sql_tracking():
+    """Track the queries made through Django database connections."""
+    from django.db.backends import BaseDatabaseWrapper
+
+    def wrap(_name, cursor_method):
+        """Make `cursor_method` return cursors that track their queries."""
+        @wraps(cursor_method)
+        def cursor(self):
+            """Return a cursor, tracking its queries if queries are being tracked."""
+            db_cursor = cursor_method(self)
+            return _TrackedCursor(db_cursor) if _active_stats() else db_cursor
+        cursor.query_tracking = True
+        return cursor
+
+    _patch_methods(BaseDatabaseWrapper, ['cursor'], wrap)
+
+
+def _install_mongo_tracking():
+    """Track the operations made through pymongo, and the modulestore methods making them."""
+    from pymongo.collection import Collection
+    from pymongo.cursor import Cursor
+
+    # `_refresh` is where cursors fetch their results, for finds and getmores.
+    _patch_methods(
+        Cursor, ['_refresh', 'count', 'distinct'],
+        lambda _name, method: _tracked_method(MONGO, method, lambda cursor: cursor.collection.name)
+    )
+    _patch_methods(
+        Collection, ['insert', 'update', 'remove', 'find_and_modify', 'aggregate', 'group', 'map_reduce'],
+        lambda _name, method: _tracked_method(MONGO, method, lambda collection: collection.name)
+    )
+
+    from xmodule.modulestore.mongo.base import MongoModuleStore
+    from xmodule.modulestore.mongo.draft import DraftModuleStore
+    from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
+    for modulestore_class in (MongoModuleStore, DraftModuleStore, SplitMongoModuleStore):
+        _patch_methods(modulestore_class, MODULESTORE_METHODS, _modulestore_method)
+
+
+def _install_memcache_tracking():
+    """Track the calls made to memcached through the Django cache."""
+    from django.core.cache.backends.memcached import BaseMemcachedCache
+
+    _patch_methods(
+        BaseMemcachedCache,
+        ['get', 'set', 'add', 'delete', 'get_many', 'set_many', 'delete_many', 'incr', 'decr'],
+        lambda _name, method: _tracked_method(MEMCACHE, method)
+    )
+
+
+def install_query_tracking():
+    """
+    Hook into the database, Mongo and memcached clients so that queries can be
+    tracked, and track the queries of celery tasks. Safe to call more than once.
+    """
+    _install_sql_tracking()
+    _install_mongo_tracking()
+    _install_memcache_tracking()
+
+    from celery.signals import task_prerun, task_postrun
+    task_prerun.connect(_start_task_tracking, weak=False, dispatch_uid='monitoring.queries.task_prerun')
+    task_postrun.connect(_stop_task_tracking, weak=False, dispatch_uid='monitoring.queries.task_postrun')
+
+
+def _start_task_tracking(task_id=None, **kwargs):  # pylint: disable=unused-argument
+    """Start tracking the queries made by a celery task."""
+    _task_stats()[task_id] = start_tracking()
+
+
+def _stop_task_tracking(task_id=None, task=None, **kwargs):  # pylint: disable=unused-argument
+    """Stop tracking the queries made by a celery task, and report them."""
+    stats = _task_stats().pop(task_id, None)
+    if stats is None:
+        return
+    stop_tracking(stats)
+    report_queries('task', task.name, stats)
+
+
+def _task_stats():
+    """Return the QueryStats of the celery tasks running in this thread, keyed by task id."""
+    try:
+        return _TRACKING.tasks
+    except AttributeError:
+        _TRACKING.tasks = {}
+        return _TRACKING.tasks
+
+
+def report_queries(kind, name, stats):
+    """
+    Send the queries recorded in `stats` for the view or task `name` to DataDog,
+    and log a warning if they went over its budget in settings.QUERY_BUDGETS.
+
+    `kind` is either 'view' or 'task'.
+    """
+    tags = (u'{}:{}'.format(kind, name),)
+    for backend in BACKENDS:
+        backend_tags = tags + (u'backend:{}'.format(backend),)
+        metrics.histogram('edxapp.{}.queries'.format(kind), stats.counts[backend], tags=backend_tags)
+        metrics.timing('edxapp.{}.query_time'.format(kind), stats.times[backend], tags=backend_tags)
+    for collection, count in stats.mongo_collections.iteritems():
+        metrics.increment('edxapp.mongo.operations', value=count, tags=tags + (u'collection:{}'.format(collection),))
+    for method, count in stats.modulestore_methods.iteritems():
+        metrics.increment('edxapp.mongo.operations', value=count, tags=tags + (u'modulestore_method:{}'.format(method),))
+
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name)
+    if not budget:
+        return
+    over_budget = stats.over_budget(budget)
+    if over_budget:
+        metrics.increment('edxapp.{}.over_query_budget'.format(kind), tags=tags)
+        log.warning(
+            u"%s %s went over its query budget: %s (budget %s); Mongo operations by collection: %s, by method: %s",
+            kind, name, over_budget, budget, dict(stats.mongo_collections), dict(stats.modulestore_methods)
+        )
@@ -4,13 +4,67 @@ Add receivers for django signals, and feed data into the monitoring system.
 If a model has a class attribute 'METRIC_TAGS' that is a list of strings,
 those fields will be retrieved from the model instance, and added as tags to
 the recorded metrics.
-"""
 
+The metrics are aggregated in memory and sent periodically, rather than one
+per signal. Batch jobs that load or save many instances can further wrap
+their work in `bulk_model_metrics()`, which only counts signals in a plain
+dict of the thread, and builds their tags once, when the job is done.
+"""
+import threading
+from contextlib import contextmanager
 
 from django.db.models.signals import post_save, post_delete, m2m_changed, post_init
 from django.dispatch import receiver
 
-from dogapi import dog_stats_api
+from xmodule.util.metrics import metrics
+
+
+_BULK_MODE = threading.local()
+
+
+@contextmanager
+def bulk_model_metrics():
+    """
+    Context manager for batch jobs that handle many model instances.
+
+    While it is active (in the current thread), model signals are only
+    counted per model class, action and database, in a dict of the thread:
+    neither the tags looked up on each instance, nor the aggregator's lock,
+    are involved. The counts are recorded when the outermost context exits.
+    """
+    if getattr(_BULK_MODE, 'counts', None) is not None:
+        yield
+        return
+
+    counts = _BULK_MODE.counts = {}
+    try:
+        yield
+    finally:
+        _BULK_MODE.counts = None
+        for (model_class, action, using, target_class), value in counts.iteritems():
+            tags = [u'model_class:{}'.format(model_class.__name__), u'action:{}'.format(action)]
+            if using is not None:
+                tags.append(u'database:{}'.format(using))
+            if target_class is not None:
+                tags.append(u'target_class:{}'.format(target_class.__name__))
+            metrics.increment('edxapp.db.model', value=value, tags=tags)
+
+
+def _record_model_metric(action, sender, kwargs, value=1, target_class=None):
+    """
+    Count `value` signals of `action` on the model `sender`, with the tags of the
+    instance in kwargs, unless a bulk_model_metrics context is active.
+    """
+    counts = getattr(_BULK_MODE, 'counts', None)
+    if counts is not None:
+        key = (sender, action, kwargs.get('using'), target_class)
+        counts[key] = counts.get(key, 0) + value
+        return
+
+    tags = _database_tags(action, sender, kwargs)
+    if target_class is not None:
+        tags.append(u'target_class:{}'.format(target_class.__name__))
+    metrics.increment('edxapp.db.model', value=value, tags=tags)
 
 
 def _database_tags(action, sender, kwargs):
@@ -58,9 +112,7 @@ def post_init_metrics(sender, **kwargs):
         using (str): The name of the database being used for this initialization (optional).
         instance (Model instance): The instance being initialized (optional).
     """
-    tags = _database_tags('initialized', sender, kwargs)
-
-    dog_stats_api.increment('edxapp.db.model', tags=tags)
+    _record_model_metric('initialized', sender, kwargs)
 
 
 @receiver(post_save, dispatch_uid='edxapp.monitoring.post_save_metrics')
@@ -75,8 +127,7 @@ def post_save_metrics(sender, **kwargs):
     """
     action = 'created' if kwargs.pop('created', False) else 'updated'
 
-    tags = _database_tags(action, sender, kwargs)
-    dog_stats_api.increment('edxapp.db.model', tags=tags)
+    _record_model_metric(action, sender, kwargs)
 
 @receiver(post_delete, dispatch_uid='edxapp.monitoring.post_delete_metrics')
 def post_delete_metrics(sender, **kwargs):
@@ -88,9 +139,7 @@ def post_delete_metrics(sender, **kwargs):
         using (str): The name of the database being used for this deletion (optional).
         instance (Model instance): The instance being deleted (optional).
     """
-    tags = _database_tags('deleted', sender, kwargs)
-
-    dog_stats_api.increment('edxapp.db.model', tags=tags)
+    _record_model_metric('deleted', sender, kwargs)
 
 
 @receiver(m2m_changed, dispatch_uid='edxapp.monitoring.m2m_changed_metrics')
@@ -120,15 +169,6 @@ def m2m_changed_metrics(sender, **kwargs):
     if not action:
         return
 
-    tags = _database_tags(action, sender, kwargs)
-
-    if 'model' in kwargs:
-        tags.append('target_class:{}'.format(kwargs['model'].__name__))
-
     pk_set = kwargs.get('pk_set', []) or []
 
-    dog_stats_api.increment(
-        'edxapp.db.model',
-        value=len(pk_set),
-        tags=tags
-    )
+    _record_model_metric(action, sender, kwargs, value=len(pk_set), target_class=kwargs.get('model'))
@@ -1,3 +1,15 @@
 # Register signal handlers
 import signals
-import exceptions
\ No newline at end of file
+import exceptions
+
+from django.conf import settings
+
+from monitoring.queries import install_query_tracking
+
+
+def run():
+    """
+    Install the query tracking hooks, if query budgets are enabled.
+    """
+    if settings.FEATURES.get('ENABLE_QUERY_BUDGETS', False):
+        install_query_tracking()
@@ -0,0 +1,134 @@
+"""
+Tests for the tracking of the queries made by requests and tasks.
+"""
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from mock import patch
+
+from monitoring.middleware import QueryBudgetMiddleware
+from monitoring.queries import (
+    MONGO, SQL, QueryStats, install_query_tracking, report_queries, track_queries,
+    _modulestore_method, _patch_methods, _tracked_method,
+)
+
+
+class FakeCollection(object):
+    """Stands in for a pymongo collection."""
+    name = 'modulestore'
+
+    def find_one(self, query):
+        """Pretend to query Mongo."""
+        return query
+
+
+class FakeModuleStore(object):
+    """Stands in for a modulestore making Mongo operations."""
+    collection = FakeCollection()
+
+    def get_item(self, location):
+        """Make one Mongo operation."""
+        return self.collection.find_one(location)
+
+    def get_items(self, locations):
+        """Make a Mongo operation per location, through get_item."""
+        return [self.get_item(location) for location in locations]
+
+
+_patch_methods(
+    FakeCollection, ['find_one'],
+    lambda _name, method: _tracked_method(MONGO, method, lambda collection: collection.name)
+)
+_patch_methods(FakeModuleStore, ['get_item', 'get_items'], _modulestore_method)
+
+
+class QueryTrackingTest(TestCase):
+    """
+    Test the tracking of queries.
+    """
+    def setUp(self):
+        install_query_tracking()
+
+    def test_sql_queries_are_counted(self):
+        with track_queries() as stats:
+            User.objects.count()
+            User.objects.filter(username='nobody').exists()
+        self.assertEqual(stats.counts[SQL], 2)
+        self.assertGreater(stats.times[SQL], 0)
+
+    def test_queries_are_not_counted_outside_tracking(self):
+        with track_queries() as stats:
+            pass
+        User.objects.count()
+        self.assertEqual(stats.counts[SQL], 0)
+
+    def test_nested_tracking(self):
+        with track_queries() as outer_stats:
+            User.objects.count()
+            with track_queries() as inner_stats:
+                User.objects.count()
+        self.assertEqual(outer_stats.counts[SQL], 2)
+        self.assertEqual(inner_stats.counts[SQL], 1)
+
+    def test_mongo_operations_by_collection_and_method(self):
+        modulestore = FakeModuleStore()
+        with track_queries() as stats:
+            modulestore.get_items(['a', 'b'])
+            modulestore.get_item('c')
+            modulestore.collection.find_one('d')
+        self.assertEqual(stats.counts[MONGO], 4)
+        self.assertEqual(stats.mongo_collections, {'modulestore': 4})
+        self.assertEqual(stats.modulestore_methods, {'get_items': 2, 'get_item': 1})
+
+    @override_settings(QUERY_BUDGETS={'some.view': {'sql': 1, 'mongo': 5}})
+    @patch('monitoring.queries.log')
+    def test_over_budget_is_logged(self, mock_log):
+        stats = QueryStats()
+        stats.record(SQL, 0.1)
+        report_queries('view', 'some.view', stats)
+        self.assertFalse(mock_log.warning.called)
+
+        stats.record(SQL, 0.1)
+        self.assertEqual(stats.over_budget({'sql': 1, 'mongo': 5}), {'sql': 2})
+        report_queries('view', 'some.view', stats)
+        self.assertTrue(mock_log.warning.called)
+
+
+def some_view(request):  # pylint: disable=unused-argument
+    """A view making a SQL query."""
+    User.objects.count()
+    return HttpResponse()
+
+
+class QueryBudgetMiddlewareTest(TestCase):
+    """
+    Test QueryBudgetMiddleware.
+    """
+    def setUp(self):
+        install_query_tracking()
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_QUERY_BUDGETS': True}):
+            self.middleware = QueryBudgetMiddleware()
+        self.request = RequestFactory().get('/')
+
+    def _get_response(self):
+        """Run the request through the middleware and the view."""
+        self.middleware.process_request(self.request)
+        self.middleware.process_view(self.request, some_view, [], {})
+        return self.middleware.process_response(self.request, some_view(self.request))
+
+    @override_settings(DEBUG=True)
+    @patch('monitoring.middleware.report_queries')
+    def test_queries_are_reported_by_view(self, mock_report):
+        response = self._get_response()
+        self.assertEqual(response['X-Query-Count-Sql'], '1')
+        self.assertEqual(response['X-Query-Count-Mongo'], '0')
+        kind, view_name, stats = mock_report.call_args[0]
+        self.assertEqual((kind, view_name), ('view', 'monitoring.tests.test_queries.some_view'))
+        self.assertEqual(stats.counts[SQL], 1)
+
+    @patch('monitoring.middleware.report_queries')
+    def test_no_headers_outside_debug_mode(self, _mock_report):
+        response = self._get_response()
+        self.assertFalse(response.has_header('X-Query-Count-Sql'))
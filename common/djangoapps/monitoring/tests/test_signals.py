@@ -0,0 +1,32 @@
+"""
+Tests for the model signal metrics.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mock import patch
+
+from monitoring.signals import bulk_model_metrics
+
+
+@patch('monitoring.signals.metrics')
+class BulkModelMetricsTest(TestCase):
+    """
+    Tests for bulk_model_metrics.
+    """
+    def test_counted_per_model_action(self, mock_metrics):
+        with bulk_model_metrics():
+            for __ in range(3):
+                User(username='bulk')
+            with bulk_model_metrics():
+                User(username='nested')
+            self.assertFalse(mock_metrics.increment.called)
+
+        mock_metrics.increment.assert_called_once_with(
+            'edxapp.db.model', value=4, tags=[u'model_class:User', u'action:initialized']
+        )
+
+    def test_outside_bulk_mode(self, mock_metrics):
+        User(username='single')
+        mock_metrics.increment.assert_called_once_with(
+            'edxapp.db.model', value=1, tags=[u'model_class:User', u'action:initialized']
+        )
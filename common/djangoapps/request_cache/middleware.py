@@ -7,14 +7,26 @@ class RequestCache(object):
     @classmethod
     def get_request_cache(cls):
         return _request_cache_threadlocal
-            
+
+    @classmethod
+    def in_request(cls):
+        """
+        Return whether the current thread is handling a request. The cache is only
+        cleared around requests, so code which may also run outside of them (in
+        celery tasks or management commands) should only cache data in it when
+        this is True.
+        """
+        return getattr(_request_cache_threadlocal, 'in_request', False)
+
     def clear_request_cache(self):
         _request_cache_threadlocal.data = {}
 
     def process_request(self, request):
         self.clear_request_cache()
+        _request_cache_threadlocal.in_request = True
         return None
 
     def process_response(self, request, response):
         self.clear_request_cache()
-        return response
\ No newline at end of file
+        _request_cache_threadlocal.in_request = False
+        return response
@@ -89,18 +89,8 @@ def anonymous_id_for_user(user, course_id, save=True):
     if cached_id is not None:
         return cached_id
 
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(unicode(user.id))
-    if course_id:
-        hasher.update(course_id.to_deprecated_string())
-    digest = hasher.hexdigest()
-
-    if not hasattr(user, '_anonymous_id'):
-        user._anonymous_id = {}  # pylint: disable=protected-access
-
-    user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    digest = _anonymous_id_digest(user.id, course_id)
+    _cache_anonymous_id(user, course_id, digest)
 
     if save is False:
         return digest
@@ -129,6 +119,111 @@ def anonymous_id_for_user(user, course_id, save=True):
     return digest
 
 
+# Number of users whose AnonymousUserId rows are looked up and created
+# together by `anonymous_ids_for_users`.
+ANONYMOUS_ID_CHUNK_SIZE = 1000
+
+
+def _anonymous_id_digest(user_id, course_id):
+    """
+    Compute the anonymous id for the user with id `user_id` in `course_id`.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    hasher.update(unicode(user_id))
+    if course_id:
+        hasher.update(course_id.to_deprecated_string())
+    return hasher.hexdigest()
+
+
+def _cache_anonymous_id(user, course_id, digest):
+    """
+    Remember `digest` as the anonymous id of `user` in `course_id` on the
+    user object itself.
+    """
+    if not hasattr(user, '_anonymous_id'):
+        user._anonymous_id = {}  # pylint: disable=protected-access
+
+    user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+
+
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Bulk version of `anonymous_id_for_user`, for batch jobs that need the
+    anonymous ids of many users in one course.
+
+    Returns a dict mapping each user's id to their anonymous id in
+    `course_id`, and caches the ids on the user objects so that later
+    calls to `anonymous_id_for_user` for them don't touch the database.
+    Anonymous users are skipped.
+
+    Keyword arguments:
+    save -- Whether the ids should be saved in AnonymousUserId objects. Rows
+            are saved ANONYMOUS_ID_CHUNK_SIZE users at a time, with one query
+            for the existing rows and one `bulk_create` for the missing ones.
+    """
+    anonymous_ids = {}
+    uncached_users = []
+    for user in users:
+        if user.is_anonymous():
+            continue
+        cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
+        if cached_id is not None:
+            anonymous_ids[user.id] = cached_id
+        else:
+            uncached_users.append(user)
+
+    for start in xrange(0, len(uncached_users), ANONYMOUS_ID_CHUNK_SIZE):
+        chunk = uncached_users[start:start + ANONYMOUS_ID_CHUNK_SIZE]
+        digests = dict((user.id, _anonymous_id_digest(user.id, course_id)) for user in chunk)
+
+        if save:
+            _save_anonymous_ids(chunk, course_id, digests)
+
+        for user in chunk:
+            _cache_anonymous_id(user, course_id, digests[user.id])
+        anonymous_ids.update(digests)
+
+    return anonymous_ids
+
+
+def _save_anonymous_ids(users, course_id, digests):
+    """
+    Create the AnonymousUserId rows that are missing for `users` in
+    `course_id`, where `digests` maps user ids to their computed anonymous ids.
+    """
+    stored_ids = dict(
+        AnonymousUserId.objects.filter(
+            course_id=course_id,
+            user__in=digests.keys(),
+        ).values_list('user_id', 'anonymous_user_id')
+    )
+    for user_id, stored_id in stored_ids.iteritems():
+        if stored_id != digests[user_id]:
+            log.error(
+                "Stored anonymous user id {stored!r} for user {user!r} "
+                "in course {course!r} doesn't match computed id {digest!r}".format(
+                    user=user_id,
+                    course=course_id,
+                    stored=stored_id,
+                    digest=digests[user_id]
+                )
+            )
+
+    missing_users = [user for user in users if user.id not in stored_ids]
+    try:
+        AnonymousUserId.objects.bulk_create([
+            AnonymousUserId(user=user, course_id=course_id, anonymous_user_id=digests[user.id])
+            for user in missing_users
+        ])
+    except IntegrityError:
+        # Another thread has created some of these entries since we looked,
+        # so fall back to creating them one at a time.
+        for user in missing_users:
+            anonymous_id_for_user(user, course_id)
+
+
 def user_by_anonymous_id(id):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -25,7 +25,10 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 from mock import Mock, patch
 
-from student.models import anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user
+from student.models import (
+    anonymous_id_for_user, anonymous_ids_for_users, user_by_anonymous_id, CourseEnrollment,
+    unique_id_for_user, AnonymousUserId
+)
 from student.views import (process_survey_link, _cert_info,
                            change_enrollment, complete_course_mode_info)
 from student.tests.factories import UserFactory, CourseModeFactory
@@ -621,3 +624,31 @@ class AnonymousLookupTable(TestCase):
         real_user = user_by_anonymous_id(anonymous_id)
         self.assertEqual(self.user, real_user)
         self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, self.course.id, save=False))
+
+    def test_bulk_matches_single(self):
+        users = [UserFactory() for __ in range(3)]
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+        for user in users:
+            self.assertEqual(anonymous_ids[user.id], anonymous_id_for_user(user, self.course.id))
+            self.assertEqual(user, user_by_anonymous_id(anonymous_ids[user.id]))
+
+    def test_bulk_creates_missing_rows(self):
+        users = [UserFactory() for __ in range(3)]
+        anonymous_id_for_user(users[0], self.course.id)
+        fresh_users = [User.objects.get(id=user.id) for user in users]
+        # One query for the existing rows and one to insert the missing ones
+        with self.assertNumQueries(2):
+            anonymous_ids_for_users(fresh_users, self.course.id)
+        self.assertEqual(AnonymousUserId.objects.filter(course_id=self.course.id).count(), 3)
+
+        # The ids are now cached on the users
+        with self.assertNumQueries(0):
+            for user in fresh_users:
+                anonymous_id_for_user(user, self.course.id)
+
+    def test_bulk_without_save(self):
+        users = [UserFactory() for __ in range(2)]
+        with self.assertNumQueries(0):
+            anonymous_ids = anonymous_ids_for_users(users + [AnonymousUser()], None, save=False)
+        self.assertEqual(set(anonymous_ids), set(user.id for user in users))
+        self.assertFalse(AnonymousUserId.objects.filter(user__in=users).exists())
@@ -21,7 +21,7 @@ below::
 import inspect
 from importlib import import_module
 
-from dogapi import dog_stats_api
+from xmodule.util.metrics import metrics
 
 from django.conf import settings
 
@@ -83,16 +83,14 @@ def _instantiate_backend_from_name(name, options):
     return backend
 
 
-@dog_stats_api.timed('track.send')
+@metrics.timed('track.send')
 def send(event):
     """
     Send an event object to all the initialized backends.
 
     """
-    dog_stats_api.increment('track.send.count')
-
     for name, backend in backends.iteritems():
-        with dog_stats_api.timer('track.send.backend.{0}'.format(name)):
+        with metrics.timer('track.send.backend.{0}'.format(name)):
             backend.send(event)
 
 
@@ -4,18 +4,26 @@ Adds user's tags to tracking event context.
 """
 from track.contexts import COURSE_REGEX
 from eventtracking import tracker
-from user_api.models import UserCourseTag
+from user_api import user_service
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 
 class UserTagsEventContextMiddleware(object):
-    """Middleware that adds a user's tags to tracking event context."""
+    """
+    Middleware that adds a user's tags to tracking event context.
+
+    It also keeps a snapshot of the tags read during the request (see
+    user_service.course_tags_snapshot), so that the user's tags are only
+    queried once per request, by this middleware and the xblock runtime alike.
+    """
     CONTEXT_NAME = 'user_tags_context'
 
     def process_request(self, request):
         """
         Add a user's tags to the tracking event context.
         """
+        user_service.start_snapshot()
+
         match = COURSE_REGEX.match(request.build_absolute_uri())
         course_id = None
         if match:
@@ -28,12 +36,7 @@ class UserTagsEventContextMiddleware(object):
             context['course_id'] = course_id
 
             if request.user.is_authenticated():
-                context['course_user_tags'] = dict(
-                    UserCourseTag.objects.filter(
-                        user=request.user.pk,
-                        course_id=course_key,
-                    ).values_list('key', 'value')
-                )
+                context['course_user_tags'] = dict(user_service.get_course_tags(request.user, course_key))
             else:
                 context['course_user_tags'] = {}
 
@@ -44,6 +47,7 @@ class UserTagsEventContextMiddleware(object):
 
     def process_response(self, request, response):  # pylint: disable=unused-argument
         """Exit the context if it exists."""
+        user_service.end_snapshot()
         try:
             tracker.get_tracker().exit_context(self.CONTEXT_NAME)
         except:  # pylint: disable=bare-except
@@ -7,6 +7,7 @@ from django.test.client import RequestFactory
 
 from student.tests.factories import UserFactory, AnonymousUserFactory
 from user_api.tests.factories import UserCourseTagFactory
+from user_api import user_service
 from user_api.middleware import UserTagsEventContextMiddleware
 
 
@@ -32,6 +33,7 @@ class TagsMiddlewareTest(TestCase):
         patcher = patch('user_api.middleware.tracker')
         self.tracker = patcher.start()
         self.addCleanup(patcher.stop)
+        self.addCleanup(user_service.end_snapshot)
 
     def process_request(self):
         """
@@ -33,3 +33,30 @@ class TestUserService(TestCase):
         user_service.set_course_tag(self.user, self.course_id, self.test_key, test_value)
         tag = user_service.get_course_tag(self.user, self.course_id, self.test_key)
         self.assertEqual(tag, test_value)
+
+    def test_snapshot(self):
+        user_service.set_course_tag(self.user, self.course_id, self.test_key, 'value')
+        with user_service.course_tags_snapshot():
+            with self.assertNumQueries(1):
+                self.assertEqual(user_service.get_course_tag(self.user, self.course_id, self.test_key), 'value')
+                self.assertIsNone(user_service.get_course_tag(self.user, self.course_id, 'other_key'))
+                self.assertEqual(user_service.get_course_tags(self.user, self.course_id), {self.test_key: 'value'})
+
+            # setting a tag updates the snapshot
+            user_service.set_course_tag(self.user, self.course_id, 'other_key', 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(user_service.get_course_tag(self.user, self.course_id, 'other_key'), '2')
+
+    def test_prefetch_course_tags(self):
+        other_user = UserFactory.create()
+        user_service.set_course_tag(self.user, self.course_id, self.test_key, 'value')
+        user_service.set_course_tag(other_user, self.course_id, self.test_key, 'other_value')
+        with user_service.course_tags_snapshot():
+            with self.assertNumQueries(1):
+                tags = user_service.prefetch_course_tags([self.user, other_user.id], self.course_id)
+            self.assertEqual(tags, {
+                self.user.id: {self.test_key: 'value'},
+                other_user.id: {self.test_key: 'other_value'},
+            })
+            with self.assertNumQueries(0):
+                self.assertEqual(user_service.get_course_tag(other_user, self.course_id, self.test_key), 'other_value')
@@ -7,6 +7,9 @@ Stores global metadata using the UserPreference model, and per-course metadata u
 UserCourseTag model.
 """
 
+import threading
+from contextlib import contextmanager
+
 from user_api.models import UserCourseTag
 
 # Scopes
@@ -14,6 +17,107 @@ from user_api.models import UserCourseTag
 # global tags (e.g. using the existing UserPreferences table))
 COURSE_SCOPE = 'course'
 
+# Number of users whose tags prefetch_course_tags loads per query
+PREFETCH_CHUNK_SIZE = 500
+
+# The snapshot of the tags read in the current request (see course_tags_snapshot),
+# as dicts of tag values keyed by (user id, course id), or None outside of requests.
+_SNAPSHOT = threading.local()
+
+
+def _snapshot():
+    """
+    Return the active tags snapshot of this thread, or None.
+    """
+    return getattr(_SNAPSHOT, 'tags', None)
+
+
+def start_snapshot():
+    """
+    Start keeping the tags read in this thread in a new snapshot, until end_snapshot is called.
+    """
+    _SNAPSHOT.tags = {}
+
+
+def end_snapshot():
+    """
+    Stop keeping the tags read in this thread, and drop them.
+    """
+    _SNAPSHOT.tags = None
+
+
+@contextmanager
+def course_tags_snapshot():
+    """
+    Context manager keeping the tags read in its body in memory, so that each
+    user's tags for a course are only queried once. Tags set in its body update
+    the snapshot. Does nothing if a snapshot is already active, as it is during
+    requests (see UserTagsEventContextMiddleware).
+    """
+    if _snapshot() is not None:
+        yield
+        return
+    start_snapshot()
+    try:
+        yield
+    finally:
+        end_snapshot()
+
+
+def _user_id(user):
+    """
+    Return the id of `user`, a User or a user id.
+    """
+    return getattr(user, 'pk', user)
+
+
+def get_course_tags(user, course_id):
+    """
+    Gets all of the user's course tags in the specified course_id, as a dict of
+    values by key. The dict must not be changed.
+
+    Args:
+        user: the User object (or user id) for the course tags
+        course_id: course identifier
+    """
+    snapshot = _snapshot()
+    cache_key = (_user_id(user), course_id)
+    if snapshot is not None and cache_key in snapshot:
+        return snapshot[cache_key]
+
+    tags = dict(
+        UserCourseTag.objects.filter(user=_user_id(user), course_id=course_id).values_list('key', 'value')
+    )
+    if snapshot is not None:
+        snapshot[cache_key] = tags
+    return tags
+
+
+def prefetch_course_tags(users, course_id):
+    """
+    Load the course tags in course_id of all of `users` (User objects or user ids)
+    into the active snapshot, with a query per PREFETCH_CHUNK_SIZE users, and
+    return them as a dict of tag dicts keyed by user id.
+
+    Reports should call it inside course_tags_snapshot(), so that get_course_tag
+    reads the prefetched tags.
+    """
+    user_ids = [_user_id(user) for user in users]
+    tags_by_user = dict((user_id, {}) for user_id in user_ids)
+    for start in xrange(0, len(user_ids), PREFETCH_CHUNK_SIZE):
+        records = UserCourseTag.objects.filter(
+            user__in=user_ids[start:start + PREFETCH_CHUNK_SIZE],
+            course_id=course_id,
+        ).values_list('user', 'key', 'value')
+        for user_id, key, value in records:
+            tags_by_user[user_id][key] = value
+
+    snapshot = _snapshot()
+    if snapshot is not None:
+        for user_id, tags in tags_by_user.iteritems():
+            snapshot[(user_id, course_id)] = tags
+    return tags_by_user
+
 
 def get_course_tag(user, course_id, key):
     """
@@ -28,6 +132,9 @@ def get_course_tag(user, course_id, key):
     Returns:
         string value, or None if there is no value saved
     """
+    if _snapshot() is not None:
+        return get_course_tags(user, course_id).get(key)
+
     try:
         record = UserCourseTag.objects.get(
             user=user,
@@ -62,5 +169,14 @@ def set_course_tag(user, course_id, key, value):
     record.value = value
     record.save()
 
+    snapshot = _snapshot()
+    cache_key = (_user_id(user), course_id)
+    if snapshot is not None and cache_key in snapshot:
+        # the dicts may be shared with callers of get_course_tags, so replace rather than update it
+        tags = dict(snapshot[cache_key])
+        # as it will be read back from the database
+        tags[key] = UserCourseTag._meta.get_field('value').to_python(value)  # pylint: disable=protected-access
+        snapshot[cache_key] = tags
+
     # TODO: There is a risk of IntegrityErrors being thrown here given
     # simultaneous calls from many processes.  Handle by retrying after a short delay?
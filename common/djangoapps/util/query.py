@@ -1,9 +1,94 @@
-""" Utility functions related to database queries """
+"""
+Utility functions related to database queries
+
+Reporting code (instructor analytics, grade reports, ...) makes heavy
+read-only queries, which should not compete with learner writes on the
+primary database. Such code runs in a reporting context::
+
+    with reporting_queries():
+        rows = StudentModule.objects.filter(course_id=course_id).values(...).annotate(...)
+
+or is decorated with `@reporting`. While it is active, ReadReplicaRouter sends
+the reads of the current thread to the database called 'read_replica', if
+there is one, and to the default database otherwise. Writes always go to the
+default database.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+READ_REPLICA = 'read_replica'
+
+_REPORTING = threading.local()
 
 
 def use_read_replica_if_available(queryset):
     """
     If there is a database called 'read_replica', use that database for the queryset.
     """
-    return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
\ No newline at end of file
+    return queryset.using(READ_REPLICA) if READ_REPLICA in settings.DATABASES else queryset
+
+
+def in_reporting_context():
+    """
+    Return whether the current thread is running reporting queries.
+    """
+    return getattr(_REPORTING, 'depth', 0) > 0
+
+
+@contextmanager
+def reporting_queries():
+    """
+    Context manager sending the reads made in its body to the read replica, if there is one.
+    Contexts can be nested.
+    """
+    _REPORTING.depth = getattr(_REPORTING, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _REPORTING.depth -= 1
+
+
+def reporting(func):
+    """
+    Decorator running `func` in a reporting context (see reporting_queries).
+
+    Generators only yield their values after the function returns, so they
+    should use use_read_replica_if_available on their querysets instead.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        """Call the wrapped function in a reporting context."""
+        with reporting_queries():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReadReplicaRouter(object):
+    """
+    Database router sending the reads made in a reporting context to the read
+    replica, if there is one. Everything else is left to the default routing,
+    except that objects read from the replica are saved to the default database.
+    """
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        """Use the read replica for reporting reads."""
+        if in_reporting_context() and READ_REPLICA in settings.DATABASES:
+            return READ_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        """Never write to the read replica."""
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == READ_REPLICA:  # pylint: disable=protected-access
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        """The read replica holds the same data as the default database."""
+        databases = set([obj1._state.db, obj2._state.db])  # pylint: disable=protected-access
+        if databases <= set([DEFAULT_DB_ALIAS, READ_REPLICA, None]):
+            return True
+        return None
@@ -0,0 +1,53 @@
+"""
+Tests for the read replica routing in util.query
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from util.query import ReadReplicaRouter, in_reporting_context, reporting, reporting_queries
+
+DATABASES_WITH_REPLICA = dict(settings.DATABASES, read_replica=settings.DATABASES['default'])
+
+
+class ReadReplicaRouterTest(TestCase):
+    """
+    Tests for ReadReplicaRouter and the reporting context.
+    """
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+
+    def test_reporting_context(self):
+        self.assertFalse(in_reporting_context())
+        with reporting_queries():
+            with reporting_queries():
+                self.assertTrue(in_reporting_context())
+            self.assertTrue(in_reporting_context())
+        self.assertFalse(in_reporting_context())
+
+    def test_reporting_decorator(self):
+        @reporting
+        def report():
+            """A reporting function."""
+            return in_reporting_context()
+
+        self.assertTrue(report())
+        self.assertFalse(in_reporting_context())
+
+    @override_settings(DATABASES=DATABASES_WITH_REPLICA)
+    def test_reads_with_replica(self):
+        self.assertIsNone(self.router.db_for_read(User))
+        with reporting_queries():
+            self.assertEqual(self.router.db_for_read(User), 'read_replica')
+
+    def test_reads_without_replica(self):
+        with reporting_queries():
+            self.assertIsNone(self.router.db_for_read(User))
+
+    def test_writes(self):
+        user = User(username='reporter')
+        self.assertIsNone(self.router.db_for_write(User, instance=user))
+        user._state.db = 'read_replica'  # pylint: disable=protected-access
+        self.assertEqual(self.router.db_for_write(User, instance=user), 'default')
+        self.assertTrue(self.router.allow_relation(user, User(username='other')))
@@ -3,6 +3,16 @@
 #
 # Used by responsetypes and capa_problem
 
+# The values of the properties of an answer_id when they are not set
+DEFAULT_PROPERTIES = {
+    'correctness': None,
+    'npoints': None,
+    'msg': '',
+    'hint': '',
+    'hintmode': None,
+    'queuestate': None,
+}
+
 
 class CorrectMap(object):
     """
@@ -68,6 +78,24 @@ class CorrectMap(object):
         """
         return self.cmap
 
+    def get_compact_dict(self):
+        """
+        Return a compact dict version of self, for storage: properties which have their
+        default value are left out, and answer_ids with nothing but a correctness map to
+        that correctness. set_dict reads it back.
+        """
+        compact = {}
+        for answer_id, properties in self.cmap.iteritems():
+            properties = dict(
+                (key, value) for key, value in properties.iteritems()
+                if key not in DEFAULT_PROPERTIES or value != DEFAULT_PROPERTIES[key]
+            )
+            if properties.keys() == ['correctness'] and not isinstance(properties['correctness'], dict):
+                compact[answer_id] = properties['correctness']
+            else:
+                compact[answer_id] = properties
+        return compact
+
     def set_dict(self, correct_map):
         """
         Set internal dict of CorrectMap to provided correct_map dict
@@ -83,20 +111,21 @@ class CorrectMap(object):
         mismatched keys will be gracefully ignored.
 
         Special migration case:
-            If correct_map is a one-level dict, then convert it to the new dict of dicts format.
+            If an entry of correct_map is not a dict, it is the correctness of the answer_id.
+            This reads the old one-level dict format, as well as the compact format of
+            get_compact_dict.
 
         """
         # empty current dict
         self.__init__()
 
         # create new dict entries
-        if correct_map and not isinstance(correct_map.values()[0], dict):
-            # special migration
-            for k in correct_map:
-                self.set(k, correctness=correct_map[k])
-        else:
-            for k in correct_map:
+        for k in correct_map:
+            if isinstance(correct_map[k], dict):
                 self.set(k, **correct_map[k])
+            else:
+                # special migration
+                self.set(k, correctness=correct_map[k])
 
     def is_correct(self, answer_id):
         if answer_id in self.cmap:
@@ -170,6 +170,34 @@ class CorrectMapTest(unittest.TestCase):
             self.cmap.get_dict()
         )
 
+    def test_compact_dict(self):
+        self.cmap.set(answer_id='1_2_1', correctness='correct')
+        self.cmap.set(answer_id='1_3_1', correctness='incorrect', npoints=0, msg='Test message')
+        self.cmap.set(answer_id='1_4_1', queuestate={'key': 'secretstring', 'time': '20130228100026'})
+
+        compact = self.cmap.get_compact_dict()
+        self.assertEqual(compact, {
+            '1_2_1': 'correct',
+            '1_3_1': {'correctness': 'incorrect', 'npoints': 0, 'msg': 'Test message'},
+            '1_4_1': {'queuestate': {'key': 'secretstring', 'time': '20130228100026'}},
+        })
+
+        # set_dict reads the compact dict back
+        other_cmap = CorrectMap()
+        other_cmap.set_dict(compact)
+        self.assertEqual(other_cmap.get_dict(), self.cmap.get_dict())
+
+    def test_set_dict_legacy(self):
+        # Full dicts and the old one-level format are still read
+        self.cmap.set_dict({
+            '1_2_1': {'correctness': 'correct', 'npoints': None, 'msg': '', 'hint': '',
+                      'hintmode': None, 'queuestate': None},
+            '1_3_1': 'incorrect',
+        })
+        self.assertTrue(self.cmap.is_correct('1_2_1'))
+        self.assertFalse(self.cmap.is_correct('1_3_1'))
+        self.assertEqual(self.cmap.get_msg('1_3_1'), '')
+
     def test_update_from_invalid(self):
         # Should get an exception if we try to update() a CorrectMap
         # with a non-CorrectMap value
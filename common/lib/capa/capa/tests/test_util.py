@@ -4,7 +4,7 @@ Tests capa util
 import unittest
 import textwrap
 from . import test_capa_system
-from capa.util import compare_with_tolerance, sanitize_html
+from capa.util import compare_with_tolerance, sanitize_html, compact_answer_ids, expand_answer_ids
 
 
 class UtilTest(unittest.TestCase):
@@ -83,6 +83,20 @@ class UtilTest(unittest.TestCase):
         self.assertTrue(result)
 
 
+    def test_compact_answer_ids(self):
+        answers = {
+            'i4x-MITx-100-problem-p1_2_1': 'choice_1',
+            'i4x-MITx-100-problem-p1_2_1_dynamath': '',
+            'i4x-MITx-100-problem-p12_2_1': 'choice_2',
+        }
+        compact = compact_answer_ids(answers, 'i4x-MITx-100-problem-p1')
+        self.assertEqual(compact, {
+            '_2_1': 'choice_1',
+            '_2_1_dynamath': '',
+            'i4x-MITx-100-problem-p12_2_1': 'choice_2',
+        })
+        self.assertEqual(expand_answer_ids(compact, 'i4x-MITx-100-problem-p1'), answers)
+
     def test_sanitize_html(self):
         """
         Test for html sanitization with bleach.
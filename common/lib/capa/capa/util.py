@@ -108,6 +108,34 @@ def convert_files_to_filenames(answers):
     return new_answers
 
 
+def compact_answer_ids(answers, problem_id):
+    """
+    Return a copy of `answers`, a dict keyed by answer ids, in which the ids of
+    the answers of the problem `problem_id` are shortened to the suffix they
+    add to the id of the problem. E.g. 'i4x-MITx-100-problem-p1_2_1' becomes
+    '_2_1' for the problem 'i4x-MITx-100-problem-p1'.
+
+    Answer ids are always derived from the id of their problem, so the ids of
+    the answers of other problems and the shortened ids can't be confused.
+    """
+    prefix = problem_id + '_'
+    return dict(
+        (key[len(problem_id):] if key.startswith(prefix) else key, value)
+        for key, value in answers.iteritems()
+    )
+
+
+def expand_answer_ids(answers, problem_id):
+    """
+    Return a copy of `answers`, a dict keyed by answer ids, with the answer ids
+    shortened by compact_answer_ids restored.
+    """
+    return dict(
+        (problem_id + key if key.startswith('_') else key, value)
+        for key, value in answers.iteritems()
+    )
+
+
 def is_list_of_files(files):
     return isinstance(files, list) and all(is_file(f) for f in files)
 
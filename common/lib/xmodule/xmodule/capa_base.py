@@ -22,7 +22,7 @@ from pkg_resources import resource_string
 from capa.capa_problem import LoncapaProblem, LoncapaSystem
 from capa.responsetypes import StudentInputError, \
     ResponseError, LoncapaProblemError
-from capa.util import convert_files_to_filenames
+from capa.util import convert_files_to_filenames, compact_answer_ids, expand_answer_ids
 from .progress import Progress
 from xmodule.exceptions import NotFoundError, ProcessingError
 from xblock.fields import Scope, String, Boolean, Dict, Integer, Float
@@ -41,6 +41,11 @@ NUM_RANDOMIZATION_BINS = 20
 # Never produce more than this many different seeds, no matter what.
 MAX_RANDOMIZATION_BINS = 1000
 
+# Since this version of the state, correct_map is stored with CorrectMap.get_compact_dict,
+# and the answer ids of correct_map and student_answers with capa.util.compact_answer_ids.
+# Earlier states have no version.
+COMPACT_STATE_VERSION = 2
+
 
 def randomization_bin(seed, problem_id):
     """
@@ -159,6 +164,10 @@ class CapaFields(object):
     input_state = Dict(help=_("Dictionary for maintaining the state of inputtypes"), scope=Scope.user_state)
     student_answers = Dict(help=_("Dictionary with the current student responses"), scope=Scope.user_state)
     done = Boolean(help=_("Whether the student has answered the problem"), scope=Scope.user_state)
+    state_version = Integer(
+        help=_("Version of the format of correct_map and student_answers"),
+        scope=Scope.user_state
+    )
     seed = Integer(help=_("Random seed for this student"), scope=Scope.user_state)
     last_submission_time = Date(help=_("Last submission time"), scope=Scope.user_state)
     submission_wait_seconds = Integer(
@@ -320,10 +329,16 @@ class CapaMixin(CapaFields):
         """
         Give a dictionary holding the state of the module
         """
+        correct_map = self.correct_map
+        student_answers = self.student_answers
+        if (self.state_version or 0) >= COMPACT_STATE_VERSION:
+            problem_id = self.location.html_id()
+            correct_map = expand_answer_ids(correct_map, problem_id)
+            student_answers = expand_answer_ids(student_answers, problem_id)
         return {
             'done': self.done,
-            'correct_map': self.correct_map,
-            'student_answers': self.student_answers,
+            'correct_map': correct_map,
+            'student_answers': student_answers,
             'input_state': self.input_state,
             'seed': self.seed,
         }
@@ -334,9 +349,11 @@ class CapaMixin(CapaFields):
         """
         lcp_state = self.lcp.get_state()
         self.done = lcp_state['done']
-        self.correct_map = lcp_state['correct_map']
+        # Stored in the compact format, see get_state_for_lcp
+        self.correct_map = compact_answer_ids(self.lcp.correct_map.get_compact_dict(), self.lcp.problem_id)
         self.input_state = lcp_state['input_state']
-        self.student_answers = lcp_state['student_answers']
+        self.student_answers = compact_answer_ids(lcp_state['student_answers'], self.lcp.problem_id)
+        self.state_version = COMPACT_STATE_VERSION
         self.seed = lcp_state['seed']
 
     def set_last_submission_time(self):
@@ -249,7 +249,21 @@ class LTI20ModuleMixin(object):
             scaled_score = None
 
         self.system.rebind_noauth_module_to_user(self, user)
+        self.set_module_score(user.id, scaled_score, max_score, comment)
 
+    def set_module_score(self, user_id, scaled_score, max_score, comment=u""):
+        """
+        Sets the grade and comment of the user the module is bound to, and publishes the grade
+
+        Arguments:
+            user_id (int):  id of the user the module is bound to
+            scaled_score (float):  user's score, in the range [0.0, max_score]
+            max_score (float):  max score that could have been achieved on this module
+            comment (unicode):  comments provided by the grader as feedback to the student
+
+        Returns:
+            nothing
+        """
         # have to publish for the progress page...
         self.system.publish(
             self,
@@ -257,7 +271,7 @@ class LTI20ModuleMixin(object):
             {
                 'value': scaled_score,
                 'max_value': max_score,
-                'user_id': user.id,
+                'user_id': user_id,
             },
         )
         self.module_score = scaled_score
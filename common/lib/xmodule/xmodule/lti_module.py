@@ -193,6 +193,7 @@ class LTIFields(object):
     )
 
 
+@XBlock.wants('lti_outcomes')
 class LTIModule(LTIFields, LTI20ModuleMixin, XModule):
     """
     Module provides LTI integration to course.
@@ -594,6 +595,11 @@ oauth_consumer_key="", oauth_signature="frVp4JuvT1mVXlxktiAUjQ7%2F1cw%3D"'}
               </imsx_POXBody>
             </imsx_POXEnvelopeRequest>
 
+        The replaceResultRequest may hold several resultRecords, to set the
+        scores of several users at once. Batches are only accepted when the
+        runtime provides the 'lti_outcomes' service, which queues the scores
+        to be written in the background, rather than writing them in the request.
+
         Example of correct/incorrect answer XML body:: see response_xml_template.
         """
         response_xml_template = textwrap.dedent("""\
@@ -636,7 +642,7 @@ oauth_consumer_key="", oauth_signature="frVp4JuvT1mVXlxktiAUjQ7%2F1cw%3D"'}
         }
 
         try:
-            imsx_messageIdentifier, sourcedId, score, action = self.parse_grade_xml_body(request.body)
+            imsx_messageIdentifier, action, records = self.parse_grade_xml_records(request.body)
         except Exception as e:
             error_message = "Request body XML parsing error: " + escape(e.message)
             log.debug("[LTI]: " + error_message)
@@ -653,22 +659,36 @@ oauth_consumer_key="", oauth_signature="frVp4JuvT1mVXlxktiAUjQ7%2F1cw%3D"'}
             log.debug("[LTI]: " + error_message)
             return Response(response_xml_template.format(**failure_values), content_type="application/xml")
 
-        real_user = self.system.get_real_user(urllib.unquote(sourcedId.split(':')[-1]))
-        if not real_user:  # that means we can't save to database, as we do not have real user id.
-            failure_values['imsx_messageIdentifier'] = escape(imsx_messageIdentifier)
-            failure_values['imsx_description'] = "User not found."
-            return Response(response_xml_template.format(**failure_values), content_type="application/xml")
-
-        if action == 'replaceResultRequest':
-            self.set_user_module_score(real_user, score, self.max_score())
-
+        scores = []
+        for sourcedId, score in records:
+            real_user = self.system.get_real_user(urllib.unquote(sourcedId.split(':')[-1]))
+            if not real_user:  # that means we can't save to database, as we do not have real user id.
+                failure_values['imsx_messageIdentifier'] = escape(imsx_messageIdentifier)
+                failure_values['imsx_description'] = "User not found."
+                return Response(response_xml_template.format(**failure_values), content_type="application/xml")
+            scores.append((real_user, score))
+
+        outcomes = self.runtime.service(self, 'lti_outcomes')
+        if action == 'replaceResultRequest' and (outcomes is not None or len(scores) == 1):
+            if outcomes is not None:
+                outcomes.replace_results(self, scores, self.max_score())
+                log.debug("[LTI]: Grades are queued.")
+            else:
+                self.set_user_module_score(scores[0][0], scores[0][1], self.max_score())
+                log.debug("[LTI]: Grade is saved.")
+
+            if len(records) == 1:
+                description = 'Score for {sourced_id} is now {score}'.format(
+                    sourced_id=records[0][0], score=records[0][1]
+                )
+            else:
+                description = 'Scores for {count} results are now set'.format(count=len(records))
             values = {
                 'imsx_codeMajor': 'success',
-                'imsx_description': 'Score for {sourced_id} is now {score}'.format(sourced_id=sourcedId, score=score),
+                'imsx_description': description,
                 'imsx_messageIdentifier': escape(imsx_messageIdentifier),
                 'response': '<replaceResultResponse/>'
             }
-            log.debug("[LTI]: Grade is saved.")
             return Response(response_xml_template.format(**values), content_type="application/xml")
 
         unsupported_values['imsx_messageIdentifier'] = escape(imsx_messageIdentifier)
@@ -683,7 +703,24 @@ oauth_consumer_key="", oauth_signature="frVp4JuvT1mVXlxktiAUjQ7%2F1cw%3D"'}
 
         XML body should contain nsmap with namespace, that is specified in LTI specs.
 
-        Returns tuple: imsx_messageIdentifier, sourcedId, score, action
+        Returns tuple: imsx_messageIdentifier, sourcedId, score, action,
+        of the first result record.
+
+        Raises Exception if can't parse.
+        """
+        imsx_messageIdentifier, action, records = cls.parse_grade_xml_records(body)
+        sourcedId, score = records[0]
+        return imsx_messageIdentifier, sourcedId, score, action
+
+    @classmethod
+    def parse_grade_xml_records(cls, body):
+        """
+        Parses XML from request.body and returns parsed data
+
+        XML body should contain nsmap with namespace, that is specified in LTI specs.
+
+        Returns tuple: imsx_messageIdentifier, action, and the list of the
+        (sourcedId, score) of each result record, in order.
 
         Raises Exception if can't parse.
         """
@@ -695,15 +732,20 @@ oauth_consumer_key="", oauth_signature="frVp4JuvT1mVXlxktiAUjQ7%2F1cw%3D"'}
         root = etree.fromstring(data, parser=parser)
 
         imsx_messageIdentifier = root.xpath("//def:imsx_messageIdentifier", namespaces=namespaces)[0].text
-        sourcedId = root.xpath("//def:sourcedId", namespaces=namespaces)[0].text
-        score = root.xpath("//def:textString", namespaces=namespaces)[0].text
+        records = []
+        for record in root.xpath("//def:resultRecord", namespaces=namespaces):
+            sourcedId = record.xpath(".//def:sourcedId", namespaces=namespaces)[0].text
+            score = record.xpath(".//def:textString", namespaces=namespaces)[0].text
+            # Raise exception if score is not float or not in range 0.0-1.0 regarding spec.
+            score = float(score)
+            if not 0 <= score <= 1:
+                raise LTIError('score value outside the permitted range of 0-1.')
+            records.append((sourcedId, score))
+        if not records:
+            raise LTIError('no result record.')
         action = root.xpath("//def:imsx_POXBody", namespaces=namespaces)[0].getchildren()[0].tag.replace('{'+lti_spec_namespace+'}', '')
-        # Raise exception if score is not float or not in range 0.0-1.0 regarding spec.
-        score = float(score)
-        if not 0 <= score <= 1:
-            raise LTIError('score value outside the permitted range of 0-1.')
 
-        return imsx_messageIdentifier, sourcedId, score, action
+        return imsx_messageIdentifier, action, records
 
     def verify_oauth_body_sign(self, request, content_type='application/x-www-form-urlencoded'):
         """
@@ -19,6 +19,7 @@ import copy
 import re
 from uuid import uuid4
 
+from bson.errors import InvalidDocument
 from bson.son import SON
 from fs.osfs import OSFS
 from path import path
@@ -43,6 +44,7 @@ from xblock.core import XBlock
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.keys import UsageKey, CourseKey
 from xmodule.exceptions import HeartbeatFailure
+from xmodule.modulestore.mongo.course_tree import CourseTree, course_tree_id, tree_block
 
 log = logging.getLogger(__name__)
 
@@ -50,6 +52,9 @@ log = logging.getLogger(__name__)
 # Things w/ these categories should never be marked as version=DRAFT
 DIRECT_ONLY_CATEGORIES = ['course', 'chapter', 'sequential', 'about', 'static_tab', 'course_info']
 
+# the number of course trees each store keeps in memory
+COURSE_TREE_CACHE_SIZE = 100
+
 # sort order that returns DRAFT items first
 SORT_REVISION_FAVOR_DRAFT = ('_id.revision', pymongo.DESCENDING)
 
@@ -378,6 +383,8 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 db
             )
             self.collection = self.database[collection]
+            # the flat trees of the courses in collection, see course_tree.py
+            self.course_trees = self.database[collection + '.course_trees']
 
             if user is not None and password is not None:
                 self.database.authenticate(user, password)
@@ -386,6 +393,8 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
 
         # Force mongo to report errors, at the expense of performance
         self.collection.write_concern = {'w': 1}
+        self.course_trees.write_concern = {'w': 1}
+        self._ensure_indexes()
 
         if default_class is not None:
             module_path, _, class_name = default_class.rpartition('.')
@@ -402,6 +411,26 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # bulk write operations
         self.ignore_write_events_on_courses = set()
         self._course_run_cache = {}
+        # the latest trees read by this process, as (generation, CourseTree) by course
+        self._course_tree_cache = {}
+
+    def _ensure_indexes(self):
+        """
+        Create the indexes which the queries of this store depend on (see mongo_indexes.md),
+        unless they already exist. They are built in the background so as not to block the
+        database when they are missing from a large collection.
+        """
+        course_fields = [('_id.tag', pymongo.ASCENDING), ('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING)]
+        self.collection.ensure_index(
+            course_fields + [
+                ('_id.category', pymongo.ASCENDING),
+                ('_id.name', pymongo.ASCENDING),
+                ('_id.revision', pymongo.ASCENDING),
+            ],
+            background=True
+        )
+        self.collection.ensure_index('_id.category', background=True)
+        self.collection.ensure_index(course_fields + [('definition.children', pymongo.ASCENDING)], background=True)
 
     def close_connections(self):
         """
@@ -423,8 +452,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
 
     def _begin_bulk_write_operation(self, course_id):
         """
-        Prevent updating the meta-data inheritance cache for the given course
+        Prevent updating the meta-data inheritance cache and the tree of the given course
         """
+        if course_id not in self.ignore_write_events_on_courses:
+            self._course_tree_changed(course_id)
         self.ignore_write_events_on_courses.add(course_id)
 
     def _end_bulk_write_operation(self, course_id):
@@ -435,6 +466,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         if course_id in self.ignore_write_events_on_courses:
             self.ignore_write_events_on_courses.remove(course_id)
             self.refresh_cached_metadata_inheritance_tree(course_id)
+            self._course_tree_changed(course_id)
 
     def _is_bulk_write_in_progress(self, course_id):
         """
@@ -599,6 +631,80 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
+    def _get_course_tree(self, course_key):
+        """
+        Return the CourseTree of the course, from memory or the course trees collection,
+        building it from the modulestore collection if it isn't up to date.
+
+        Returns None during bulk write operations on the course, when the tree changes with
+        every write; callers should query the modulestore collection instead.
+        """
+        if self._is_bulk_write_in_progress(course_key):
+            return None
+
+        tree_id = course_tree_id(course_key)
+        cache_key = u'{}/{org}/{course}'.format(self.collection.name, **tree_id)
+
+        # The generation is always read, even if the tree is in memory, so that changes
+        # made by other processes are seen, whether or not this runs in a request.
+        tree_doc = self.course_trees.find_one({'_id': tree_id}, {'generation': True, 'built': True})
+        generation = tree_doc['generation'] if tree_doc is not None else 0
+        cached = self._course_tree_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        # only fetch the blocks if the tree isn't already in memory
+        if tree_doc is not None and tree_doc.get('built'):
+            tree_doc = self.course_trees.find_one({'_id': tree_id})
+            if tree_doc is not None and tree_doc.get('built') and tree_doc['generation'] == generation:
+                tree = CourseTree(tree_doc['blocks'])
+                self._cache_course_tree(cache_key, generation, tree)
+                return tree
+
+        items = self.collection.find(
+            self._course_key_to_son(course_key), {'_id': True, 'definition.children': True}
+        )
+        blocks = [tree_block(item) for item in items]
+        tree = CourseTree(blocks)
+        try:
+            # only save the tree if the course wasn't changed since reading the generation
+            self.course_trees.update(
+                {'_id': tree_id, 'generation': generation},
+                {'$set': {'blocks': blocks, 'built': True}},
+                upsert=True
+            )
+        except pymongo.errors.DuplicateKeyError:
+            # the course changed, and its tree was invalidated, while the tree was being built
+            return tree
+        except (pymongo.errors.OperationFailure, InvalidDocument):
+            # most likely, the tree is over the document size limit. It is still kept in
+            # memory, until the course changes.
+            log.warning("Could not save the tree of %s", course_key, exc_info=True)
+        self._cache_course_tree(cache_key, generation, tree)
+        return tree
+
+    def _cache_course_tree(self, cache_key, generation, tree):
+        """
+        Keep the `generation` of the tree of a course in memory, for as long as it is up to date.
+        """
+        if len(self._course_tree_cache) >= COURSE_TREE_CACHE_SIZE:
+            self._course_tree_cache.clear()
+        self._course_tree_cache[cache_key] = (generation, tree)
+
+    def _course_tree_changed(self, course_key):
+        """
+        Invalidate the tree of the course after its blocks or their children were changed.
+        During bulk write operations, the tree is only invalidated once the operation ends.
+        """
+        if self._is_bulk_write_in_progress(course_key):
+            return
+        tree_id = course_tree_id(course_key)
+        self.course_trees.update(
+            {'_id': tree_id},
+            {'$inc': {'generation': 1}, '$unset': {'blocks': True, 'built': True}},
+            upsert=True
+        )
+
     def _clean_item_data(self, item):
         """
         Renames the '_id' field in item to 'location'
@@ -1067,12 +1173,17 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         )
         if result['n'] == 0:
             raise ItemNotFoundError(location)
+        if 'definition.children' in update or not result.get('updatedExisting', True):
+            # a new block, or maybe new children
+            self._course_tree_changed(location.course_key)
 
     def _update_ancestors(self, location, update):
         """
         Recursively applies update to all the ancestors of location
         """
-        parent = self._get_raw_parent_location(as_published(location), ModuleStoreEnum.RevisionOption.draft_preferred)
+        parent = self._get_raw_parent_location(
+            as_published(location), ModuleStoreEnum.RevisionOption.draft_preferred, use_course_tree=False
+        )
         if parent:
             self._update_single_item(parent, update)
             self._update_ancestors(parent, update)
@@ -1160,49 +1271,67 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                         value[key] = subvalue.to_deprecated_string()
         return jsonfields
 
-    def _get_raw_parent_location(self, location, revision=ModuleStoreEnum.RevisionOption.published_only):
+    def _get_raw_parent_location(self, location, revision=ModuleStoreEnum.RevisionOption.published_only,
+                                 use_course_tree=True):
         '''
         Helper for get_parent_location that finds the location that is the parent of this location in this course,
         but does NOT return a version agnostic location.
+
+        Write paths pass use_course_tree=False, so as not to rebuild the tree they just invalidated.
         '''
         assert location.revision is None
         assert revision == ModuleStoreEnum.RevisionOption.published_only \
             or revision == ModuleStoreEnum.RevisionOption.draft_preferred
 
-        # create a query with tag, org, course, and the children field set to the given location
-        query = self._course_key_to_son(location.course_key)
-        query['definition.children'] = location.to_deprecated_string()
+        # the parents, DRAFT first
+        parents = self._find_raw_parents(location, use_course_tree)
 
-        # if only looking for the PUBLISHED parent, set the revision in the query to None
+        # if only looking for the PUBLISHED parent, ignore the DRAFT ones
         if revision == ModuleStoreEnum.RevisionOption.published_only:
-            query['_id.revision'] = MongoRevisionKey.published
-
-        # query the collection, sorting by DRAFT first
-        parents = self.collection.find(query, {'_id': True}, sort=[SORT_REVISION_FAVOR_DRAFT])
+            parents = [parent for parent in parents if parent.get('revision') == MongoRevisionKey.published]
 
-        if parents.count() == 0:
+        if len(parents) == 0:
             # no parents were found
             return None
 
         if revision == ModuleStoreEnum.RevisionOption.published_only:
-            if parents.count() > 1:
+            if len(parents) > 1:
                 # should never have multiple PUBLISHED parents
                 raise ReferentialIntegrityError(
-                    u"{} parents claim {}".format(parents.count(), location)
+                    u"{} parents claim {}".format(len(parents), location)
                 )
             else:
                 # return the single PUBLISHED parent
-                return Location._from_deprecated_son(parents[0]['_id'], location.course_key.run)
+                return Location._from_deprecated_son(parents[0], location.course_key.run)
         else:
             # there could be 2 different parents if
             #   (1) the draft item was moved or
             #   (2) the parent itself has 2 versions: DRAFT and PUBLISHED
 
-            # since we sorted by SORT_REVISION_FAVOR_DRAFT, the 0'th parent is the one we want
-            found_id = parents[0]['_id']
+            # since they're sorted DRAFT first, the 0'th parent is the one we want
+            found_id = parents[0]
             # don't disclose revision outside modulestore
             return Location._from_deprecated_son(found_id, location.course_key.run)
 
+    def _find_raw_parents(self, location, use_course_tree=True):
+        """
+        Return the `_id`s of all the (DRAFT and PUBLISHED) blocks of the course which have
+        `location` as a child, DRAFT first, from the course tree if `use_course_tree` and it
+        is available.
+        """
+        child_url = location.to_deprecated_string()
+        tree = self._get_course_tree(location.course_key) if use_course_tree else None
+        if tree is not None:
+            return tree.parents(child_url)
+
+        # create a query with tag, org, course, and the children field set to the given location
+        query = self._course_key_to_son(location.course_key)
+        query['definition.children'] = child_url
+        return [
+            parent['_id']
+            for parent in self.collection.find(query, {'_id': True}, sort=[SORT_REVISION_FAVOR_DRAFT])
+        ]
+
     def get_parent_location(self, location, revision=ModuleStoreEnum.RevisionOption.published_only, **kwargs):
         '''
         Find the location that is the parent of this location in this course.
@@ -1237,18 +1366,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         """
         course_key = self.fill_in_run(course_key)
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
-        query = self._course_key_to_son(course_key)
-        query['_id.category'] = {'$nin': detached_categories}
-        all_items = self.collection.find(query)
+        tree = self._get_course_tree(course_key)
+        if tree is not None:
+            all_items = tree.blocks
+        else:
+            query = self._course_key_to_son(course_key)
+            all_items = [tree_block(item) for item in self.collection.find(query, {'_id': True, 'definition.children': True})]
         all_reachable = set()
         item_locs = set()
         for item in all_items:
-            if item['_id']['category'] != 'course':
+            if item['location']['category'] in detached_categories:
+                continue
+            if item['location']['category'] != 'course':
                 # It would be nice to change this method to return UsageKeys instead of the deprecated string.
                 item_locs.add(
-                    as_published(Location._from_deprecated_son(item['_id'], course_key.run)).to_deprecated_string()
+                    as_published(Location._from_deprecated_son(item['location'], course_key.run)).to_deprecated_string()
                 )
-            all_reachable = all_reachable.union(item.get('definition', {}).get('children', []))
+            all_reachable.update(item.get('children', []))
         item_locs -= all_reachable
         return [course_key.make_usage_key_from_deprecated_string(item_loc) for item_loc in item_locs]
 
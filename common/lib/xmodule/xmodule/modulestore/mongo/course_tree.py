@@ -0,0 +1,71 @@
+"""
+The flat per-course trees MongoModuleStore keeps next to its modulestore
+collection, so that parent and orphan lookups don't have to query the
+`definition.children` arrays of the whole course.
+
+The tree of a course is one document, keyed by the course's org and course
+(which is how the modulestore collection identifies courses), listing the `_id`
+and children of every block of the course, drafts included::
+
+    {
+        '_id': {'org': ..., 'course': ...},
+        'generation': 12,
+        'blocks': [{'location': {'tag': 'i4x', ..., 'revision': None}, 'children': [...]}, ...],
+    }
+
+Writes which may change the blocks or children of a course increment its
+`generation` and drop its `blocks`. The tree is rebuilt from the modulestore
+collection by the next reader, which only saves it if the generation didn't
+change in the meantime, so that a tree built before a write never replaces
+the invalidation of that write.
+"""
+from collections import defaultdict
+
+from bson.son import SON
+
+
+def course_tree_id(course_key):
+    """
+    Return the `_id` of the tree of the course `course_key`.
+    """
+    return SON([('org', course_key.org), ('course', course_key.course)])
+
+
+def tree_block(item):
+    """
+    Return the entry of the tree for `item`, a document of the modulestore
+    collection with (at least) its `_id` and `definition.children`.
+    """
+    block = {'location': item['_id']}
+    children = item.get('definition', {}).get('children')
+    if children:
+        block['children'] = children
+    return block
+
+
+class CourseTree(object):
+    """
+    The blocks of a course, and their parents.
+    """
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self._parents = defaultdict(list)
+        for block in blocks:
+            for child in block.get('children', ()):
+                self._parents[child].append(block['location'])
+        # Drafts first, like SORT_REVISION_FAVOR_DRAFT.
+        for parents in self._parents.itervalues():
+            parents.sort(key=lambda location: location.get('revision') is None)
+
+    def parents(self, child_url):
+        """
+        Return the `_id`s of the blocks (draft or published) which list the
+        deprecated string `child_url` in their children, drafts first.
+        """
+        return self._parents.get(child_url, [])
+
+    def has_parents(self, child_url):
+        """
+        Return whether any block lists `child_url` in its children.
+        """
+        return child_url in self._parents
@@ -155,6 +155,7 @@ class DraftModuleStore(MongoModuleStore):
         # delete all of the db records for the course
         course_query = self._course_key_to_son(course_key)
         self.collection.remove(course_query, multi=True)
+        self._course_tree_changed(course_key)
 
     def clone_course(self, source_course_id, dest_course_id, user_id):
         """
@@ -238,24 +239,20 @@ class DraftModuleStore(MongoModuleStore):
         """
         _verify_revision_is_published(location)
 
-        # create a query to find all items in the course that have the given location listed as a child
-        query = self._course_key_to_son(location.course_key)
-        query['definition.children'] = location.to_deprecated_string()
-
-        # find all the items that satisfy the query
-        parents = self.collection.find(query, {'_id': True}, sort=[SORT_REVISION_FAVOR_DRAFT])
+        # find all the items in the course that have the given location listed as a child
+        parents = self._find_raw_parents(location)
 
         # return only the parent(s) that satisfy the request
         return [
-            Location._from_deprecated_son(parent['_id'], location.course_key.run)
+            Location._from_deprecated_son(parent, location.course_key.run)
             for parent in parents
             if (
                 # return all versions of the parent if revision is ModuleStoreEnum.RevisionOption.all
                 key_revision == ModuleStoreEnum.RevisionOption.all or
                 # return this parent if it's direct-only, regardless of which revision is requested
-                parent['_id']['category'] in DIRECT_ONLY_CATEGORIES or
+                parent['category'] in DIRECT_ONLY_CATEGORIES or
                 # return this parent only if its revision matches the requested one
-                parent['_id']['revision'] == key_revision
+                parent['revision'] == key_revision
             )
         ]
 
@@ -586,6 +583,7 @@ class DraftModuleStore(MongoModuleStore):
 
         _internal([root_usage.to_deprecated_son() for root_usage in root_usages])
         self.collection.remove({'_id': {'$in': to_be_deleted}}, safe=self.collection.safe)
+        self._course_tree_changed(root_usages[0].course_key)
 
     def has_changes(self, location):
         """
@@ -682,6 +680,7 @@ class DraftModuleStore(MongoModuleStore):
         _internal_depth_first(location, True)
         if len(to_be_deleted) > 0:
             self.collection.remove({'_id': {'$in': to_be_deleted}})
+            self._course_tree_changed(location.course_key)
         return self.get_item(as_published(location))
 
     def unpublish(self, location, user_id):
@@ -0,0 +1,52 @@
+"""
+The writes split buffers during bulk write operations (see
+SplitMongoModuleStore._begin_bulk_write_operation).
+
+Rather than writing a new structure version, and moving the course index to
+it, for each change, the changes made to a course during a bulk write operation
+all go into one new structure per branch, which is changed in place in memory.
+The new definitions, the structures and the course index are written once,
+when the outermost bulk write operation on the course ends.
+
+Like continue_version, this means that all the blocks changed during the
+operation get the same update_version. So that the changes made to a draft after
+it was published are still told apart, and published, a structure which is
+copied from (published) is sealed: the next change to it starts a new version.
+"""
+from collections import OrderedDict
+
+
+def bulk_write_key(course_key):
+    """
+    Return the key of the bulk write operations on the course of `course_key`,
+    whatever its branch and version, or None if it doesn't identify a course.
+    """
+    if course_key.org is None or course_key.course is None or course_key.run is None:
+        return None
+    return (course_key.org, course_key.course, course_key.run)
+
+
+class BulkWriteRecord(object):
+    """
+    The writes to a course buffered during a bulk write operation:
+
+    * index: the course index, as changed by the operation (None until it is first read)
+    * initial_index: a copy of the course index as it was first read, to tell whether it changed
+    * structures: the structures created by the operation, by id, in the order they were created
+    * sealed: the ids of the structures in `structures` which must not be changed in place anymore
+    * definitions: the definitions created for the course by the operation, by id, in the order they were created
+    """
+    def __init__(self):
+        self.nesting = 0
+        self.index = None
+        self.initial_index = None
+        self.structures = OrderedDict()
+        self.sealed = set()
+        self.definitions = OrderedDict()
+
+    def is_open(self, version_guid):
+        """
+        Return whether the structure `version_guid` was created by this operation,
+        and can still be changed in place.
+        """
+        return version_guid in self.structures and version_guid not in self.sealed
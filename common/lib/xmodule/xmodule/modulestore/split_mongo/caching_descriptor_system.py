@@ -9,6 +9,7 @@ from xmodule.errortracker import exc_info_to_str
 from xmodule.modulestore.split_mongo import encode_key_for_mongo
 from ..exceptions import ItemNotFoundError
 from .split_mongo_kvs import SplitMongoKVS
+from .definition_lazy_loader import DefinitionPrefetcher
 
 log = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
 
     Computes the settings (nee 'metadata') inheritance upon creation.
     """
-    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, **kwargs):
+    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, prepared_structure=None, **kwargs):
         """
         Computes the settings inheritance and sets up the cache.
 
@@ -33,6 +34,11 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
 
         module_data: a dict mapping Location -> json that was cached from the
             underlying modulestore
+
+        prepared_structure: the PreparedStructure of course_entry's structure, if any. Its
+        inheritance is used instead of computing it again.
+
+        Neither the structure nor its blocks are changed: the system keeps copies of the blocks it loads.
         """
         super(CachingDescriptorSystem, self).__init__(
             field_data=None,
@@ -43,15 +49,19 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
         self.course_entry = course_entry
         self.lazy = lazy
         self.module_data = module_data
-        # Compute inheritance
-        modulestore.inherit_settings(
-            course_entry['structure'].get('blocks', {}),
-            course_entry['structure'].get('blocks', {}).get(
-                encode_key_for_mongo(course_entry['structure'].get('root'))
+        self.prepared_structure = prepared_structure
+        # Compute inheritance, keyed by encoded block id. It's kept apart from the structure, which
+        # may be shared (e.g., with a bulk write operation) and so must not be changed.
+        if prepared_structure is None:
+            self.inherited_settings = modulestore._compute_inherited_settings(  # pylint: disable=protected-access
+                course_entry['structure']
             )
-        )
+        else:
+            self.inherited_settings = prepared_structure.inherited_settings
         self.default_class = default_class
         self.local_modules = {}
+        # batches the fetches of the lazily loaded definitions
+        self.definition_prefetcher = DefinitionPrefetcher(modulestore, course_entry['structure'])
 
     def _load_item(self, block_id, course_entry_override=None):
         if isinstance(block_id, BlockUsageLocator):
@@ -119,13 +129,18 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
             block_id=block_id,
         )
 
+        # convert a copy of the fields, which belong to the structure
         converted_fields = self.modulestore.convert_references_to_keys(
-            block_locator.course_key, class_, json_data.get('fields', {}), self.course_entry['structure']['blocks'],
+            block_locator.course_key, class_, dict(json_data.get('fields', {})),
+            self.course_entry['structure']['blocks'],
         )
+        inherited_settings = json_data.get('_inherited_settings')
+        if inherited_settings is None and not isinstance(block_id, LocalId):
+            inherited_settings = self.inherited_settings.get(encode_key_for_mongo(block_id))
         kvs = SplitMongoKVS(
             definition,
             converted_fields,
-            json_data.get('_inherited_settings'),
+            inherited_settings,
         )
         field_data = KvsFieldData(kvs)
 
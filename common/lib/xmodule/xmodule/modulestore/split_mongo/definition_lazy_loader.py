@@ -1,4 +1,7 @@
+from collections import deque
+
 from opaque_keys.edx.locator import DefinitionLocator
+from xmodule.modulestore.split_mongo import encode_key_for_mongo, decode_key_from_mongo
 
 
 class DefinitionLazyLoader(object):
@@ -8,19 +11,104 @@ class DefinitionLazyLoader(object):
     object doesn't force access during init but waits until client wants the
     definition. Only works if the modulestore is a split mongo store.
     """
-    def __init__(self, modulestore, block_type, definition_id, field_converter):
+    def __init__(self, modulestore, block_type, definition_id, field_converter, block_id=None, prefetcher=None):
         """
         Simple placeholder for yet-to-be-fetched data
         :param modulestore: the pymongo db connection with the definitions
         :param definition_locator: the id of the record in the above to fetch
+        :param block_id: the block this is the definition of
+        :param prefetcher: the DefinitionPrefetcher to fetch the definition with, along with
+        those of the blocks around block_id
         """
         self.modulestore = modulestore
         self.definition_locator = DefinitionLocator(block_type, definition_id)
         self.field_converter = field_converter
+        self.block_id = block_id
+        self.prefetcher = prefetcher
 
     def fetch(self):
         """
         Fetch the definition. Note, the caller should replace this lazy
         loader pointer with the result so as not to fetch more than once
         """
-        return self.modulestore.db_connection.get_definition(self.definition_locator.definition_id)
+        if self.prefetcher is not None and self.block_id is not None:
+            return self.prefetcher.fetch(self.block_id, self.definition_locator.definition_id)
+        return self.modulestore._get_definition(self.definition_locator.definition_id)  # pylint: disable=protected-access
+
+
+class DefinitionPrefetcher(object):
+    """
+    Fetches the definitions of a structure's lazily loaded blocks in batches.
+
+    When the definition of a block is needed, the definitions of its siblings and
+    of their descendants are likely to be needed soon too (e.g., when rendering
+    the problems of a vertical); so, they are fetched along with it in a single query,
+    breadth first from the block's parent, up to max_batch_size definitions.
+    """
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, modulestore, structure, max_batch_size=MAX_BATCH_SIZE):
+        """
+        :param modulestore: the split modulestore to fetch the definitions from
+        :param structure: the structure whose blocks' definitions are fetched
+        """
+        self.modulestore = modulestore
+        self.block_map = structure.get('blocks', {})
+        self.max_batch_size = max_batch_size
+        # definitions fetched in a batch but not asked for yet, by id
+        self.prefetched = {}
+        # ids of the definitions handed out, which won't be fetched again
+        self.fetched_ids = set()
+        self._parents = None
+
+    def fetch(self, block_id, definition_id):
+        """
+        Return the definition `definition_id` of the block `block_id`, fetching it
+        along with the definitions of the blocks around it if it wasn't already.
+        """
+        if definition_id not in self.prefetched:
+            batch = self._batch(block_id, definition_id)
+            for definition in self.modulestore._find_definitions(batch):  # pylint: disable=protected-access
+                self.prefetched[definition['_id']] = definition
+        self.fetched_ids.add(definition_id)
+        # the definition is handed over to the caller, which keeps it for as long as it needs
+        return self.prefetched.pop(definition_id, None)
+
+    def _batch(self, block_id, definition_id):
+        """
+        Return the ids of the definitions to fetch along with `definition_id`.
+        """
+        batch = [definition_id]
+        seen = set(batch)
+        queue = deque([self._parent(block_id) or block_id])
+        while queue and len(batch) < self.max_batch_size:
+            block = self.block_map.get(encode_key_for_mongo(queue.popleft()))
+            if block is None:
+                continue
+            block_definition_id = _definition_id(block.get('definition'))
+            if block_definition_id is not None and block_definition_id not in seen and \
+                    block_definition_id not in self.fetched_ids and block_definition_id not in self.prefetched:
+                seen.add(block_definition_id)
+                batch.append(block_definition_id)
+            queue.extend(block.get('fields', {}).get('children', []))
+        return batch
+
+    def _parent(self, block_id):
+        """
+        Return the id of the parent of the block `block_id`, if it has one.
+        """
+        if self._parents is None:
+            self._parents = {}
+            for parent_id, block in self.block_map.iteritems():
+                for child_id in block.get('fields', {}).get('children', []):
+                    self._parents[child_id] = decode_key_from_mongo(parent_id)
+        return self._parents.get(block_id)
+
+
+def _definition_id(definition):
+    """
+    Return the id of a block's definition, which is either its id or a DefinitionLazyLoader.
+    """
+    if isinstance(definition, DefinitionLazyLoader):
+        return definition.definition_locator.definition_id
+    return definition
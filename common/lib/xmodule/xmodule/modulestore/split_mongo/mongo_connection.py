@@ -139,4 +139,10 @@ class MongoConnection(object):
         """
         self.definitions.insert(definition)
 
+    def insert_definitions(self, definitions):
+        """
+        Create the definitions in the db in one batch
+        """
+        self.definitions.insert(definitions)
+
 
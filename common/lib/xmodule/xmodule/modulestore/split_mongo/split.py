@@ -73,6 +73,8 @@ from xmodule.modulestore import (
 from ..exceptions import ItemNotFoundError
 from .definition_lazy_loader import DefinitionLazyLoader
 from .caching_descriptor_system import CachingDescriptorSystem
+from .structure_cache import PreparedStructure, StructureCache
+from .bulk_write import BulkWriteRecord, bulk_write_key
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
 from xmodule.error_module import ErrorDescriptor
 from xmodule.modulestore.split_mongo import encode_key_for_mongo, decode_key_from_mongo
@@ -113,14 +115,19 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
     # It won't recompute the value on operations such as update_course_index (e.g., to revert to a prev
     # version) but those functions will have an optional arg for setting these.
     SEARCH_TARGET_DICT = ['wiki_slug']
+    # the default number of structure versions whose inheritance and descendants are kept
+    # in the process-level cache (see structure_cache)
+    DEFAULT_STRUCTURE_CACHE_SIZE = 100
 
     def __init__(self, contentstore, doc_store_config, fs_root, render_template,
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None,
+                 structure_cache_size=DEFAULT_STRUCTURE_CACHE_SIZE,
                  **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_size: how many structure versions to keep prepared across threads; 0 disables it.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
@@ -132,6 +139,11 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         # Code review question: How should I expire entries?
         # _add_cache could use a lru mechanism to control the cache size?
         self.thread_cache = threading.local()
+        # the descriptor systems above can't be shared between threads, but the inheritance and
+        # descendants computed for a structure version can
+        self.structure_cache = StructureCache(structure_cache_size)
+        # the BulkWriteRecords of the bulk write operations in progress in each thread
+        self._bulk_writes = threading.local()
 
         if default_class is not None:
             module_path, __, class_name = default_class.rpartition('.')
@@ -173,28 +185,42 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         :param lazy: whether to fetch definitions or use placeholders
         '''
         new_module_data = {}
+        block_map = system.course_entry['structure']['blocks']
+        prepared = system.prepared_structure
         for block_id in base_block_ids:
-            new_module_data = self.descendants(
-                system.course_entry['structure']['blocks'],
-                block_id,
-                depth,
-                new_module_data
-            )
-
+            if prepared is None:
+                new_module_data = self.descendants(block_map, block_id, depth, new_module_data)
+                continue
+            descendant_ids = prepared.descendant_ids.get((block_id, depth))
+            if descendant_ids is None:
+                descendant_ids = tuple(self.descendants(block_map, block_id, depth, {}))
+                prepared.descendant_ids[(block_id, depth)] = descendant_ids
+            for descendant_id in descendant_ids:
+                new_module_data.setdefault(descendant_id, block_map[encode_key_for_mongo(descendant_id)])
+
+        # the system gets its own copy of each block, as the structure may be shared (e.g., by
+        # the descriptor systems and the writes of a bulk write operation)
+        new_module_data = {
+            block_id: dict(block)
+            for block_id, block in new_module_data.iteritems()
+            if block_id not in system.module_data
+        }
         if lazy:
-            for block in new_module_data.itervalues():
+            for block_id, block in new_module_data.iteritems():
                 block['definition'] = DefinitionLazyLoader(
                     self, block['category'], block['definition'],
-                    lambda fields: self.convert_references_to_keys(
-                        course_key, system.load_block_type(block['category']),
+                    lambda fields, block_type=block['category']: self.convert_references_to_keys(
+                        course_key, system.load_block_type(block_type),
                         fields, system.course_entry['structure']['blocks'],
-                    )
+                    ),
+                    block_id=block_id,
+                    prefetcher=system.definition_prefetcher,
                 )
         else:
             # Load all descendants by id
-            descendent_definitions = self.db_connection.find_matching_definitions({
-                '_id': {'$in': [block['definition']
-                                for block in new_module_data.itervalues()]}})
+            descendent_definitions = self._find_definitions(
+                [block['definition'] for block in new_module_data.itervalues()]
+            )
             # turn into a map
             definitions = {definition['_id']: definition
                            for definition in descendent_definitions}
@@ -206,6 +232,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                         definitions[block['definition']].get('fields'),
                         system.course_entry['structure']['blocks'],
                     )
+                    block['fields'] = dict(block['fields'])
                     block['fields'].update(converted_fields)
 
         system.module_data.update(new_module_data)
@@ -228,6 +255,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 course_entry=course_entry,
                 module_data={},
                 lazy=lazy,
+                prepared_structure=self._get_prepared_structure(course_entry['structure']),
                 default_class=self.default_class,
                 error_tracker=self.error_tracker,
                 render_template=self.render_template,
@@ -247,6 +275,33 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             self.cache_items(system, block_ids, course_key, depth, lazy)
         return [system.load_item(block_id, course_entry) for block_id in block_ids]
 
+    def _get_prepared_structure(self, structure):
+        """
+        Return the PreparedStructure of this structure from the process-level cache,
+        computing its inheritance if it isn't there yet.
+        """
+        prepared = self.structure_cache.get(structure['_id'])
+        if prepared is None:
+            prepared = PreparedStructure(structure, self._compute_inherited_settings(structure))
+            self.structure_cache.add(prepared)
+        return prepared
+
+    def _compute_inherited_settings(self, structure):
+        """
+        Return the settings inherited by each block of the structure, keyed by encoded block_id,
+        without changing the structure itself.
+        """
+        block_map = {
+            block_id: {'fields': block.get('fields', {})}
+            for block_id, block in structure.get('blocks', {}).iteritems()
+        }
+        self.inherit_settings(block_map, block_map.get(encode_key_for_mongo(structure.get('root'))))
+        return {
+            block_id: block_json['_inherited_settings']
+            for block_id, block_json in block_map.iteritems()
+            if '_inherited_settings' in block_json
+        }
+
     def _get_cache(self, course_version_guid):
         """
         Find the descriptor cache for this course if it exists
@@ -278,8 +333,183 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 del self.thread_cache.course_cache[course_version_guid]
             except KeyError:
                 pass
+            self.structure_cache.remove(course_version_guid)
         else:
             self.thread_cache.course_cache = {}
+            self.structure_cache.clear()
+
+    def _begin_bulk_write_operation(self, course_id):
+        """
+        Buffer the writes to the given course until the outermost bulk write operation on it ends.
+        See bulk_write.
+        """
+        key = bulk_write_key(course_id)
+        if key is None:
+            return
+        record = self._bulk_write_records().setdefault(key, BulkWriteRecord())
+        record.nesting += 1
+
+    def _end_bulk_write_operation(self, course_id):
+        """
+        Write the new definitions, the structures and the course index changed by the outermost
+        bulk write operation on the given course, in that order so that nothing points to what
+        isn't written yet.
+        """
+        records = self._bulk_write_records()
+        key = bulk_write_key(course_id)
+        record = records.get(key)
+        if record is None:
+            return
+        record.nesting -= 1
+        if record.nesting > 0:
+            return
+        del records[key]
+
+        if record.definitions:
+            self.db_connection.insert_definitions(record.definitions.values())
+        for version_guid, structure in record.structures.iteritems():
+            self.db_connection.insert_structure(structure)
+            self._clear_cache(version_guid)
+        if record.index is not None and record.index != record.initial_index:
+            self.db_connection.update_course_index(record.index)
+
+    def _bulk_write_records(self):
+        """
+        Return the BulkWriteRecords of the bulk write operations in progress in this thread, by bulk_write_key.
+        """
+        if not hasattr(self._bulk_writes, 'records'):
+            self._bulk_writes.records = {}
+        return self._bulk_writes.records
+
+    def _get_bulk_write(self, course_key):
+        """
+        Return the BulkWriteRecord of the bulk write operation in progress on the given course, if any.
+        """
+        key = bulk_write_key(course_key)
+        return self._bulk_write_records().get(key) if key is not None else None
+
+    def _get_open_bulk_write(self, version_guid):
+        """
+        Return the BulkWriteRecord of the operation which created the structure version_guid,
+        if it can still be changed in place.
+        """
+        for record in self._bulk_write_records().itervalues():
+            if record.is_open(version_guid):
+                return record
+        return None
+
+    def _seal_structure(self, version_guid):
+        """
+        Make the next change to the structure version_guid create a new version, if it was
+        created by a bulk write operation in progress.
+        """
+        for record in self._bulk_write_records().itervalues():
+            if version_guid in record.structures:
+                record.sealed.add(version_guid)
+
+    def _get_course_index(self, course_key, ignore_case=False):
+        """
+        Get the course index of the given course, as changed by the bulk write operation on it, if any.
+        """
+        record = self._get_bulk_write(course_key)
+        if record is None or ignore_case:
+            return self.db_connection.get_course_index(course_key, ignore_case)
+        if record.index is None:
+            record.index = self.db_connection.get_course_index(course_key)
+            record.initial_index = copy.deepcopy(record.index)
+        return record.index
+
+    def _update_course_index(self, index_entry):
+        """
+        Save the changed course index, unless a bulk write operation on the course is in progress.
+        """
+        record = self._get_bulk_write(CourseLocator(index_entry['org'], index_entry['course'], index_entry['run']))
+        if record is None:
+            self.db_connection.update_course_index(index_entry)
+        else:
+            record.index = index_entry
+
+    def _get_structure(self, version_guid):
+        """
+        Get the structure version_guid, from the bulk write operations in progress if it was created by one.
+        """
+        for record in self._bulk_write_records().itervalues():
+            if version_guid in record.structures:
+                return record.structures[version_guid]
+        return self.db_connection.get_structure(version_guid)
+
+    def _insert_structure(self, course_key, structure):
+        """
+        Save the new structure of the given course, or keep it until the end of the bulk write operation
+        on the course, if any.
+        """
+        record = self._get_bulk_write(course_key)
+        if record is None:
+            self.db_connection.insert_structure(structure)
+        else:
+            # this may be a structure already created by the operation, and changed in place since
+            record.structures[structure['_id']] = structure
+            self._clear_cache(structure['_id'])
+
+    def _update_structure(self, structure):
+        """
+        Save the structure changed in place, unless it was created by a bulk write operation in progress.
+        Either way, what was cached from its version is dropped.
+        """
+        self._clear_cache(structure['_id'])
+        for record in self._bulk_write_records().itervalues():
+            if structure['_id'] in record.structures:
+                record.structures[structure['_id']] = structure
+                return
+        self.db_connection.update_structure(structure)
+
+    def _get_definition(self, definition_id):
+        """
+        Get the definition definition_id, including those created by the bulk write operations in progress.
+        """
+        for record in self._bulk_write_records().itervalues():
+            if definition_id in record.definitions:
+                # callers may change it to make the next version of the definition
+                return copy.deepcopy(record.definitions[definition_id])
+        return self.db_connection.get_definition(definition_id)
+
+    def _find_definitions(self, definition_ids):
+        """
+        Get the definitions whose ids are in definition_ids, including those created by the bulk
+        write operations in progress.
+        """
+        definitions = []
+        for record in self._bulk_write_records().itervalues():
+            definitions.extend(
+                copy.deepcopy(record.definitions[definition_id])
+                for definition_id in definition_ids if definition_id in record.definitions
+            )
+            definition_ids = [definition_id for definition_id in definition_ids if definition_id not in record.definitions]
+        if definition_ids:
+            definitions.extend(self.db_connection.find_matching_definitions({'_id': {'$in': definition_ids}}))
+        return definitions
+
+    def _insert_definition(self, course_key, definition):
+        """
+        Save the new definition of the given course, or keep it until the end of the bulk write operation
+        on the course, if any. The course's structures only point to it once they are written, which is then too.
+        """
+        record = self._get_bulk_write(course_key) if course_key is not None else None
+        if record is None:
+            self.db_connection.insert_definition(definition)
+        else:
+            record.definitions[definition['_id']] = definition
+
+    @staticmethod
+    def _previous_version(edit_info, new_id):
+        """
+        Return the previous_version of a block whose current edit_info is given, when it's changed in
+        the structure new_id. If it was already changed in new_id (by a bulk write operation or
+        continue_version), its previous version stays the same.
+        """
+        if edit_info.get('update_version') == new_id:
+            return edit_info.get('previous_version')
+        return edit_info.get('update_version')
 
     def _lookup_course(self, course_locator):
         '''
@@ -305,7 +535,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 else:
                     raise InsufficientSpecificationError(course_locator)
             # use the course id
-            index = self.db_connection.get_course_index(course_locator)
+            index = self._get_course_index(course_locator)
             if index is None:
                 raise ItemNotFoundError(course_locator)
             if course_locator.branch not in index['versions']:
@@ -322,7 +552,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         # cast string to ObjectId if necessary
         version_guid = course_locator.as_object_id(version_guid)
-        entry = self.db_connection.get_structure(version_guid)
+        entry = self._get_structure(version_guid)
 
         # b/c more than one course can use same structure, the 'org', 'course',
         # 'run', and 'branch' are not intrinsic to structure
@@ -408,7 +638,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             # The supplied CourseKey is of the wrong type, so it can't possibly be stored in this modulestore.
             return False
 
-        course_index = self.db_connection.get_course_index(course_id, ignore_case)
+        course_index = self._get_course_index(course_id, ignore_case)
         return CourseLocator(course_index['org'], course_index['course'], course_index['run'], course_id.branch) if course_index else None
 
     def has_item(self, usage_key):
@@ -482,7 +712,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 self._block_matches(block_json.get('fields', {}), settings)
             ):
                 if content:
-                    definition_block = self.db_connection.get_definition(block_json['definition'])
+                    definition_block = self._get_definition(block_json['definition'])
                     return self._block_matches(definition_block.get('fields', {}), content)
                 else:
                     return True
@@ -563,7 +793,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         """
         if not (course_locator.course and course_locator.run and course_locator.org):
             return None
-        index = self.db_connection.get_course_index(course_locator)
+        index = self._get_course_index(course_locator)
         return index
 
     # TODO figure out a way to make this info accessible from the course descriptor
@@ -596,7 +826,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             'edited_on': when the change was made
         }
         """
-        definition = self.db_connection.get_definition(definition_locator.definition_id)
+        definition = self._get_definition(definition_locator.definition_id)
         if definition is None:
             return None
         return definition['edit_info']
@@ -697,12 +927,14 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         # TODO implement
         raise NotImplementedError()
 
-    def create_definition_from_data(self, new_def_data, category, user_id):
+    def create_definition_from_data(self, new_def_data, category, user_id, course_key=None):
         """
         Pull the definition fields out of descriptor and save to the db as a new definition
         w/o a predecessor and return the new id.
 
         :param user_id: request.user object
+        :param course_key: the course the definition is for; it is written at the end of the bulk write
+        operation on the course, if any
         """
         new_def_data = self._serialize_fields(category, new_def_data)
         new_id = ObjectId()
@@ -718,16 +950,17 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             },
             'schema_version': self.SCHEMA_VERSION,
         }
-        self.db_connection.insert_definition(document)
+        self._insert_definition(course_key, document)
         definition_locator = DefinitionLocator(category, new_id)
         return definition_locator
 
-    def update_definition_from_data(self, definition_locator, new_def_data, user_id):
+    def update_definition_from_data(self, definition_locator, new_def_data, user_id, course_key=None):
         """
         See if new_def_data differs from the persisted version. If so, update
         the persisted version and return the new id.
 
         :param user_id: request.user
+        :param course_key: the course the definition is for (see create_definition_from_data)
         """
         def needs_saved():
             for key, value in new_def_data.iteritems():
@@ -739,7 +972,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         # if this looks in cache rather than fresh fetches, then it will probably not detect
         # actual change b/c the descriptor and cache probably point to the same objects
-        old_definition = self.db_connection.get_definition(definition_locator.definition_id)
+        old_definition = self._get_definition(definition_locator.definition_id)
         if old_definition is None:
             raise ItemNotFoundError(definition_locator)
 
@@ -753,7 +986,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             # previous version id
             old_definition['edit_info']['previous_version'] = definition_locator.definition_id
             old_definition['schema_version'] = self.SCHEMA_VERSION
-            self.db_connection.insert_definition(old_definition)
+            self._insert_definition(course_key, old_definition)
             return DefinitionLocator(old_definition['category'], old_definition['_id']), True
         else:
             return definition_locator, False
@@ -832,9 +1065,11 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         new_def_data = partitioned_fields.get(Scope.content, {})
         # persist the definition if persisted != passed
         if (definition_locator is None or isinstance(definition_locator.definition_id, LocalId)):
-            definition_locator = self.create_definition_from_data(new_def_data, block_type, user_id)
+            definition_locator = self.create_definition_from_data(new_def_data, block_type, user_id, course_key)
         elif new_def_data is not None:
-            definition_locator, _ = self.update_definition_from_data(definition_locator, new_def_data, user_id)
+            definition_locator, _ = self.update_definition_from_data(
+                definition_locator, new_def_data, user_id, course_key
+            )
 
         # copy the structure and modify the new one
         if continue_version:
@@ -870,11 +1105,10 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         if continue_version:
             # db update
-            self.db_connection.update_structure(new_structure)
-            # clear cache so things get refetched and inheritance recomputed
-            self._clear_cache(new_id)
+            # db update; this also clears the cache so things get refetched and inheritance recomputed
+            self._update_structure(new_structure)
         else:
-            self.db_connection.insert_structure(new_structure)
+            self._insert_structure(course_key, new_structure)
 
         # update the index entry if appropriate
         if index_entry is not None:
@@ -914,32 +1148,33 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             fields (dict): A dictionary specifying initial values for some or all fields
                 in the newly created block
         """
-        xblock = self.create_item(
-            user_id, parent_usage_key.course_key, block_type, block_id=block_id, fields=fields,
-            continue_version=continue_version,
-            **kwargs)
-
-        # don't version the structure as create_item handled that already.
-        new_structure = self._lookup_course(xblock.location.course_key)['structure']
-
-        # add new block as child and update parent's version
-        encoded_block_id = encode_key_for_mongo(parent_usage_key.block_id)
-        parent = new_structure['blocks'][encoded_block_id]
-        parent['fields'].setdefault('children', []).append(xblock.location.block_id)
-        if parent['edit_info']['update_version'] != new_structure['_id']:
-            # if the parent hadn't been previously changed in this bulk transaction, indicate that it's
-            # part of the bulk transaction
-            parent['edit_info'] = {
-                'edited_on': datetime.datetime.now(UTC),
-                'edited_by': user_id,
-                'previous_version': parent['edit_info']['update_version'],
-                'update_version': new_structure['_id'],
-            }
+        # so the version is written once, with the child in its parent, rather than
+        # being read by others before the parent is changed in place
+        with self.bulk_write_operations(parent_usage_key.course_key):
+            xblock = self.create_item(
+                user_id, parent_usage_key.course_key, block_type, block_id=block_id, fields=fields,
+                continue_version=continue_version,
+                **kwargs)
+
+            # don't version the structure as create_item handled that already.
+            new_structure = self._lookup_course(xblock.location.course_key)['structure']
+
+            # add new block as child and update parent's version
+            encoded_block_id = encode_key_for_mongo(parent_usage_key.block_id)
+            parent = new_structure['blocks'][encoded_block_id]
+            parent['fields'].setdefault('children', []).append(xblock.location.block_id)
+            if parent['edit_info']['update_version'] != new_structure['_id']:
+                # if the parent hadn't been previously changed in this bulk transaction, indicate that it's
+                # part of the bulk transaction
+                parent['edit_info'] = {
+                    'edited_on': datetime.datetime.now(UTC),
+                    'edited_by': user_id,
+                    'previous_version': parent['edit_info']['update_version'],
+                    'update_version': new_structure['_id'],
+                }
 
-        # db update
-        self.db_connection.update_structure(new_structure)
-            # clear cache so things get refetched and inheritance recomputed
-        self._clear_cache(new_structure['_id'])
+            # db update; this also clears the cache so things get refetched and inheritance recomputed
+            self._update_structure(new_structure)
 
         # don't need to update the index b/c create_item did it for this version
         return xblock
@@ -1007,7 +1242,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         """
         # check course and run's uniqueness
         locator = CourseLocator(org=org, course=course, run=run, branch=master_branch)
-        index = self.db_connection.get_course_index(locator)
+        index = self._get_course_index(locator)
         if index is not None:
             raise DuplicateCourseError(locator, index)
 
@@ -1018,6 +1253,8 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         definition_fields = self._serialize_fields(root_category, partitioned_fields.get(Scope.content, {}))
 
         # build from inside out: definition, structure, index entry
+        # These are written right away, even during a bulk write operation, so that the index of the
+        # new course never points to anything which isn't written yet.
         # if building a wholly new structure
         if versions_dict is None or master_branch not in versions_dict:
             # create new definition and structure
@@ -1060,7 +1297,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 if block_fields is not None:
                     root_block['fields'].update(self._serialize_fields(root_category, block_fields))
                 if definition_fields is not None:
-                    definition = self.db_connection.get_definition(root_block['definition'])
+                    definition = self._get_definition(root_block['definition'])
                     definition['fields'].update(definition_fields)
                     definition['edit_info']['previous_version'] = definition['_id']
                     definition['edit_info']['edited_by'] = user_id
@@ -1115,7 +1352,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         definition_fields = descriptor.get_explicitly_set_fields_by_scope(Scope.content)
         descriptor.definition_locator, is_updated = self.update_definition_from_data(
-            descriptor.definition_locator, definition_fields, user_id
+            descriptor.definition_locator, definition_fields, user_id, descriptor.location.course_key
         )
 
         original_entry = self._get_block_from_structure(original_structure, descriptor.location.block_id)
@@ -1144,10 +1381,10 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             block_data['edit_info'] = {
                 'edited_on': datetime.datetime.now(UTC),
                 'edited_by': user_id,
-                'previous_version': block_data['edit_info']['update_version'],
+                'previous_version': self._previous_version(block_data['edit_info'], new_id),
                 'update_version': new_id,
             }
-            self.db_connection.insert_structure(new_structure)
+            self._insert_structure(descriptor.location.course_key, new_structure)
             # update the index entry if appropriate
             if index_entry is not None:
                 self._update_search_targets(index_entry, definition_fields)
@@ -1229,7 +1466,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         is_updated = self._persist_subdag(xblock, user_id, new_structure['blocks'], new_id)
 
         if is_updated:
-            self.db_connection.insert_structure(new_structure)
+            self._insert_structure(xblock.location.course_key, new_structure)
 
             # update the index entry if appropriate
             if index_entry is not None:
@@ -1246,11 +1483,11 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         is_updated = False
         if xblock.definition_locator is None or isinstance(xblock.definition_locator.definition_id, LocalId):
             xblock.definition_locator = self.create_definition_from_data(
-                new_def_data, xblock.category, user_id)
+                new_def_data, xblock.category, user_id, xblock.location.course_key)
             is_updated = True
         elif new_def_data:
             xblock.definition_locator, is_updated = self.update_definition_from_data(
-                xblock.definition_locator, new_def_data, user_id)
+                xblock.definition_locator, new_def_data, user_id, xblock.location.course_key)
 
         if isinstance(xblock.scope_ids.usage_id.block_id, LocalId):
             # generate an id
@@ -1285,7 +1522,9 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             block_fields['children'] = children
 
         if is_updated:
-            previous_version = None if is_new else structure_blocks[encoded_block_id]['edit_info'].get('update_version')
+            previous_version = None if is_new else self._previous_version(
+                structure_blocks[encoded_block_id]['edit_info'], new_id
+            )
             structure_blocks[encoded_block_id] = {
                 "category": xblock.category,
                 "definition": xblock.definition_locator.definition_id,
@@ -1351,7 +1590,9 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         """
         # get the destination's index, and source and destination structures.
         source_structure = self._lookup_course(source_course)['structure']
-        index_entry = self.db_connection.get_course_index(destination_course)
+        # the changes made to the source from now on must get a new update_version to be told apart
+        self._seal_structure(source_structure['_id'])
+        index_entry = self._get_course_index(destination_course)
         if index_entry is None:
             # brand new course
             raise ItemNotFoundError(destination_course)
@@ -1396,7 +1637,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             self._delete_if_true_orphan(orphan, destination_structure)
 
         # update the db
-        self.db_connection.insert_structure(destination_structure)
+        self._insert_structure(destination_course, destination_structure)
         self._update_head(index_entry, destination_course.branch, destination_structure['_id'])
 
     def update_course_index(self, updated_index_entry):
@@ -1407,7 +1648,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
 
         Does not return anything useful.
         """
-        self.db_connection.update_course_index(updated_index_entry)
+        self._update_course_index(updated_index_entry)
 
     def delete_item(self, usage_locator, user_id, force=False):
         """
@@ -1440,7 +1681,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         parent_block['fields']['children'].remove(usage_locator.block_id)
         parent_block['edit_info']['edited_on'] = datetime.datetime.now(UTC)
         parent_block['edit_info']['edited_by'] = user_id
-        parent_block['edit_info']['previous_version'] = parent_block['edit_info']['update_version']
+        parent_block['edit_info']['previous_version'] = self._previous_version(parent_block['edit_info'], new_id)
         parent_block['edit_info']['update_version'] = new_id
 
         def remove_subtree(block_id):
@@ -1455,7 +1696,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         remove_subtree(usage_locator.block_id)
 
         # update index if appropriate and structures
-        self.db_connection.insert_structure(new_structure)
+        self._insert_structure(usage_locator.course_key, new_structure)
 
         if index_entry is not None:
             # update the index entry if appropriate
@@ -1474,7 +1715,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         with a versions hash to restore the course; however, the edited_on and
         edited_by won't reflect the originals, of course.
         """
-        index = self.db_connection.get_course_index(course_key)
+        index = self._get_course_index(course_key)
         if index is None:
             raise ItemNotFoundError(course_key)
         # this is the only real delete in the system. should it do something else?
@@ -1576,9 +1817,8 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                     block_id for block_id in block['fields']["children"]
                     if encode_key_for_mongo(block_id) in original_structure['blocks']
                 ]
-        self.db_connection.update_structure(original_structure)
-        # clear cache again b/c inheritance may be wrong over orphans
-        self._clear_cache(original_structure['_id'])
+        # this also clears the cache b/c inheritance may be wrong over orphans
+        self._update_structure(original_structure)
 
     def convert_references_to_keys(self, course_key, xblock_class, jsonfields, blocks):
         """
@@ -1616,9 +1856,11 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
                 elif isinstance(field, ReferenceList):
                     jsonfields[field_name] = [robust_usage_key(ele) for ele in value]
                 elif isinstance(field, ReferenceValueDict):
+                    converted_value = {}
                     for key, subvalue in value.iteritems():
                         assert isinstance(subvalue, basestring)
-                        value[key] = robust_usage_key(subvalue)
+                        converted_value[key] = robust_usage_key(subvalue)
+                    jsonfields[field_name] = converted_value
         return jsonfields
 
     def _get_index_if_valid(self, locator, force=False, continue_version=False):
@@ -1642,7 +1884,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
             else:
                 return None
         else:
-            index_entry = self.db_connection.get_course_index(locator)
+            index_entry = self._get_course_index(locator)
             is_head = (
                 locator.version_guid is None or
                 index_entry['versions'][locator.branch] == locator.version_guid
@@ -1658,9 +1900,16 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
     def _version_structure(self, structure, user_id):
         """
         Copy the structure and update the history info (edited_by, edited_on, previous_version)
+        During a bulk write operation, the structure created by the operation is changed in place instead.
+
         :param structure:
         :param user_id:
         """
+        if self._get_open_bulk_write(structure['_id']) is not None:
+            structure['edited_by'] = user_id
+            structure['edited_on'] = datetime.datetime.now(UTC)
+            return structure
+
         new_structure = copy.deepcopy(structure)
         new_structure['_id'] = ObjectId()
         new_structure['previous_version'] = structure['_id']
@@ -1700,7 +1949,7 @@ class SplitMongoModuleStore(ModuleStoreWriteBase):
         :param new_id:
         """
         index_entry['versions'][branch] = new_id
-        self.db_connection.update_course_index(index_entry)
+        self._update_course_index(index_entry)
 
     def _serialize_fields(self, category, fields):
         """
@@ -0,0 +1,91 @@
+"""
+A process-level cache of the data split computes from each course structure
+before it can load xblocks from it.
+
+Structures are identified by their version guid, and the cache trusts it:
+a structure isn't changed once it is written. The in-place changes split makes
+to a version (create_item with continue_version, internal_clean_children, and
+the structures of bulk write operations) all go through
+SplitMongoModuleStore._update_structure or _insert_structure, which drop the
+version from this process's cache.
+
+Other processes aren't told. Bulk write operations only write their
+structures when they end, and create_child runs in one, but continue_version
+and internal_clean_children change structures in the database: they are only
+meant for filling or fixing a course before it is used (e.g., by the split
+migrator), and a process which prepared the version before may keep the
+prepared structure until it is evicted.
+"""
+import threading
+from collections import OrderedDict
+
+
+class PreparedStructure(object):
+    """
+    The data computed from a structure version which doesn't depend on the
+    course or branch it is accessed through:
+
+    * inherited_settings: the settings each block inherits from its ancestors,
+      keyed by encoded block id. These dicts are shared by every descriptor
+      system using this structure, and must not be changed.
+    * descendant_ids: the ids of the blocks returned by
+      SplitMongoModuleStore.descendants, keyed by block id and depth.
+    """
+    def __init__(self, structure, inherited_settings):
+        self.version_guid = structure['_id']
+        self.inherited_settings = inherited_settings
+        # Filled in as blocks are loaded. Concurrent fills compute the same value,
+        # so the last one winning does no harm.
+        self.descendant_ids = {}
+
+
+class StructureCache(object):
+    """
+    A thread-safe LRU cache of PreparedStructures, keyed by structure version guid,
+    holding at most `size` of them.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._prepared = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version_guid):
+        """
+        Return the PreparedStructure of the structure `version_guid`, or None if it isn't cached.
+        """
+        with self._lock:
+            prepared = self._prepared.pop(version_guid, None)
+            if prepared is None:
+                return None
+            # Move it to the most recently used end.
+            self._prepared[prepared.version_guid] = prepared
+            return prepared
+
+    def add(self, prepared):
+        """
+        Cache `prepared`, evicting the least recently used PreparedStructures beyond `size`.
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._prepared.pop(prepared.version_guid, None)
+            self._prepared[prepared.version_guid] = prepared
+            while len(self._prepared) > self.size:
+                self._prepared.popitem(last=False)
+
+    def remove(self, version_guid):
+        """
+        Drop the PreparedStructure of `version_guid`, if cached.
+        """
+        with self._lock:
+            self._prepared.pop(version_guid, None)
+
+    def clear(self):
+        """
+        Drop all the cached PreparedStructures.
+        """
+        with self._lock:
+            self._prepared.clear()
+
+    def __len__(self):
+        return len(self._prepared)
@@ -6,7 +6,9 @@ from uuid import uuid4
 from django.test import TestCase
 from django.contrib.auth.models import User
 from xmodule.contentstore.django import _CONTENTSTORE
-from xmodule.modulestore.django import modulestore, clear_existing_modulestores
+from xmodule.modulestore.django import modulestore, clear_existing_modulestores, HAS_REQUEST_CACHE
+if HAS_REQUEST_CACHE:
+    from request_cache.middleware import RequestCache
 from xmodule.modulestore import ModuleStoreEnum
 
 
@@ -231,6 +233,11 @@ class ModuleStoreTestCase(TestCase):
         # Flush the Mongo modulestore
         self.drop_mongo_collections()
 
+        # Forget what previous tests cached in the request cache, as they don't go
+        # through its middleware unless they use the test client
+        if HAS_REQUEST_CACHE:
+            RequestCache().clear_request_cache()
+
         # Call superclass implementation
         super(ModuleStoreTestCase, self)._pre_setup()
 
@@ -6,6 +6,8 @@ from nose.tools import assert_equals, assert_raises, \
 # pylint: enable=E0611
 from path import path
 import pymongo
+from bson.errors import InvalidDocument
+from mock import patch
 import logging
 import shutil
 from tempfile import mkdtemp
@@ -36,7 +38,8 @@ from nose.tools import assert_in
 from xmodule.exceptions import NotFoundError
 from git.test.lib.asserts import assert_not_none
 from xmodule.x_module import XModuleMixin
-from xmodule.modulestore.mongo.base import as_draft
+from xmodule.modulestore.mongo.base import as_draft, as_published
+from xmodule.modulestore.mongo.course_tree import course_tree_id
 from xmodule.modulestore.tests.factories import check_mongo_calls
 
 
@@ -883,6 +886,61 @@ class TestMongoModuleStore(unittest.TestCase):
         self.assertEqual(component.published_date, published_date)
         self.assertEqual(component.published_by, published_by)
 
+    def test_course_tree(self):
+        """
+        Tests that parents and orphans are read from the course tree, and that writes invalidate it.
+        """
+        locations = self._create_test_tree('course_tree')
+        course_key = locations['parent'].course_key
+        tree_id = course_tree_id(course_key)
+
+        self.assertEqual(self.draft_store.get_parent_location(locations['child']), locations['parent'])
+        self.assertTrue(self.draft_store.course_trees.find_one({'_id': tree_id})['built'])
+
+        # the tree is now read without querying the modulestore collection
+        with check_mongo_calls(self.draft_store, 0):
+            self.assertEqual(self.draft_store.get_parent_location(locations['child_sibling']), locations['parent'])
+            self.assertEqual(self.draft_store.get_parent_location(locations['parent']), locations['grandparent'])
+
+        new_child = self.draft_store.create_child(
+            self.dummy_user, locations['parent_sibling'], 'vertical', block_id='new_child'
+        )
+        orphan = self.draft_store.create_item(self.dummy_user, course_key, 'html', block_id='orphan')
+        self.assertNotIn('built', self.draft_store.course_trees.find_one({'_id': tree_id}))
+
+        self.assertEqual(
+            self.draft_store.get_parent_location(as_published(new_child.location)), locations['parent_sibling']
+        )
+        self.assertItemsEqual(
+            self.draft_store.get_orphans(course_key),
+            [as_published(orphan.location), locations['grandparent']]
+        )
+
+    def test_course_tree_changed_elsewhere(self):
+        """
+        Tests that a tree kept in memory isn't used once another process changed the course.
+        """
+        locations = self._create_test_tree('course_tree_elsewhere')
+        tree_id = course_tree_id(locations['parent'].course_key)
+        self.assertEqual(self.draft_store.get_parent_location(locations['child']), locations['parent'])
+
+        # what another process's _course_tree_changed does
+        self.draft_store.course_trees.update(
+            {'_id': tree_id}, {'$inc': {'generation': 1}, '$unset': {'blocks': True, 'built': True}}
+        )
+        with check_mongo_calls(self.draft_store, 1):
+            self.assertEqual(self.draft_store.get_parent_location(locations['child']), locations['parent'])
+
+    def test_course_tree_too_large(self):
+        """
+        Tests that a tree which can't be saved is still used, and kept in memory.
+        """
+        locations = self._create_test_tree('course_tree_too_large')
+        with patch.object(self.draft_store.course_trees, 'update', side_effect=InvalidDocument('too large')):
+            self.assertEqual(self.draft_store.get_parent_location(locations['child']), locations['parent'])
+        with check_mongo_calls(self.draft_store, 0):
+            self.assertEqual(self.draft_store.get_parent_location(locations['child']), locations['parent'])
+
 
 
 class TestMongoKeyValueStore(object):
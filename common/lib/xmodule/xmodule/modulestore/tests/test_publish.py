@@ -18,8 +18,8 @@ class TestPublish(SplitWMongoCourseBoostrapper):
         """
         # There are 12 created items and 7 parent updates
         # create course: finds: 1 to verify uniqueness, 1 to find parents
-        # sends: 1 to create course, 1 to create overview
-        with check_mongo_calls(self.draft_mongo, 6, 2):
+        # sends: 1 to create course, 1 to create overview, and 1 for each to invalidate the course tree
+        with check_mongo_calls(self.draft_mongo, 6, 4):
             super(TestPublish, self)._create_course(split=False)  # 2 inserts (course and overview)
 
         # with bulk will delay all inheritance computations which won't be added into the mongo_calls
@@ -78,7 +78,9 @@ class TestPublish(SplitWMongoCourseBoostrapper):
         # 25-June-2014 find calls are 19. Probably due to inheritance recomputation?
         # 02-July-2014 send calls are 7. 5 from above, plus 2 for updating subtree edit info for Chapter1 and course
         #              find calls are 22. 19 from above, plus 3 for finding the parent of Vert1, Chapter1, and course
-        with check_mongo_calls(self.draft_mongo, 22, 7):
+        # send calls are 12: 7 from above, plus 5 for invalidating the course tree after each of the 4 inserts
+        #              and after the bulk remove
+        with check_mongo_calls(self.draft_mongo, 22, 12):
             self.draft_mongo.publish(item.location, self.user_id)
 
         # verify status
@@ -8,6 +8,7 @@ from importlib import import_module
 from path import path
 import re
 import random
+from mock import patch
 
 from xblock.fields import Scope
 from xmodule.course_module import CourseDescriptor
@@ -19,6 +20,7 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
+from xmodule.modulestore.split_mongo.structure_cache import PreparedStructure, StructureCache
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 
 
@@ -1573,6 +1575,185 @@ class TestInheritance(SplitModuleTest):
         self.assertEqual(node.graceperiod, datetime.timedelta(hours=4))
 
 
+class TestStructureCache(SplitModuleTest):
+    """
+    Test the sharing of prepared structures between descriptor systems.
+    """
+    def _get_problem(self, block_id):
+        """
+        Get the problem `block_id` of the draft GreekHero course through a new descriptor system.
+        """
+        # pylint: disable=W0212
+        modulestore().thread_cache.course_cache = {}
+        locator = BlockUsageLocator(
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT), 'problem', block_id
+        )
+        return modulestore().get_item(locator)
+
+    def test_inheritance_is_reused(self):
+        self._get_problem('problem3_2')
+        with patch.object(SplitMongoModuleStore, 'inherit_settings') as mock_inherit_settings:
+            node = self._get_problem('problem3_2')
+            self.assertFalse(mock_inherit_settings.called)
+        # inherited
+        self.assertEqual(node.graceperiod, datetime.timedelta(hours=2))
+        # overridden
+        self.assertEqual(self._get_problem('problem1').graceperiod, datetime.timedelta(hours=4))
+
+    def test_changed_structure_is_prepared_again(self):
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        chapter = modulestore().get_item(BlockUsageLocator(course_key, 'chapter', 'chapter1'))
+        problem = modulestore().create_child(
+            'test@edx.org', chapter.location, 'problem', fields={'display_name': 'new problem'}
+        )
+        # create_child changes the structure created by create_item in place
+        refetched = modulestore().get_item(chapter.location.version_agnostic(), depth=1)
+        self.assertIn(problem.location.version_agnostic(), [child.version_agnostic() for child in refetched.children])
+
+    def test_in_place_change_is_seen(self):
+        store = modulestore()
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        self.assertEqual(self._get_problem('problem3_2').graceperiod, datetime.timedelta(hours=2))
+
+        # as done by continue_version: no block or child is added, but an inherited setting and
+        # the order of children change
+        structure = store._lookup_course(course_key)['structure']  # pylint: disable=W0212
+        chapter = structure['blocks']['chapter3']
+        chapter['fields']['graceperiod'] = '3 hours 0 minutes 0 seconds'
+        chapter['fields']['children'].reverse()
+        store._update_structure(structure)  # pylint: disable=W0212
+
+        self.assertEqual(self._get_problem('problem3_2').graceperiod, datetime.timedelta(hours=3))
+        refetched = store.get_item(BlockUsageLocator(course_key, 'chapter', 'chapter3'))
+        self.assertEqual([child.block_id for child in refetched.children], chapter['fields']['children'])
+
+    def test_cache_is_keyed_by_version(self):
+        structure = {
+            '_id': 'structure_id',
+            'root': 'course',
+            'blocks': {'course': {'category': 'course', 'fields': {'children': []}}},
+        }
+        cache = StructureCache(10)
+        prepared = PreparedStructure(structure, {})
+        cache.add(prepared)
+        self.assertIs(cache.get('structure_id'), prepared)
+        self.assertIsNone(cache.get('other_id'))
+        cache.remove('structure_id')
+        self.assertIsNone(cache.get('structure_id'))
+
+    def test_cache_size(self):
+        modulestore().structure_cache.size = 1
+        self._get_problem('problem3_2')
+        modulestore().get_course(
+            CourseLocator(org='testx', course='wonderful', run="run", branch=BRANCH_NAME_DRAFT)
+        )
+        self.assertEqual(len(modulestore().structure_cache), 1)
+
+
+class TestDefinitionPrefetch(SplitModuleTest):
+    """
+    Test the batching of the fetches of lazily loaded definitions.
+    """
+    def test_siblings_are_fetched_together(self):
+        store = modulestore()
+        store.thread_cache.course_cache = {}  # pylint: disable=W0212
+        chapter = store.get_item(
+            BlockUsageLocator(
+                CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT), 'chapter', 'chapter3'
+            ),
+            depth=1
+        )
+        with patch.object(store.db_connection, 'get_definition') as mock_get_definition:
+            with patch.object(
+                store.db_connection, 'find_matching_definitions', wraps=store.db_connection.find_matching_definitions
+            ) as mock_find_matching_definitions:
+                for child in chapter.get_children():
+                    self.assertIsNotNone(child.data)
+        self.assertFalse(mock_get_definition.called)
+        self.assertEqual(mock_find_matching_definitions.call_count, 1)
+
+
+class TestBulkWriteOperations(SplitModuleTest):
+    """
+    Test the buffering of writes during bulk write operations.
+    """
+    def setUp(self):
+        super(TestBulkWriteOperations, self).setUp()
+        self.course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+
+    def test_one_structure_per_operation(self):
+        store = modulestore()
+        structure_count = store.db_connection.structures.count()
+        definition_count = store.db_connection.definitions.count()
+        original_head = store.get_course_index_info(self.course_key)['versions'][BRANCH_NAME_DRAFT]
+        chapter_locator = BlockUsageLocator(self.course_key, 'chapter', 'chapter1')
+
+        with store.bulk_write_operations(self.course_key):
+            problems = [
+                store.create_child(
+                    'test@edx.org', chapter_locator, 'problem',
+                    fields={'display_name': 'problem {}'.format(index), 'data': '<problem>{}</problem>'.format(index)},
+                )
+                for index in range(3)
+            ]
+            # nothing is written yet, but the changes can be read
+            self.assertEqual(store.db_connection.structures.count(), structure_count)
+            self.assertEqual(
+                store.db_connection.get_course_index(self.course_key)['versions'][BRANCH_NAME_DRAFT], original_head
+            )
+            self.assertEqual(store.get_item(problems[0].location.version_agnostic()).data, '<problem>0</problem>')
+
+        self.assertEqual(store.db_connection.structures.count(), structure_count + 1)
+        self.assertEqual(store.db_connection.definitions.count(), definition_count + 3)
+        self.assertEqual(store.get_course_history_info(self.course_key)['previous_version'], original_head)
+        chapter = store.get_item(chapter_locator)
+        self.assertEqual(
+            [child.block_id for child in chapter.children[-3:]],
+            [problem.location.block_id for problem in problems]
+        )
+
+    def test_write_to_other_course(self):
+        store = modulestore()
+        other_course_key = CourseLocator(org='testx', course='wonderful', run="run", branch=BRANCH_NAME_DRAFT)
+        other_root = store.get_course(other_course_key).location
+
+        with store.bulk_write_operations(self.course_key):
+            store.create_child(
+                'test@edx.org', BlockUsageLocator(self.course_key, 'chapter', 'chapter1'), 'problem',
+                fields={'data': '<problem>buffered</problem>'},
+            )
+            problem = store.create_child(
+                'test@edx.org', other_root, 'problem', fields={'data': '<problem>written</problem>'},
+            )
+            # the other course isn't in the operation, so its definition and structure are written right away
+            self.assertIsNotNone(store.db_connection.get_definition(problem.definition_locator.definition_id))
+            head = store.db_connection.get_course_index(other_course_key)['versions'][BRANCH_NAME_DRAFT]
+            self.assertEqual(head, problem.update_version)
+            self.assertIsNotNone(store.db_connection.get_structure(head))
+
+    def test_changes_after_copy_get_a_new_version(self):
+        store = modulestore()
+        destination = self.course_key.for_branch(BRANCH_NAME_PUBLISHED)
+        problem_locator = BlockUsageLocator(self.course_key, 'problem', 'problem1')
+
+        with store.bulk_write_operations(self.course_key):
+            problem = store.get_item(problem_locator)
+            problem.display_name = 'changed before copy'
+            store.update_item(problem, 'test@edx.org')
+            store.copy(
+                'test@edx.org', self.course_key, destination, [BlockUsageLocator(self.course_key, 'course', 'head12345')]
+            )
+            problem = store.get_item(problem_locator)
+            problem.display_name = 'changed after copy'
+            store.update_item(problem, 'test@edx.org')
+
+        draft = store.get_item(problem_locator)
+        published = store.get_item(problem_locator.for_branch(BRANCH_NAME_PUBLISHED))
+        self.assertEqual(draft.display_name, 'changed after copy')
+        self.assertEqual(published.display_name, 'changed before copy')
+        self.assertNotEqual(draft.update_version, published.update_version)
+
+
 class TestPublish(SplitModuleTest):
     """
     Test the publishing api
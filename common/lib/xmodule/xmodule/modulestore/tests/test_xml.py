@@ -5,6 +5,7 @@ well-formed and not-well-formed XML.
 import os.path
 import unittest
 from glob import glob
+from lxml import etree
 from mock import patch
 
 from xmodule.modulestore.xml import XMLModuleStore
@@ -107,3 +108,37 @@ class TestXMLModuleStore(unittest.TestCase):
             SlashSeparatedCourseKey('edX', 'toy', '2012_Fall'),
             locator_key_fields=SlashSeparatedCourseKey.KEY_FIELDS
         )
+
+    def test_lazy_load(self):
+        toy_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        simple_key = SlashSeparatedCourseKey('edX', 'simple', '2012_Fall')
+        store = XMLModuleStore(DATA_DIR, course_dirs=['toy', 'simple'], lazy=True)
+        self.assertEqual(store.unloaded_course_dirs, {toy_key: 'toy', simple_key: 'simple'})
+        self.assertEqual(store.courses, {})
+
+        # Only the course asked for gets loaded
+        self.assertEqual(store.get_course(toy_key).id, toy_key)
+        self.assertEqual(store.unloaded_course_dirs, {simple_key: 'simple'})
+        self.assertTrue(store.has_item(toy_key.make_usage_key('chapter', 'Overview')))
+
+        self.assertEqual(sorted(course.id for course in store.get_courses()), sorted([simple_key, toy_key]))
+        self.assertEqual(store.unloaded_course_dirs, {})
+
+    def test_lazy_load_keeps_default_parser(self):
+        # Lazy loads happen in request threads, whose default parser isn't changed
+        previous_parser = etree.get_default_parser()
+        parser = etree.XMLParser()
+        etree.set_default_parser(parser)
+        try:
+            store = XMLModuleStore(DATA_DIR, course_dirs=['toy'], lazy=True)
+            store.get_course(SlashSeparatedCourseKey('edX', 'toy', '2012_Fall'))
+            self.assertIs(etree.get_default_parser(), parser)
+        finally:
+            etree.set_default_parser(previous_parser)
+
+    def test_lazy_load_filters_course_ids(self):
+        store = XMLModuleStore(
+            DATA_DIR, course_dirs=['toy', 'simple'], course_ids=['edX/toy/2012_Fall'], lazy=True
+        )
+        self.assertEqual(store.unloaded_course_dirs.values(), ['toy'])
+        self.assertEqual([course.id.course for course in store.get_courses()], ['toy'])
@@ -6,8 +6,10 @@ import os
 import re
 import sys
 import glob
+import threading
 
 from collections import defaultdict
+from contextlib import contextmanager
 from cStringIO import StringIO
 from fs.osfs import OSFS
 from importlib import import_module
@@ -41,6 +43,22 @@ etree.set_default_parser(edx_xml_parser)
 log = logging.getLogger(__name__)
 
 
+@contextmanager
+def _edx_default_parser():
+    """
+    Make a copy of edx_xml_parser the default parser of the current thread
+    while courses are loaded, as it is in the thread which imported this
+    module. Lazy loads happen in request threads, whose default parser is
+    restored afterwards.
+    """
+    previous_parser = etree.get_default_parser()
+    etree.set_default_parser(edx_xml_parser.copy())
+    try:
+        yield
+    finally:
+        etree.set_default_parser(previous_parser)
+
+
 # VS[compat]
 # TODO (cpennington): Remove this once all fall 2012 courses have been imported
 # into the cms from xml
@@ -368,7 +386,7 @@ class XMLModuleStore(ModuleStoreReadBase):
     """
     def __init__(
         self, data_dir, default_class=None, course_dirs=None, course_ids=None,
-        load_error_modules=True, i18n_service=None, **kwargs
+        load_error_modules=True, i18n_service=None, lazy=False, **kwargs
     ):
         """
         Initialize an XMLModuleStore from data_dir
@@ -381,6 +399,9 @@ class XMLModuleStore(ModuleStoreReadBase):
 
             course_dirs or course_ids (list of str): If specified, the list of course_dirs or course_ids to load. Otherwise,
                 load all courses. Note, providing both
+
+            lazy (bool): if True, only read the course.xml of each course directory
+                up front, and load the rest of the course the first time it is asked for
         """
         super(XMLModuleStore, self).__init__(**kwargs)
 
@@ -420,8 +441,67 @@ class XMLModuleStore(ModuleStoreReadBase):
         if course_dirs is None:
             course_dirs = sorted([d for d in os.listdir(self.data_dir) if
                                   os.path.exists(self.data_dir / d / "course.xml")])
+
+        self.course_ids = course_ids
+        # course_id -> course_dir, for the courses whose loading was put off
+        self.unloaded_course_dirs = {}
+        self._load_lock = threading.RLock()
+
+        if lazy:
+            course_dirs = self._put_off_loading(course_dirs)
+        self.load_courses(course_dirs)
+
+    def load_courses(self, course_dirs):
+        """
+        Load the courses in `course_dirs`.
+        """
+        with _edx_default_parser():
+            for course_dir in course_dirs:
+                self.try_load_course(course_dir, self.course_ids)
+
+    def _put_off_loading(self, course_dirs):
+        """
+        Record which course each of `course_dirs` contains, to load it the
+        first time it is asked for.  Returns the course dirs that must be
+        loaded now, because their course.xml can't be read.
+        """
+        course_dirs_to_load = []
         for course_dir in course_dirs:
-            self.try_load_course(course_dir, course_ids)
+            try:
+                _course_data, course_id = self.read_course_xml(course_dir, lambda msg: None)
+            except Exception:  # pylint: disable=broad-except
+                # Loading the course will record why it failed.
+                course_dirs_to_load.append(course_dir)
+                continue
+            if self.course_ids is None or course_id in self.course_ids:
+                self.unloaded_course_dirs[course_id] = course_dir
+        return course_dirs_to_load
+
+    def _load_unloaded_course(self, course_key):
+        """
+        Load the course `course_key` if its loading was put off.
+        """
+        if course_key not in self.unloaded_course_dirs:
+            return
+        with self._load_lock:
+            # Only forget about the course once it is loaded, so that other
+            # threads wait for it rather than finding it half loaded.
+            course_dir = self.unloaded_course_dirs.get(course_key)
+            if course_dir is not None:
+                self.load_courses([course_dir])
+                del self.unloaded_course_dirs[course_key]
+
+    def _load_unloaded_courses(self):
+        """
+        Load all the courses whose loading was put off.
+        """
+        if not self.unloaded_course_dirs:
+            return
+        with self._load_lock:
+            course_keys = self.unloaded_course_dirs.keys()
+            self.load_courses([self.unloaded_course_dirs[course_key] for course_key in course_keys])
+            for course_key in course_keys:
+                del self.unloaded_course_dirs[course_key]
 
     def try_load_course(self, course_dir, course_ids=None):
         '''
@@ -480,15 +560,12 @@ class XMLModuleStore(ModuleStoreReadBase):
             log.warning(msg + " " + str(err))
         return {}
 
-    def load_course(self, course_dir, course_ids, tracker):
+    def read_course_xml(self, course_dir, tracker):
         """
-        Load a course into this module store
-        course_path: Course directory name
+        Parse the course.xml file of `course_dir`.
 
-        returns a CourseDescriptor for the course
+        Returns the root element of course.xml, and the id of the course.
         """
-        log.debug('========> Starting course import from {0}'.format(course_dir))
-
         with open(self.data_dir / course_dir / "course.xml") as course_file:
 
             # VS[compat]
@@ -496,108 +573,122 @@ class XMLModuleStore(ModuleStoreReadBase):
             # been imported into the cms from xml
             course_file = StringIO(clean_out_mako_templating(course_file.read()))
 
-            course_data = etree.parse(course_file, parser=edx_xml_parser).getroot()
-
-            org = course_data.get('org')
-
-            if org is None:
-                msg = ("No 'org' attribute set for course in {dir}. "
-                       "Using default 'edx'".format(dir=course_dir))
-                log.warning(msg)
-                tracker(msg)
-                org = 'edx'
-
-            course = course_data.get('course')
-
-            if course is None:
-                msg = ("No 'course' attribute set for course in {dir}."
-                       " Using default '{default}'".format(dir=course_dir,
-                                                           default=course_dir
-                                                           )
-                       )
-                log.warning(msg)
-                tracker(msg)
-                course = course_dir
-
-            url_name = course_data.get('url_name', course_data.get('slug'))
-            policy_dir = None
-            if url_name:
-                policy_dir = self.data_dir / course_dir / 'policies' / url_name
-                policy_path = policy_dir / 'policy.json'
-
-                policy = self.load_policy(policy_path, tracker)
-
-                # VS[compat]: remove once courses use the policy dirs.
-                if policy == {}:
-                    old_policy_path = self.data_dir / course_dir / 'policies' / '{0}.json'.format(url_name)
-                    policy = self.load_policy(old_policy_path, tracker)
+        course_data = etree.parse(course_file, parser=edx_xml_parser).getroot()
+
+        org = course_data.get('org')
+
+        if org is None:
+            msg = ("No 'org' attribute set for course in {dir}. "
+                   "Using default 'edx'".format(dir=course_dir))
+            log.warning(msg)
+            tracker(msg)
+            org = 'edx'
+
+        course = course_data.get('course')
+
+        if course is None:
+            msg = ("No 'course' attribute set for course in {dir}."
+                   " Using default '{default}'".format(dir=course_dir,
+                                                       default=course_dir
+                                                       )
+                   )
+            log.warning(msg)
+            tracker(msg)
+            course = course_dir
+
+        url_name = course_data.get('url_name', course_data.get('slug'))
+        if not url_name:
+            # VS[compat] : 'name' is deprecated, but support it for now...
+            if course_data.get('name'):
+                url_name = Location.clean(course_data.get('name'))
+                tracker("'name' is deprecated for module xml.  Please use "
+                        "display_name and url_name.")
             else:
-                policy = {}
-                # VS[compat] : 'name' is deprecated, but support it for now...
-                if course_data.get('name'):
-                    url_name = Location.clean(course_data.get('name'))
-                    tracker("'name' is deprecated for module xml.  Please use "
-                            "display_name and url_name.")
-                else:
-                    raise ValueError("Can't load a course without a 'url_name' "
-                                     "(or 'name') set.  Set url_name.")
-
-            course_id = SlashSeparatedCourseKey(org, course, url_name)
-            if course_ids is not None and course_id not in course_ids:
-                return None
-
-            def get_policy(usage_id):
-                """
-                Return the policy dictionary to be applied to the specified XBlock usage
-                """
-                return policy.get(policy_key(usage_id), {})
-
-            services = {}
-            if self.i18n_service:
-                services['i18n'] = self.i18n_service
-
-            system = ImportSystem(
-                xmlstore=self,
-                course_id=course_id,
-                course_dir=course_dir,
-                error_tracker=tracker,
-                parent_tracker=self.parent_trackers[course_id],
-                load_error_modules=self.load_error_modules,
-                get_policy=get_policy,
-                mixins=self.xblock_mixins,
-                default_class=self.default_class,
-                select=self.xblock_select,
-                field_data=self.field_data,
-                services=services,
-            )
+                raise ValueError("Can't load a course without a 'url_name' "
+                                 "(or 'name') set.  Set url_name.")
+
+        return course_data, SlashSeparatedCourseKey(org, course, url_name)
+
+    def load_course(self, course_dir, course_ids, tracker):
+        """
+        Load a course into this module store
+        course_path: Course directory name
 
-            course_descriptor = system.process_xml(etree.tostring(course_data, encoding='unicode'))
+        returns a CourseDescriptor for the course
+        """
+        log.debug('========> Starting course import from {0}'.format(course_dir))
 
-            # If we fail to load the course, then skip the rest of the loading steps
-            if isinstance(course_descriptor, ErrorDescriptor):
-                return course_descriptor
+        course_data, course_id = self.read_course_xml(course_dir, tracker)
+        if course_ids is not None and course_id not in course_ids:
+            return None
 
-            # NOTE: The descriptors end up loading somewhat bottom up, which
-            # breaks metadata inheritance via get_children().  Instead
-            # (actually, in addition to, for now), we do a final inheritance pass
-            # after we have the course descriptor.
-            compute_inherited_metadata(course_descriptor)
+        url_name = course_id.run
+        policy_dir = None
+        if course_data.get('url_name', course_data.get('slug')):
+            policy_dir = self.data_dir / course_dir / 'policies' / url_name
+            policy_path = policy_dir / 'policy.json'
 
-            # now import all pieces of course_info which is expected to be stored
-            # in <content_dir>/info or <content_dir>/info/<url_name>
-            self.load_extra_content(system, course_descriptor, 'course_info', self.data_dir / course_dir / 'info', course_dir, url_name)
+            policy = self.load_policy(policy_path, tracker)
 
-            # now import all static tabs which are expected to be stored in
-            # in <content_dir>/tabs or <content_dir>/tabs/<url_name>
-            self.load_extra_content(system, course_descriptor, 'static_tab', self.data_dir / course_dir / 'tabs', course_dir, url_name)
+            # VS[compat]: remove once courses use the policy dirs.
+            if policy == {}:
+                old_policy_path = self.data_dir / course_dir / 'policies' / '{0}.json'.format(url_name)
+                policy = self.load_policy(old_policy_path, tracker)
+        else:
+            policy = {}
 
-            self.load_extra_content(system, course_descriptor, 'custom_tag_template', self.data_dir / course_dir / 'custom_tags', course_dir, url_name)
+        def get_policy(usage_id):
+            """
+            Return the policy dictionary to be applied to the specified XBlock usage
+            """
+            return policy.get(policy_key(usage_id), {})
+
+        services = {}
+        if self.i18n_service:
+            services['i18n'] = self.i18n_service
+
+        system = ImportSystem(
+            xmlstore=self,
+            course_id=course_id,
+            course_dir=course_dir,
+            error_tracker=tracker,
+            parent_tracker=self.parent_trackers[course_id],
+            load_error_modules=self.load_error_modules,
+            get_policy=get_policy,
+            mixins=self.xblock_mixins,
+            default_class=self.default_class,
+            select=self.xblock_select,
+            field_data=self.field_data,
+            services=services,
+        )
 
-            self.load_extra_content(system, course_descriptor, 'about', self.data_dir / course_dir / 'about', course_dir, url_name)
+        course_descriptor = system.process_xml(etree.tostring(course_data, encoding='unicode'))
 
-            log.debug('========> Done with course import from {0}'.format(course_dir))
+        # If we fail to load the course, then skip the rest of the loading steps
+        if isinstance(course_descriptor, ErrorDescriptor):
             return course_descriptor
 
+        # NOTE: The descriptors end up loading somewhat bottom up, which
+        # breaks metadata inheritance via get_children().  Instead
+        # (actually, in addition to, for now), we do a final inheritance pass
+        # after we have the course descriptor.
+        compute_inherited_metadata(course_descriptor)
+
+        # now import all pieces of course_info which is expected to be stored
+        # in <content_dir>/info or <content_dir>/info/<url_name>
+        self.load_extra_content(system, course_descriptor, 'course_info', self.data_dir / course_dir / 'info', course_dir, url_name)
+
+        # now import all static tabs which are expected to be stored in
+        # in <content_dir>/tabs or <content_dir>/tabs/<url_name>
+        self.load_extra_content(system, course_descriptor, 'static_tab', self.data_dir / course_dir / 'tabs', course_dir, url_name)
+
+        self.load_extra_content(system, course_descriptor, 'custom_tag_template', self.data_dir / course_dir / 'custom_tags', course_dir, url_name)
+
+        self.load_extra_content(system, course_descriptor, 'about', self.data_dir / course_dir / 'about', course_dir, url_name)
+
+        log.debug('========> Done with course import from {0}'.format(course_dir))
+        return course_descriptor
+
     def load_extra_content(self, system, course_descriptor, category, base_dir, course_dir, url_name):
         self._load_extra_content(system, course_descriptor, category, base_dir, course_dir)
 
@@ -700,6 +791,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         """
         Returns True if location exists in this ModuleStore.
         """
+        self._load_unloaded_course(usage_key.course_key)
         return usage_key in self.modules[usage_key.course_key]
 
     def get_item(self, usage_key, depth=0):
@@ -714,6 +806,7 @@ class XMLModuleStore(ModuleStoreReadBase):
 
         usage_key: a UsageKey that matches the module we are looking for.
         """
+        self._load_unloaded_course(usage_key.course_key)
         try:
             return self.modules[usage_key.course_key][usage_key]
         except KeyError:
@@ -747,6 +840,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         if revision == ModuleStoreEnum.RevisionOption.draft_only:
             return []
 
+        self._load_unloaded_course(course_id)
         items = []
 
         category = kwargs.pop('category', None)
@@ -773,13 +867,39 @@ class XMLModuleStore(ModuleStoreReadBase):
         Returns a list of course descriptors.  If there were errors on loading,
         some of these may be ErrorDescriptors instead.
         """
+        self._load_unloaded_courses()
         return self.courses.values()
 
+    def get_course(self, course_id, depth=0):
+        """
+        See ModuleStoreRead.get_course
+        """
+        # Don't go through get_courses, which would load every course.
+        self._load_unloaded_course(course_id)
+        return next((course for course in self.courses.values() if course.id == course_id), None)
+
+    def has_course(self, course_id, ignore_case=False):
+        """
+        See ModuleStoreRead.has_course
+        """
+        if ignore_case:
+            return super(XMLModuleStore, self).has_course(course_id, ignore_case)
+        course = self.get_course(course_id)
+        return course.id if course is not None else None
+
+    def get_course_errors(self, course_key):
+        """
+        See ModuleStoreRead.get_course_errors
+        """
+        self._load_unloaded_course(course_key)
+        return super(XMLModuleStore, self).get_course_errors(course_key)
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
         course_dir where course loading failed.
         """
+        self._load_unloaded_courses()
         return dict((k, self.errored_courses[k].errors) for k in self.errored_courses)
 
     def get_orphans(self, course_key):
@@ -795,6 +915,7 @@ class XMLModuleStore(ModuleStoreReadBase):
         '''Find the location that is the parent of this location in this
         course.  Needed for path_to_location().
         '''
+        self._load_unloaded_course(location.course_key)
         if not self.parent_trackers[location.course_key].is_known(location):
             raise ItemNotFoundError("{0} not in {1}".format(location, location.course_key))
 
@@ -1,6 +1,8 @@
 # This class gives a common interface for logging into the grading controller
 import json
 import logging
+import threading
+import time
 import requests
 from dogapi import dog_stats_api
 from requests.exceptions import RequestException, ConnectionError, HTTPError
@@ -18,6 +20,69 @@ class GradingServiceError(Exception):
     pass
 
 
+class CircuitBreaker(object):
+    """
+    Keeps requests away from a grading controller that keeps failing, so that
+    callers fail fast instead of each waiting on it in turn.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens, and no
+    requests are allowed for RESET_TIMEOUT seconds.  After that a single
+    request is let through: the circuit closes again if it succeeds, and
+    stays open for another RESET_TIMEOUT seconds if it fails.
+
+    There is one breaker per grading controller URL, shared by all the
+    GradingServices of the process.
+    """
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+
+    _breakers = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+
+    @classmethod
+    def for_url(cls, url):
+        """Return the breaker for the grading controller at `url`."""
+        with cls._breakers_lock:
+            if url not in cls._breakers:
+                cls._breakers[url] = cls()
+            return cls._breakers[url]
+
+    def allow_request(self):
+        """
+        Return whether a request should be made now.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at < self.RESET_TIMEOUT:
+                return False
+            # Let this one request through to try the controller again,
+            # holding the others back until we know how it went.
+            self.opened_at = time.time()
+            return True
+
+    def record_success(self):
+        """Record that a request succeeded, closing the circuit."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Record that a request failed, opening the circuit if it has failed too often."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.FAILURE_THRESHOLD:
+                if self.opened_at is None:
+                    log.warning("Grading controller failed %d times in a row; not calling it for %d seconds",
+                                self.failures, self.RESET_TIMEOUT)
+                self.opened_at = time.time()
+
+
 class GradingService(object):
     """
     Interface to staff grading backend.
@@ -28,6 +93,7 @@ class GradingService(object):
         self.password = config['password']
         self.session = requests.Session()
         self.system = config['system']
+        self.circuit_breaker = CircuitBreaker.for_url(config.get('url'))
 
     def _login(self):
         """
@@ -113,6 +179,26 @@ class GradingService(object):
         the operation again.
 
         Returns the result of operation().  Does not catch exceptions.
+
+        Raises GradingServiceError without calling operation() if the grading
+        controller has been failing; see CircuitBreaker.
+        """
+        if not self.circuit_breaker.allow_request():
+            dog_stats_api.increment(self._metric_name('request.circuit_open'))
+            raise GradingServiceError("The grading controller is unavailable.")
+
+        try:
+            resp_json = self._call_with_login(operation)
+        except (RequestException, ValueError):
+            self.circuit_breaker.record_failure()
+            raise
+
+        self.circuit_breaker.record_success()
+        return resp_json
+
+    def _call_with_login(self, operation):
+        """
+        Does the work of _try_with_login.
         """
         response = operation()
         resp_json = response.json()
@@ -7,6 +7,31 @@ import random
 from abc import ABCMeta, abstractproperty
 
 
+class PartitionMap(object):
+    """
+    The user partitions of a course, compiled into tables so that finding a
+    partition, or checking that a group is in one, is a dictionary lookup.
+    """
+    def __init__(self, user_partitions):
+        self.user_partitions = user_partitions
+        self._partitions_by_id = dict((partition.id, partition) for partition in user_partitions)
+        self._group_ids = dict(
+            (partition.id, frozenset(group.id for group in partition.groups)) for partition in user_partitions
+        )
+
+    def get_partition(self, user_partition_id):
+        """
+        Return the UserPartition with id `user_partition_id`, or None.
+        """
+        return self._partitions_by_id.get(user_partition_id)
+
+    def has_group(self, user_partition_id, group_id):
+        """
+        Return whether the partition `user_partition_id` has a group with id `group_id`.
+        """
+        return group_id in self._group_ids.get(user_partition_id, ())
+
+
 class PartitionService(object):
     """
     This is an XBlock service that assigns tracks which groups users are in for various
@@ -27,6 +52,16 @@ class PartitionService(object):
         self._user_tags_service = user_tags_service
         self._course_id = course_id
         self._track_function = track_function
+        self._partition_map = None
+
+    @property
+    def partition_map(self):
+        """
+        Return the PartitionMap of self.course_partitions, which is only read once.
+        """
+        if self._partition_map is None:
+            self._partition_map = PartitionMap(self.course_partitions)
+        return self._partition_map
 
     def get_user_group_for_partition(self, user_partition_id):
         """
@@ -68,11 +103,7 @@ class PartitionService(object):
         Returns:
             A UserPartition, or None if not found.
         """
-        for partition in self.course_partitions:
-            if partition.id == user_partition_id:
-                return partition
-
-        return None
+        return self.partition_map.get_partition(user_partition_id)
 
     def _key_for_partition(self, user_partition):
         """
@@ -94,10 +125,8 @@ class PartitionService(object):
         if group_id is not None:
             group_id = int(group_id)
 
-        partition_group_ids = [group.id for group in user_partition.groups]
-
         # If a valid group id has been saved already, return it
-        if group_id is not None and group_id in partition_group_ids:
+        if group_id is not None and self.partition_map.has_group(user_partition.id, group_id):
             return group_id
 
         # TODO: what's the atomicity of the get above and the save here?  If it's not in a
@@ -8,7 +8,7 @@ from unittest import TestCase
 from mock import Mock
 
 from xmodule.partitions.partitions import Group, UserPartition
-from xmodule.partitions.partitions_service import PartitionService
+from xmodule.partitions.partitions_service import PartitionMap, PartitionService
 
 
 class TestGroup(TestCase):
@@ -176,6 +176,23 @@ class TestUserPartition(TestCase):
         self.assertNotIn("programmer", user_partition.to_json())
 
 
+class TestPartitionMap(TestCase):
+    """Test looking up partitions and groups in a PartitionMap"""
+    def test_lookups(self):
+        partitions = [
+            UserPartition(0, 'First', 'first partition', [Group(0, 'Group 0'), Group(1, 'Group 1')]),
+            UserPartition(5, 'Second', 'second partition', [Group(2, 'Group 2')]),
+        ]
+        partition_map = PartitionMap(partitions)
+
+        self.assertEqual(partition_map.user_partitions, partitions)
+        self.assertEqual(partition_map.get_partition(5), partitions[1])
+        self.assertIsNone(partition_map.get_partition(1))
+        self.assertTrue(partition_map.has_group(0, 1))
+        self.assertFalse(partition_map.has_group(0, 2))
+        self.assertFalse(partition_map.has_group(1, 0))
+
+
 class StaticPartitionService(PartitionService):
     """
     Mock PartitionService for testing.
@@ -19,6 +19,7 @@ from xmodule.x_module import XModule
 from xmodule.stringify import stringify_children
 from xmodule.mako_module import MakoModuleDescriptor
 from xmodule.xml_module import XmlDescriptor
+from xblock.core import XBlock
 from xblock.fields import Scope, String, Dict, Boolean, List
 
 log = logging.getLogger(__name__)
@@ -38,6 +39,7 @@ class PollFields(object):
     question = String(help="Poll question", scope=Scope.content, default='')
 
 
+@XBlock.wants('user_state_summary_counters')
 class PollModule(PollFields, XModule):
     """Poll Module"""
     js = {
@@ -59,38 +61,53 @@ class PollModule(PollFields, XModule):
             json string
         """
         if dispatch in self.poll_answers and not self.voted:
-            # FIXME: fix this, when xblock will support mutable types.
-            # Now we use this hack.
-            temp_poll_answers = self.poll_answers
-            temp_poll_answers[dispatch] += 1
-            self.poll_answers = temp_poll_answers
+            self._record_vote(dispatch, 1)
 
             self.voted = True
             self.poll_answer = dispatch
-            return json.dumps({'poll_answers': self.poll_answers,
-                               'total': sum(self.poll_answers.values()),
+            poll_answers = self._get_poll_answers()
+            return json.dumps({'poll_answers': poll_answers,
+                               'total': sum(poll_answers.values()),
                                'callback': {'objectName': 'Conditional'}
                                })
         elif dispatch == 'get_state':
+            poll_answers = self._get_poll_answers()
             return json.dumps({'poll_answer': self.poll_answer,
-                               'poll_answers': self.poll_answers,
-                               'total': sum(self.poll_answers.values())
+                               'poll_answers': poll_answers,
+                               'total': sum(poll_answers.values())
                                })
         elif dispatch == 'reset_poll' and self.voted and \
                 self.descriptor.xml_attributes.get('reset', 'True').lower() != 'false':
             self.voted = False
+            self._record_vote(self.poll_answer, -1)
+            self.poll_answer = ''
+            return json.dumps({'status': 'success'})
+        else:  # return error message
+            return json.dumps({'error': 'Unknown Command!'})
+
+    def _get_poll_answers(self):
+        """Return the number of votes for each answer."""
+        counters = self.runtime.service(self, 'user_state_summary_counters')
+        if counters:
+            return counters.get_counts(self, 'poll_answers')
+        return self.poll_answers
 
+    def _record_vote(self, answer, delta):
+        """Add `delta` to the number of votes for `answer`.
+
+        When the runtime provides counters, the vote is recorded without
+        rewriting poll_answers, which all the students share.
+        """
+        counters = self.runtime.service(self, 'user_state_summary_counters')
+        if counters:
+            counters.increment(self, 'poll_answers', answer, delta)
+        else:
             # FIXME: fix this, when xblock will support mutable types.
             # Now we use this hack.
             temp_poll_answers = self.poll_answers
-            temp_poll_answers[self.poll_answer] -= 1
+            temp_poll_answers[answer] += delta
             self.poll_answers = temp_poll_answers
 
-            self.poll_answer = ''
-            return json.dumps({'status': 'success'})
-        else:  # return error message
-            return json.dumps({'error': 'Unknown Command!'})
-
     def get_html(self):
         """Renders parameters to template."""
         params = {
@@ -118,21 +135,26 @@ class PollModule(PollFields, XModule):
         # FIXME: fix this, when xblock support mutable types.
         # Now we use this hack.
         temp_poll_answers = self.poll_answers
+        answers_added = False
 
          # Fill self.poll_answers, prepare data for template context.
         for answer in self.answers:
             # Set default count for answer = 0.
             if answer['id'] not in temp_poll_answers:
                 temp_poll_answers[answer['id']] = 0
+                answers_added = True
             answers_to_json[answer['id']] = cgi.escape(answer['text'])
-        self.poll_answers = temp_poll_answers
+        # Only save the shared poll_answers when it changed.
+        if answers_added:
+            self.poll_answers = temp_poll_answers
 
+        poll_answers = self._get_poll_answers() if self.voted else {}
         return json.dumps({'answers': answers_to_json,
             'question': cgi.escape(self.question),
             # to show answered poll after reload:
             'poll_answer': self.poll_answer,
-            'poll_answers': self.poll_answers if self.voted else {},
-            'total': sum(self.poll_answers.values()) if self.voted else 0,
+            'poll_answers': poll_answers,
+            'total': sum(poll_answers.values()),
             'reset': str(self.descriptor.xml_attributes.get('reset', 'true')).lower()})
 
 
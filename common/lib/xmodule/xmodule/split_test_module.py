@@ -11,6 +11,7 @@ from xmodule.progress import Progress
 from xmodule.seq_module import SequenceDescriptor
 from xmodule.studio_editable import StudioEditableModule, StudioEditableDescriptor
 from xmodule.x_module import XModule, module_attr, STUDENT_VIEW
+from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import UserPartitionList
 
 from lxml import etree
@@ -165,13 +166,23 @@ class SplitTestModule(SplitTestFields, XModule, StudioEditableModule):
         """
         # NOTE: calling self.get_children() creates a circular reference--
         # it calls get_child_descriptors() internally, but that doesn't work until
-        # we've picked a choice.  Use self.descriptor.get_children() instead.
+        # we've picked a choice.  Use the descriptor's children instead.
 
-        for child in self.descriptor.get_children():
-            if child.location == location:
-                return child
+        # Only load the chosen child, unless all of them already are (e.g. for the staff view).
+        loaded_children = getattr(self.descriptor, '_child_instances', None)
+        if loaded_children is not None:
+            for child in loaded_children:
+                if child.location == location:
+                    return child
+            return None
 
-        return None
+        if location not in self.descriptor.children:
+            return None
+        try:
+            return self.descriptor.runtime.get_block(location)
+        except ItemNotFoundError:
+            log.exception(u'Unable to load item {loc}, skipping'.format(loc=location))
+            return None
 
     def get_content_titles(self):
         """
@@ -202,6 +213,7 @@ class SplitTestModule(SplitTestFields, XModule, StudioEditableModule):
 
         # group_id_to_child comes from json, so it has to have string keys
         str_group_id = str(group_id)
+        child_descriptor = None
         if str_group_id in self.group_id_to_child:
             child_location = self.group_id_to_child[str_group_id]
             child_descriptor = self.get_child_descriptor_by_location(child_location)
@@ -11,6 +11,7 @@ import json
 import os
 import pprint
 import unittest
+from collections import Counter, defaultdict
 
 from mock import Mock
 from path import path
@@ -119,6 +120,25 @@ def mock_render_template(*args, **kwargs):
     return pprint.pformat((args, kwargs)).decode()
 
 
+class DictCounters(object):
+    """
+    A user_state_summary_counters service keeping the increments in memory.
+    """
+    def __init__(self):
+        self.increments = defaultdict(Counter)
+
+    def increment(self, block, field_name, key, delta=1):
+        """Add `delta` to the count of `key` in the field `field_name` of `block`."""
+        self.increments[(block.scope_ids.usage_id, field_name)][key] += delta
+
+    def get_counts(self, block, field_name):
+        """Return the value of the field `field_name` of `block` with the increments applied to it."""
+        counts = dict(getattr(block, field_name) or {})
+        for key, delta in self.increments[(block.scope_ids.usage_id, field_name)].iteritems():
+            counts[key] = counts.get(key, 0) + delta
+        return counts
+
+
 class ModelsTest(unittest.TestCase):
     def setUp(self):
         pass
@@ -1209,6 +1209,33 @@ class CapaModuleTest(unittest.TestCase):
         intersection = set(module2.input_state.keys()).intersection(set(module1.input_state.keys()))
         self.assertEqual(len(intersection), 0)
 
+    def test_compact_state(self):
+        module = CapaFactory.create(attempts=0)
+        module.check_problem({CapaFactory.input_key(): '3.14'})
+
+        # The answers are stored with shortened ids, and without default properties
+        self.assertEqual(module.state_version, 2)
+        self.assertEqual(module.student_answers, {'_2_1': '3.14'})
+        self.assertEqual(module.correct_map, {'_2_1': 'correct'})
+
+        # The problem loaded from the stored state has the full answer ids
+        lcp = module.new_lcp(module.get_state_for_lcp())
+        self.assertEqual(lcp.student_answers, module.lcp.student_answers)
+        self.assertEqual(lcp.correct_map.get_dict(), module.lcp.correct_map.get_dict())
+
+    def test_legacy_state(self):
+        module = CapaFactory.create()
+        answer_key = CapaFactory.answer_key()
+        # The state stored before the compact format
+        module.student_answers = {answer_key: '3.14'}
+        module.correct_map = {answer_key: {
+            'correctness': 'correct', 'npoints': None, 'msg': '', 'hint': '', 'hintmode': None, 'queuestate': None
+        }}
+
+        lcp = module.new_lcp(module.get_state_for_lcp())
+        self.assertEqual(lcp.student_answers, {answer_key: '3.14'})
+        self.assertTrue(lcp.correct_map.is_correct(answer_key))
+
     def test_get_problem_html_error(self):
         """
         In production, when an error occurs with the problem HTML
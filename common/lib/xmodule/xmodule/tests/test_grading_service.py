@@ -0,0 +1,59 @@
+"""
+Tests for the circuit breaker in front of the grading controller.
+"""
+import unittest
+
+from mock import patch
+
+from xmodule.open_ended_grading_classes.grading_service_module import CircuitBreaker
+
+
+@patch('xmodule.open_ended_grading_classes.grading_service_module.time.time')
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test `CircuitBreaker`.
+    """
+    def setUp(self):
+        self.breaker = CircuitBreaker()
+
+    def _fail(self, times):
+        """Record `times` failures."""
+        for _ in range(times):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self, mock_time):
+        mock_time.return_value = 1000
+        self._fail(CircuitBreaker.FAILURE_THRESHOLD - 1)
+        self.assertTrue(self.breaker.allow_request())
+        self._fail(1)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_failures(self, mock_time):
+        mock_time.return_value = 1000
+        self._fail(CircuitBreaker.FAILURE_THRESHOLD - 1)
+        self.breaker.record_success()
+        self._fail(CircuitBreaker.FAILURE_THRESHOLD - 1)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_single_trial_request_after_timeout(self, mock_time):
+        mock_time.return_value = 1000
+        self._fail(CircuitBreaker.FAILURE_THRESHOLD)
+        mock_time.return_value += CircuitBreaker.RESET_TIMEOUT
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+        # The trial request failed, so the circuit stays open.
+        self._fail(1)
+        mock_time.return_value += CircuitBreaker.RESET_TIMEOUT - 1
+        self.assertFalse(self.breaker.allow_request())
+
+        # The next one succeeds, closing the circuit.
+        mock_time.return_value += 1
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow_request())
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_one_breaker_per_url(self, _mock_time):
+        self.assertIs(CircuitBreaker.for_url('http://a'), CircuitBreaker.for_url('http://a'))
+        self.assertIsNot(CircuitBreaker.for_url('http://a'), CircuitBreaker.for_url('http://b'))
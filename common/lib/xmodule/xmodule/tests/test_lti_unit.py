@@ -237,6 +237,62 @@ class LTIModuleTest(LogicTest):
         self.assertDictEqual(expected_response, real_response)
         self.assertEqual(self.xmodule.module_score, float(self.DEFAULTS['grade']))
 
+    def get_batch_request_body(self, grades):
+        """
+        Return a replaceResultRequest body with a result record per grade, all for the default sourcedId.
+        """
+        body = self.get_request_body()
+        start, end = body.index('<resultRecord>'), body.index('</resultRecord>') + len('</resultRecord>')
+        record = body[start:end].replace(str(self.DEFAULTS['grade']), '{grade}')
+        return body[:start] + ''.join(record.format(grade=grade) for grade in grades) + body[end:]
+
+    def test_batch_request_queued(self):
+        """
+        The scores of a batch are handed to the lti_outcomes service.
+        """
+        self.xmodule.verify_oauth_body_sign = Mock()
+        self.xmodule.has_score = True
+        user = self.system.get_real_user.return_value
+        outcomes = Mock()
+        request = Request(self.environ)
+        request.body = self.get_batch_request_body([0.5, 0.75])
+        with patch.object(self.xmodule.runtime, 'service', return_value=outcomes):
+            response = self.xmodule.grade_handler(request, '')
+        real_response = self.get_response_values(response)
+        expected_response = {
+            'action': 'replaceResultResponse',
+            'code_major': 'success',
+            'description': 'Scores for 2 results are now set',
+            'messageIdentifier': self.DEFAULTS['messageIdentifier'],
+        }
+        self.assertDictEqual(expected_response, real_response)
+        outcomes.replace_results.assert_called_once_with(
+            self.xmodule, [(user, 0.5), (user, 0.75)], self.xmodule.max_score()
+        )
+        self.assertFalse(self.system.publish.called)
+
+    def test_batch_request_unsupported(self):
+        """
+        Without the lti_outcomes service, batches aren't supported.
+        """
+        self.xmodule.verify_oauth_body_sign = Mock()
+        request = Request(self.environ)
+        request.body = self.get_batch_request_body([0.5, 0.75])
+        response = self.xmodule.grade_handler(request, '')
+        self.assertEqual(self.get_response_values(response)['code_major'], 'unsupported')
+        self.assertFalse(self.system.publish.called)
+
+    def test_parse_grade_xml_records(self):
+        """
+        All the result records of a request are parsed.
+        """
+        messageIdentifier, action, records = self.xmodule.parse_grade_xml_records(
+            self.get_batch_request_body([0.5, 0.75])
+        )
+        self.assertEqual(self.DEFAULTS['messageIdentifier'], messageIdentifier)
+        self.assertEqual(self.DEFAULTS['action'], action)
+        self.assertEqual([(self.DEFAULTS['sourcedId'], 0.5), (self.DEFAULTS['sourcedId'], 0.75)], records)
+
     def test_user_id(self):
         expected_user_id = unicode(urllib.quote(self.xmodule.runtime.anonymous_student_id))
         real_user_id = self.xmodule.get_user_id()
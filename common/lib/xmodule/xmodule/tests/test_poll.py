@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """Test for Poll Xmodule functional logic."""
 from xmodule.poll_module import PollDescriptor
-from . import LogicTest
+from . import DictCounters, LogicTest
 
 
 class PollModuleTest(LogicTest):
@@ -30,3 +30,32 @@ class PollModuleTest(LogicTest):
         self.assertEqual(total, 2)
         self.assertDictEqual(callback, {'objectName': 'Conditional'})
         self.assertEqual(self.xmodule.poll_answer, 'No')
+
+
+class PollModuleCountersTest(PollModuleTest):
+    """Logic tests for Poll Xmodule, recording votes with the counters service."""
+    raw_field_data = {
+        'poll_answers': {'Yes': 1, 'Dont_know': 0, 'No': 0},
+        'voted': False,
+        'poll_answer': ''
+    }
+
+    def setUp(self):
+        super(PollModuleCountersTest, self).setUp()
+        self.counters = DictCounters()
+        self.system._services['user_state_summary_counters'] = self.counters  # pylint: disable=protected-access
+
+    def test_votes_are_counted(self):
+        self.ajax_request('No', {})
+        # The vote is recorded without rewriting the shared poll_answers.
+        self.assertDictEqual(self.xmodule.poll_answers, {'Yes': 1, 'Dont_know': 0, 'No': 0})
+
+        response = self.ajax_request('get_state', {})
+        self.assertDictEqual(response['poll_answers'], {'Yes': 1, 'Dont_know': 0, 'No': 1})
+        self.assertEqual(response['total'], 2)
+
+        self.xmodule.descriptor.xml_attributes = {}
+        self.assertDictEqual(self.ajax_request('reset_poll', {}), {'status': 'success'})
+        response = self.ajax_request('get_state', {})
+        self.assertDictEqual(response['poll_answers'], {'Yes': 1, 'Dont_know': 0, 'No': 0})
+        self.assertEqual(response['total'], 1)
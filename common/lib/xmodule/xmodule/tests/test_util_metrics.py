@@ -0,0 +1,75 @@
+"""
+Tests for the in-process metrics aggregator.
+"""
+import mock
+import unittest
+
+from ..util.metrics import MetricsAggregator
+
+
+@mock.patch('xmodule.util.metrics.dog_stats_api')
+class TestMetricsAggregator(unittest.TestCase):
+    """
+    Test `MetricsAggregator`.
+    """
+    def setUp(self):
+        # A long interval, so that only the tests flush.
+        self.metrics = MetricsAggregator(flush_interval=3600)
+
+    def test_counters_are_summed_per_tag_set(self, mock_api):
+        for _ in range(3):
+            self.metrics.increment('events', tags=('type:a',))
+        self.metrics.increment('events', value=5, tags=['type:b'])
+        self.assertFalse(mock_api.increment.called)
+
+        self.metrics.flush()
+        self.assertEqual(mock_api.increment.call_count, 2)
+        mock_api.increment.assert_any_call('events', value=3, tags=['type:a'])
+        mock_api.increment.assert_any_call('events', value=5, tags=['type:b'])
+
+    def test_flush_empties_buffer(self, mock_api):
+        self.metrics.increment('events')
+        self.metrics.flush()
+        self.metrics.flush()
+        self.assertEqual(mock_api.increment.call_count, 1)
+
+    def test_timings_are_sent(self, mock_api):
+        self.metrics.timing('render', 1.0, tags=('view:student',))
+        self.metrics.timing('render', 3.0, tags=('view:student',))
+
+        self.metrics.flush()
+        mock_api.histogram.assert_any_call('render', 1.0, tags=['view:student'], sample_rate=1.0)
+        mock_api.histogram.assert_any_call('render', 3.0, tags=['view:student'], sample_rate=1.0)
+        self.assertEqual(mock_api.histogram.call_count, 2)
+        self.assertFalse(mock_api.increment.called)
+
+    def test_timings_are_sampled(self, mock_api):
+        values = range(200)
+        for value in values:
+            self.metrics.histogram('queries', value)
+
+        self.metrics.flush()
+        self.assertEqual(mock_api.histogram.call_count, 50)
+        for call in mock_api.histogram.call_args_list:
+            self.assertIn(call[0][1], values)
+            self.assertEqual(call[1]['sample_rate'], 0.25)
+
+    def test_timed(self, mock_api):
+        @self.metrics.timed('work')
+        def work():
+            """Do nothing, but return something."""
+            return 'done'
+
+        self.assertEqual(work(), 'done')
+        self.metrics.flush()
+        self.assertEqual(mock_api.histogram.call_args[0][0], 'work')
+        self.assertEqual(mock_api.histogram.call_args[1]['sample_rate'], 1.0)
+
+    def test_forked_process_drops_parent_metrics(self, mock_api):
+        self.metrics.increment('events')
+        # Pretend that we are now in a process forked after that increment.
+        self.metrics._pid = -1  # pylint: disable=protected-access
+        self.metrics.increment('events')
+
+        self.metrics.flush()
+        mock_api.increment.assert_called_once_with('events', value=1, tags=[])
@@ -3,7 +3,7 @@
 
 from webob.multidict import MultiDict
 from xmodule.word_cloud_module import WordCloudDescriptor
-from . import LogicTest
+from . import DictCounters, LogicTest
 
 
 class WordCloudModuleTest(LogicTest):
@@ -47,3 +47,44 @@ class WordCloudModuleTest(LogicTest):
             100.0,
             sum(i['percent'] for i in response['top_words']))
 
+
+
+class WordCloudModuleCountersTest(LogicTest):
+    """Logic tests for Word Cloud Xmodule, recording words with the counters service."""
+    descriptor_class = WordCloudDescriptor
+    raw_field_data = {
+        'all_words': {'cat': 10, 'dog': 5, 'mom': 1, 'dad': 2},
+        'top_words': {'cat': 10, 'dog': 5, 'dad': 2},
+        'submitted': False
+    }
+
+    def setUp(self):
+        super(WordCloudModuleCountersTest, self).setUp()
+        self.counters = DictCounters()
+        self.system._services['user_state_summary_counters'] = self.counters  # pylint: disable=protected-access
+
+    def test_words_are_counted(self):
+        post_data = MultiDict(('student_words[]', word) for word in ['cat', 'cat', 'dog', 'sun'])
+        response = self.ajax_request('submit', post_data)
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(response['submitted'], True)
+        self.assertEqual(response['total_count'], 22)
+        self.assertDictEqual(response['student_words'], {'sun': 1, 'dog': 6, 'cat': 12})
+        # The top words are computed from the counts.
+        self.assertDictEqual(
+            {word['text']: word['size'] for word in response['top_words']},
+            {'cat': 12, 'dad': 2, 'dog': 6, 'mom': 1, 'sun': 1}
+        )
+        self.assertEqual(100.0, sum(word['percent'] for word in response['top_words']))
+        # The words are recorded without rewriting the shared fields.
+        self.assertDictEqual(self.xmodule.all_words, {'cat': 10, 'dog': 5, 'mom': 1, 'dad': 2})
+        self.assertDictEqual(self.xmodule.top_words, {'cat': 10, 'dog': 5, 'dad': 2})
+
+        # Polling again returns the same counts.
+        self.assertDictEqual(self.ajax_request('get_state', {}), response)
+
+    def test_long_word(self):
+        long_word = 'word' * 100
+        response = self.ajax_request('submit', MultiDict([('student_words[]', long_word)]))
+        self.assertDictEqual(response['student_words'], {long_word: 1})
+        self.assertDictEqual(self.ajax_request('get_state', {})['student_words'], {long_word: 1})
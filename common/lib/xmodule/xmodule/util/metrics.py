@@ -0,0 +1,169 @@
+"""
+In-process aggregation of DataDog metrics.
+
+Sending a statsd packet, with a freshly built list of tags, for every event
+on a hot path (every model instantiated, every block rendered) costs more
+than the work being measured when the events come in the hundreds of
+thousands. The `MetricsAggregator` here instead sums counters, and samples
+timings, in memory, per metric name and set of tags, and a background thread
+sends them to `dog_stats_api` every `flush_interval` seconds.
+
+Use the module-level `metrics` aggregator::
+
+    from xmodule.util.metrics import metrics
+
+    metrics.increment('edxapp.db.model', tags=('action:initialized',))
+    with metrics.timer('track.send'):
+        ...
+
+Tags are best passed as tuples, which are used as-is in the aggregation key.
+"""
+import atexit
+import logging
+import os
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import time, sleep
+
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# Number of seconds between flushes of the aggregated metrics.
+DEFAULT_FLUSH_INTERVAL = 10
+
+# Number of values of each histogram kept per flush interval.
+HISTOGRAM_SAMPLE_SIZE = 50
+
+
+class MetricsAggregator(object):
+    """
+    Accumulates counters and timings in memory, and periodically sends
+    them to `dog_stats_api` from a background thread.
+
+    Counters are sent as a single increment of their total. Of the values of
+    timings and other histograms, a uniform sample of up to `sample_size` per
+    flush interval is sent, with the rate they were sampled at: datadog
+    scales their count back up, and estimates their percentiles and maximum
+    from the sample.
+    """
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, sample_size=HISTOGRAM_SAMPLE_SIZE):
+        self.flush_interval = flush_interval
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._random = random.Random()
+        self._pid = None
+
+    def increment(self, metric_name, value=1, tags=()):
+        """
+        Add `value` to the counter `metric_name` for the given `tags`.
+        """
+        key = (metric_name, tuple(tags or ()))
+        with self._lock:
+            self._ensure_flushing()
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def histogram(self, metric_name, value, tags=()):
+        """
+        Record a `value` of the distribution `metric_name`, such as the number
+        of queries made by a request.
+        """
+        key = (metric_name, tuple(tags or ()))
+        with self._lock:
+            self._ensure_flushing()
+            count, samples = self._timings.get(key, (0, []))
+            count += 1
+            # Reservoir sampling: each of the `count` values has the same chance to be kept.
+            if len(samples) < self.sample_size:
+                samples.append(value)
+            else:
+                index = self._random.randrange(count)
+                if index < self.sample_size:
+                    samples[index] = value
+            self._timings[key] = (count, samples)
+
+    def timing(self, metric_name, seconds, tags=()):
+        """
+        Record that something measured by `metric_name` took `seconds`.
+        """
+        self.histogram(metric_name, seconds, tags)
+
+    @contextmanager
+    def timer(self, metric_name, tags=()):
+        """
+        Context manager recording how long its body took as a timing of `metric_name`.
+        """
+        start = time()
+        try:
+            yield
+        finally:
+            self.timing(metric_name, time() - start, tags)
+
+    def timed(self, metric_name, tags=()):
+        """
+        Decorator recording how long each call of the function took as a timing of `metric_name`.
+        """
+        def decorator(func):
+            """Wrap `func` in a timer."""
+            @wraps(func)
+            def wrapped(*args, **kwargs):
+                """Call the wrapped function, timing it."""
+                with self.timer(metric_name, tags):
+                    return func(*args, **kwargs)
+            return wrapped
+        return decorator
+
+    def flush(self):
+        """
+        Send everything accumulated since the last flush to `dog_stats_api`.
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            timings, self._timings = self._timings, {}
+
+        for (metric_name, tags), value in counters.iteritems():
+            dog_stats_api.increment(metric_name, value=value, tags=list(tags))
+        for (metric_name, tags), (count, samples) in timings.iteritems():
+            sample_rate = float(len(samples)) / count
+            for value in samples:
+                dog_stats_api.histogram(metric_name, value, tags=list(tags), sample_rate=sample_rate)
+
+    def _ensure_flushing(self):
+        """
+        Start the flushing thread if this process doesn't have one yet.
+
+        Must be called with the lock held. Worker processes forked from a
+        parent that has already recorded metrics get their own thread, and
+        drop the parent's unflushed metrics rather than reporting them twice.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        if self._pid is not None:
+            self._counters = {}
+            self._timings = {}
+        self._pid = pid
+        thread = threading.Thread(target=self._flush_periodically, name='metrics-flush')
+        thread.daemon = True
+        thread.start()
+
+    def _flush_periodically(self):
+        """
+        Flush every `flush_interval` seconds, for as long as the process lives.
+        """
+        while True:
+            sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to flush metrics")
+
+
+metrics = MetricsAggregator()  # pylint: disable=invalid-name
+
+# Don't lose what was accumulated since the last flush when the process exits.
+atexit.register(metrics.flush)
@@ -4,6 +4,7 @@ Utility functions for transcripts.
 """
 import os
 import copy
+import hashlib
 import json
 import requests
 import logging
@@ -18,6 +19,15 @@ from xmodule.contentstore.django import contentstore
 
 log = logging.getLogger(__name__)
 
+# Converted transcripts are cached by the md5 of the content they were converted
+# from, so they never go stale.
+TRANSCRIPT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# The md5 of each transcript asset is cached too, and forgotten when the asset is
+# saved or deleted through this module. Assets can also be replaced from the Studio
+# Files & Uploads page, which doesn't, so only trust the cached md5 for a while.
+TRANSCRIPT_VERSION_CACHE_TIMEOUT = 5 * 60
+
 
 class TranscriptException(Exception):  # pylint disable=C0111
     pass
@@ -73,6 +83,7 @@ def save_to_store(content, name, mime_type, location):
     content_location = Transcript.asset_location(location, name)
     content = StaticContent(content_location, name, mime_type, content)
     contentstore().save(content)
+    Transcript.forget_version(content_location)
     return content_location
 
 def save_subs_to_store(subs, subs_id, item, language='en'):
@@ -421,11 +432,12 @@ def get_or_create_sjson(item):
     user_filename = item.transcripts[item.transcript_language]
     user_subs_id = os.path.splitext(user_filename)[0]
     source_subs_id, result_subs_dict = user_subs_id, {1.0: user_subs_id}
+    sjson_filename = subs_filename(source_subs_id, item.transcript_language)
     try:
-        sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
+        sjson_transcript = Transcript.converted(item.location, sjson_filename, 'sjson', 'sjson')
     except (NotFoundError):  # generating sjson from srt
         generate_sjson_for_all_speeds(item, user_filename, result_subs_dict, item.transcript_language)
-    sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
+    sjson_transcript = Transcript.converted(item.location, sjson_filename, 'sjson', 'sjson')
     return sjson_transcript
 
 class Transcript(object):
@@ -470,6 +482,73 @@ class Transcript(object):
             elif output_format == 'srt':
                 return generate_srt_from_sjson(json.loads(content), speed=1.0)
 
+    @staticmethod
+    def cache():
+        """
+        Return the cache of transcripts: the 'transcripts' cache if there is one, the default cache otherwise.
+        """
+        from django.core.cache import get_cache, InvalidCacheBackendError
+        try:
+            return get_cache('transcripts')
+        except InvalidCacheBackendError:
+            return get_cache('default')
+
+    @staticmethod
+    def _version_cache_key(asset_location):
+        """
+        Return the cache key of the md5 of the asset at `asset_location`.
+        """
+        return 'transcripts.version.{}'.format(hashlib.md5(unicode(asset_location).encode('utf8')).hexdigest())
+
+    @staticmethod
+    def version(asset_location):
+        """
+        Return the md5 of the content of the asset at `asset_location`, without reading that content.
+
+        Raises NotFoundError if there is no such asset.
+        """
+        cache = Transcript.cache()
+        key = Transcript._version_cache_key(asset_location)
+        version = cache.get(key)
+        if version is None:
+            version = contentstore().get_attrs(asset_location)['md5']
+            cache.set(key, version, TRANSCRIPT_VERSION_CACHE_TIMEOUT)
+        return version
+
+    @staticmethod
+    def forget_version(asset_location):
+        """
+        Drop the cached md5 of the asset at `asset_location`, which was just saved or deleted.
+        """
+        Transcript.cache().delete(Transcript._version_cache_key(asset_location))
+
+    @staticmethod
+    def converted(location, filename, input_format, output_format):
+        """
+        Return the content of the transcript asset `filename`, converted from
+        `input_format` to `output_format` (see convert). `location` is module location.
+
+        Conversions are cached by the md5 of the asset content, so that each version of
+        an asset is read from the contentstore and converted once per format.
+
+        Raises NotFoundError if there is no such asset, and the exceptions of convert.
+        """
+        asset_location = Transcript.asset_location(location, filename)
+        cache = Transcript.cache()
+        version = Transcript.version(asset_location)
+        key = u'transcripts.converted.{}.{}.{}'.format(version, input_format, output_format)
+        content = cache.get(key)
+        if content is None:
+            data = contentstore().find(asset_location).data
+            data_version = hashlib.md5(data).hexdigest()
+            if data_version != version:
+                # The asset was replaced since its md5 was cached.
+                cache.set(Transcript._version_cache_key(asset_location), data_version, TRANSCRIPT_VERSION_CACHE_TIMEOUT)
+                key = u'transcripts.converted.{}.{}.{}'.format(data_version, input_format, output_format)
+            content = Transcript.convert(data, input_format, output_format)
+            cache.set(key, content, TRANSCRIPT_CACHE_TIMEOUT)
+        return content
+
     @staticmethod
     def asset(location, subs_id, lang='en', filename=None):
         """
@@ -499,10 +578,12 @@ class Transcript(object):
         """
         Delete asset by location and filename.
         """
+        asset_location = Transcript.asset_location(location, filename)
         try:
-            contentstore().delete(Transcript.asset_location(location, filename))
+            contentstore().delete(asset_location)
             log.info("Transcript asset %s was removed from store.", filename)
         except NotFoundError:
             pass
+        Transcript.forget_version(asset_location)
         return StaticContent.compute_location(location.course_key, filename)
 
@@ -109,13 +109,14 @@ class VideoStudentViewHandlers(object):
         if youtube_id:
             # Youtube case:
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, youtube_id).data
+                return Transcript.converted(self.location, subs_filename(youtube_id), 'sjson', 'sjson')
 
             youtube_ids = youtube_speed_dict(self)
             assert youtube_id in youtube_ids
 
+            sjson_filename = subs_filename(youtube_id, self.transcript_language)
             try:
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
+                sjson_transcript = Transcript.converted(self.location, sjson_filename, 'sjson', 'sjson')
             except (NotFoundError):
                 log.info("Can't find content in storage for %s transcript: generating.", youtube_id)
                 generate_sjson_for_all_speeds(
@@ -124,13 +125,13 @@ class VideoStudentViewHandlers(object):
                     {speed: youtube_id for youtube_id, speed in youtube_ids.iteritems()},
                     self.transcript_language
                 )
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
+                sjson_transcript = Transcript.converted(self.location, sjson_filename, 'sjson', 'sjson')
 
             return sjson_transcript
         else:
             # HTML5 case
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, self.sub).data
+                return Transcript.converted(self.location, subs_filename(self.sub), 'sjson', 'sjson')
             else:
                 return get_or_create_sjson(self)
 
@@ -159,13 +160,11 @@ class VideoStudentViewHandlers(object):
                 log.debug("No subtitles for 'en' language")
                 raise ValueError
 
-            data = Transcript.asset(self.location, transcript_name, lang).data
             filename = u'{}.{}'.format(transcript_name, transcript_format)
-            content = Transcript.convert(data, 'sjson', transcript_format)
+            content = Transcript.converted(self.location, subs_filename(transcript_name, lang), 'sjson', transcript_format)
         else:
-            data = Transcript.asset(self.location, None, None, self.transcripts[lang]).data
             filename = u'{}.{}'.format(os.path.splitext(self.transcripts[lang])[0], transcript_format)
-            content = Transcript.convert(data, 'srt', transcript_format)
+            content = Transcript.converted(self.location, self.transcripts[lang], 'srt', transcript_format)
 
         if not content:
             log.debug('no subtitles produced in get_transcript')
@@ -213,6 +212,16 @@ class VideoStudentViewHandlers(object):
                 )
         return response
 
+    def _conditional_response(self, request, response):
+        """
+        Give `response`, a transcript, an ETag, and return 304 Not Modified instead
+        if the request says the client already has that transcript.
+        """
+        response.md5_etag()
+        if response.etag in request.if_none_match:
+            return Response(status=304, headerlist=[('ETag', response.headers['ETag'])])
+        return response
+
     @XBlock.handler
     def transcript(self, request, dispatch):
         """
@@ -233,6 +242,9 @@ class VideoStudentViewHandlers(object):
             `available_translations`:
                     Returns list of languages, for which transcript files exist.
                     For 'en' check if SJSON exists. For non-`en` check if SRT file exists.
+
+        `translation` and `download` responses have an ETag, and are 304 Not Modified
+        for requests with a matching If-None-Match header.
         """
         if dispatch.startswith('translation'):
 
@@ -266,6 +278,7 @@ class VideoStudentViewHandlers(object):
             else:
                 response = Response(transcript, headerlist=[('Content-Language', language)])
                 response.content_type = Transcript.mime_types['sjson']
+                response = self._conditional_response(request, response)
 
         elif dispatch == 'download':
             try:
@@ -282,19 +295,20 @@ class VideoStudentViewHandlers(object):
                     ]
                 )
                 response.content_type = transcript_mime_type
+                response = self._conditional_response(request, response)
 
         elif dispatch == 'available_translations':
             available_translations = []
             if self.sub:  # check if sjson exists for 'en'.
                 try:
-                    Transcript.asset(self.location, self.sub, 'en')
+                    Transcript.version(Transcript.asset_location(self.location, subs_filename(self.sub)))
                 except NotFoundError:
                     pass
                 else:
                     available_translations = ['en']
             for lang in self.transcripts:
                 try:
-                    Transcript.asset(self.location, None, None, self.transcripts[lang])
+                    Transcript.version(Transcript.asset_location(self.location, self.transcripts[lang]))
                 except NotFoundError:
                     continue
                 available_translations.append(lang)
@@ -8,12 +8,14 @@ If student have answered - words he entered and cloud.
 
 import json
 import logging
+from collections import Counter
 
 from pkg_resources import resource_string
 from xmodule.raw_module import EmptyDataRawDescriptor
 from xmodule.editing_module import MetadataOnlyEditingDescriptor
 from xmodule.x_module import XModule
 
+from xblock.core import XBlock
 from xblock.fields import Scope, Dict, Boolean, List, Integer, String
 
 log = logging.getLogger(__name__)
@@ -82,6 +84,7 @@ class WordCloudFields(object):
     )
 
 
+@XBlock.wants('user_state_summary_counters')
 class WordCloudModule(WordCloudFields, XModule):
     """WordCloud Xmodule"""
     js = {
@@ -97,7 +100,14 @@ class WordCloudModule(WordCloudFields, XModule):
     def get_state(self):
         """Return success json answer for client."""
         if self.submitted:
-            total_count = sum(self.all_words.itervalues())
+            counters = self.runtime.service(self, 'user_state_summary_counters')
+            if counters:
+                all_words = counters.get_counts(self, 'all_words')
+                top_words = self.top_dict(all_words, self.num_top_words)
+            else:
+                all_words = self.all_words
+                top_words = self.top_words
+            total_count = sum(all_words.itervalues())
             return json.dumps({
                 'status': 'success',
                 'submitted': True,
@@ -105,10 +115,10 @@ class WordCloudModule(WordCloudFields, XModule):
                     self.display_student_percents
                 ),
                 'student_words': {
-                    word: self.all_words[word] for word in self.student_words
+                    word: all_words.get(word, 0) for word in self.student_words
                 },
                 'total_count': total_count,
-                'top_words': self.prepare_words(self.top_words, total_count)
+                'top_words': self.prepare_words(top_words, total_count)
             })
         else:
             return json.dumps({
@@ -200,6 +210,15 @@ class WordCloudModule(WordCloudFields, XModule):
 
             self.student_words = student_words
 
+            counters = self.runtime.service(self, 'user_state_summary_counters')
+            if counters:
+                # Record the words without rewriting all_words, which all
+                # the students share. top_words is computed from the counts.
+                self.submitted = True
+                for word, count in Counter(self.student_words).iteritems():
+                    counters.increment(self, 'all_words', word, count)
+                return self.get_state()
+
             # FIXME: fix this, when xblock will support mutable types.
             # Now we use this hack.
             # speed issues
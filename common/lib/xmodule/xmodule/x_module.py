@@ -25,7 +25,7 @@ from xmodule.errortracker import exc_info_to_str
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from opaque_keys.edx.keys import UsageKey
 from xmodule.exceptions import UndefinedContext
-from dogapi import dog_stats_api
+from xmodule.util.metrics import metrics
 
 
 log = logging.getLogger(__name__)
@@ -1034,13 +1034,13 @@ class MetricsMixin(object):
 
         finally:
             course_id = getattr(self, 'course_id', '')
-            dog_stats_api.increment(XMODULE_METRIC_NAME, tags=[
+            metrics.increment(XMODULE_METRIC_NAME, tags=(
                 u'view_name:{}'.format(view_name),
                 u'action:render',
                 u'action_status:{}'.format(status),
                 u'course_id:{}'.format(course_id),
                 u'block_type:{}'.format(block.scope_ids.block_type)
-            ])
+            ))
 
     def handle(self, block, handler_name, request, suffix=''):
         handle = None
@@ -1054,13 +1054,13 @@ class MetricsMixin(object):
 
         finally:
             course_id = getattr(self, 'course_id', '')
-            dog_stats_api.increment(XMODULE_METRIC_NAME, tags=[
+            metrics.increment(XMODULE_METRIC_NAME, tags=(
                 u'handler_name:{}'.format(handler_name),
                 u'action:handle',
                 u'action_status:{}'.format(status),
                 u'course_id:{}'.format(course_id),
                 u'block_type:{}'.format(block.scope_ids.block_type)
-            ])
+            ))
 
 
 class DescriptorSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):  # pylint: disable=abstract-method
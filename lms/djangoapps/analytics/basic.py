@@ -6,6 +6,7 @@ Serve miscellaneous course and student data
 
 from django.contrib.auth.models import User
 import xmodule.graders as xmgraders
+from util.query import use_read_replica_if_available
 
 
 STUDENT_FEATURES = ('id', 'username', 'first_name', 'last_name', 'is_staff', 'email')
@@ -25,16 +26,24 @@ def enrolled_students_features(course_id, features):
         {'username': 'username3', 'first_name': 'firstname3'}
     ]
     """
-    students = User.objects.filter(
+    return list(iterate_enrolled_students_features(course_id, features))
+
+
+def iterate_enrolled_students_features(course_id, features):
+    """
+    Yield the student features of enrolled_students_features one student at a
+    time, without holding all of the students in memory.
+    """
+    students = use_read_replica_if_available(User.objects.filter(
         courseenrollment__course_id=course_id,
         courseenrollment__is_active=1,
-    ).order_by('username').select_related('profile')
+    ).order_by('username').select_related('profile'))
 
-    def extract_student(student, features):
-        """ convert student to dictionary """
-        student_features = [x for x in STUDENT_FEATURES if x in features]
-        profile_features = [x for x in PROFILE_FEATURES if x in features]
+    student_features = [x for x in STUDENT_FEATURES if x in features]
+    profile_features = [x for x in PROFILE_FEATURES if x in features]
 
+    def extract_student(student):
+        """ convert student to dictionary """
         student_dict = dict((feature, getattr(student, feature))
                             for feature in student_features)
         profile = student.profile
@@ -44,7 +53,8 @@ def enrolled_students_features(course_id, features):
             student_dict.update(profile_dict)
         return student_dict
 
-    return [extract_student(student, features) for student in students]
+    for student in students.iterator():
+        yield extract_student(student)
 
 
 def dump_grading_context(course):
@@ -5,8 +5,12 @@ Format and create csv responses
 """
 
 import csv
+from cStringIO import StringIO
 from django.http import HttpResponse
 
+# Rows are sent to the client in blocks of at least this many bytes.
+CSV_RESPONSE_BLOCK_SIZE = 64 * 1024
+
 
 def create_csv_response(filename, header, datarows):
     """
@@ -14,12 +18,25 @@ def create_csv_response(filename, header, datarows):
 
     header   e.g. ['Name', 'Email']
     datarows e.g. [['Jim', 'jim@edy.org'], ['Jake', 'jake@edy.org'], ...]
+
+    datarows can be any iterable, e.g. a generator over a queryset's
+    iterator(). It is only consumed as the response is sent, so the
+    file is never held in memory in full.
     """
-    response = HttpResponse(mimetype='text/csv')
+    response = HttpResponse(_iterate_csv_blocks(header, datarows), mimetype='text/csv')
     response['Content-Disposition'] = 'attachment; filename={0}'\
         .format(filename)
+    return response
+
+
+def _iterate_csv_blocks(header, datarows):
+    """
+    Yield the CSV file for header and datarows in blocks of
+    about CSV_RESPONSE_BLOCK_SIZE bytes.
+    """
+    block = StringIO()
     csvwriter = csv.writer(
-        response,
+        block,
         dialect='excel',
         quotechar='"',
         quoting=csv.QUOTE_ALL)
@@ -28,7 +45,11 @@ def create_csv_response(filename, header, datarows):
     for datarow in datarows:
         encoded_row = [unicode(s).encode('utf-8') for s in datarow]
         csvwriter.writerow(encoded_row)
-    return response
+        if block.tell() >= CSV_RESPONSE_BLOCK_SIZE:
+            yield block.getvalue()
+            block.seek(0)
+            block.truncate()
+    yield block.getvalue()
 
 
 def format_dictlist(dictlist, features):
@@ -23,6 +23,7 @@ The distribution in a course for gender might look like:
 
 from django.db.models import Count
 from student.models import CourseEnrollment, UserProfile
+from util.query import reporting
 
 # choices with a restricted domain, e.g. level_of_education
 _EASY_CHOICE_FEATURES = ('gender', 'level_of_education')
@@ -81,6 +82,7 @@ class ProfileDistribution(object):
             validation_assert(isinstance(self.choices_display_names, dict))
 
 
+@reporting
 def profile_distribution(course_id, feature):
     """
     Retrieve distribution of students over a given feature.
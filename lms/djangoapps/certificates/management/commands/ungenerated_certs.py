@@ -3,9 +3,11 @@ Management command to find all students that need certificates for
 courses that have finished, and put their cert requests on the queue.
 """
 from django.core.management.base import BaseCommand, CommandError
+from django.test.client import RequestFactory
 from certificates.models import certificate_status_for_student
 from certificates.queue import XQueueCertInterface
 from django.contrib.auth.models import User
+from instructor_task.api import submit_generate_certificates
 from optparse import make_option
 from django.conf import settings
 from opaque_keys import InvalidKeyError
@@ -28,6 +30,11 @@ class Command(BaseCommand):
 
     Use the --noop option to test without actually putting certificates on the
     queue to be generated.
+
+    Use the --async option to generate the certificates in parallel background
+    tasks instead, in chunks of students. Students are skipped once their
+    certificate has been requested, so if generation is interrupted, running
+    the command again only processes the remaining students.
     """
 
     option_list = BaseCommand.option_list + (
@@ -55,6 +62,12 @@ class Command(BaseCommand):
                     'whose entry in the certificate table matches STATUS. '
                     'STATUS can be generating, unavailable, deleted, error '
                     'or notpassing.'),
+        make_option('-a', '--async',
+                    metavar='USERNAME',
+                    dest='async',
+                    default=False,
+                    help='Generate certificates with background tasks, '
+                    'recorded as an instructor task requested by USERNAME'),
     )
 
     def handle(self, *args, **options):
@@ -64,7 +77,7 @@ class Command(BaseCommand):
         # to something else with the force flag
 
         if options['force']:
-            valid_statuses = getattr(CertificateStatuses, options['force'])
+            valid_statuses = [getattr(CertificateStatuses, options['force'])]
         else:
             valid_statuses = [CertificateStatuses.unavailable]
 
@@ -83,6 +96,23 @@ class Command(BaseCommand):
         else:
             raise CommandError("You must specify a course")
 
+        if options['async']:
+            try:
+                requester = User.objects.get(username=options['async'])
+            except User.DoesNotExist:
+                raise CommandError("No user named {}".format(options['async']))
+            # Instructor tasks record who requested them and where from.
+            request = RequestFactory().get('/')
+            request.user = requester
+            for course_key in ended_courses:
+                if not options['noop']:
+                    instructor_task = submit_generate_certificates(
+                        request, course_key, valid_statuses, insecure=options['insecure']
+                    )
+                    print "Queued certificate generation for {0} as task {1}".format(
+                        course_key.to_deprecated_string(), instructor_task.task_id)
+            return
+
         for course_key in ended_courses:
             # prefetch all chapters/sequentials by saying depth=2
             course = modulestore().get_course(course_key, depth=2)
@@ -160,3 +160,21 @@ def certificate_status_for_student(student, course_id):
     except GeneratedCertificate.DoesNotExist:
         pass
     return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor}
+
+
+def certificate_statuses_for_students(student_ids, course_id):
+    """
+    Bulk version of `certificate_status_for_student`, for batch jobs.
+
+    Returns a dict mapping each id in `student_ids` to the status of that
+    student's certificate in `course_id`, looked up with a single query.
+    Students without a certificate have the status "unavailable".
+    """
+    statuses = dict.fromkeys(student_ids, CertificateStatuses.unavailable)
+    statuses.update(
+        GeneratedCertificate.objects.filter(
+            course_id=course_id,
+            user__in=student_ids,
+        ).values_list('user_id', 'status')
+    )
+    return statuses
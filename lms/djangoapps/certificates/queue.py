@@ -125,7 +125,7 @@ class XQueueCertInterface(object):
 
         raise NotImplementedError
 
-    def add_cert(self, student, course_id, course=None, forced_grade=None, template_file=None, title='None'):
+    def add_cert(self, student, course_id, course=None, forced_grade=None, template_file=None, title='None', gradeset=None):
         """
         Request a new certificate for a student.
 
@@ -135,6 +135,10 @@ class XQueueCertInterface(object):
           forced_grade - a string indicating a grade parameter to pass with
                          the certificate request. If this is given, grading
                          will be skipped.
+          gradeset - the student's grade summary, as returned by
+                     courseware.grades.grade, if the caller has already
+                     graded them (e.g. in bulk); the student is then not
+                     graded again.
 
         Will change the certificate status to 'generating'.
 
@@ -179,7 +183,10 @@ class XQueueCertInterface(object):
 
             course_name = course.display_name or course_id.to_deprecated_string()
             is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
-            grade = grades.grade(student, self.request, course)
+            if gradeset is not None:
+                grade = dict(gradeset)
+            else:
+                grade = grades.grade(student, self.request, course)
             enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
             mode_is_verified = (enrollment_mode == GeneratedCertificate.MODES.verified)
             user_is_verified = SoftwareSecurePhotoVerification.user_is_verified(student)
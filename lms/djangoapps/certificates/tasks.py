@@ -0,0 +1,201 @@
+"""
+This module contains celery task functions for generating the certificates of
+a course in parallel, in chunks of students.
+"""
+import json
+
+from dogapi import dog_stats_api
+
+from celery import task
+from celery.utils.log import get_task_logger
+from celery.states import SUCCESS, FAILURE
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from certificates.models import (
+    CertificateStatuses, GeneratedCertificate, certificate_statuses_for_students
+)
+from certificates.queue import XQueueCertInterface
+from courseware.courses import get_course_by_id
+from courseware.grades import iterate_grades_for
+from instructor_task.models import InstructorTask
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    queue_subtasks_for_query,
+    check_subtask_is_valid,
+    update_subtask_status,
+)
+from monitoring.signals import bulk_model_metrics
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from util.query import use_read_replica_if_available
+
+log = get_task_logger(__name__)
+
+
+def _get_student_queryset(course_id, statuses):
+    """
+    Returns a query set of the students enrolled in the course whose
+    certificate is in one of `statuses`.
+
+    Students whose certificate has moved on to another status are left out,
+    so rerunning a generation that was interrupted only picks up the
+    students it had not got to yet.
+    """
+    students = User.objects.filter(courseenrollment__course_id=course_id)
+    if CertificateStatuses.unavailable in statuses:
+        # Students without a certificate count as "unavailable" too.
+        finished = GeneratedCertificate.objects.filter(course_id=course_id).exclude(status__in=statuses)
+        students = students.exclude(id__in=finished.values('user_id'))
+    else:
+        pending = GeneratedCertificate.objects.filter(course_id=course_id, status__in=statuses)
+        students = students.filter(id__in=pending.values('user_id'))
+    return use_read_replica_if_available(students)
+
+
+def perform_delegate_certificate_generation(entry_id, course_id, task_input, action_name):
+    """
+    Delegates certificate generation by querying for the students whose
+    certificates still need to be generated, chopping them up into batches of
+    no more than settings.CERTIFICATE_GENERATION_STUDENTS_PER_TASK in size,
+    and queueing up worker jobs.
+
+    The task_input should be a dict with the following entries:
+
+      'statuses': certificates are only generated for students whose current
+          certificate status is in this list.  (required)
+
+      'insecure': if true, xqueue calls back to the LMS over http rather
+          than https.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_id = entry.task_id
+
+    # Perfunctory check, since expansion is made for convenience of other task
+    # code that doesn't need the entry_id.
+    if course_id != entry.course_id:
+        format_msg = u"Course id conflict: explicit value %r does not match task value %r"
+        log.warning(u"Task %s: " + format_msg, task_id, course_id, entry.course_id)
+        raise ValueError(format_msg % (course_id, entry.course_id))
+
+    # As with bulk email, if the task was requeued after its subtasks were
+    # defined, the subtasks already queued will do the work.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        log.warning(u"Task %s has already been processed for certificates!  InstructorTask = %s", task_id, entry)
+        progress = json.loads(entry.task_output)
+        return progress
+
+    def _create_generate_certificates_subtask(to_list, initial_subtask_status):
+        """Creates a subtask to generate certificates for a given list of students."""
+        subtask_id = initial_subtask_status.task_id
+        new_subtask = generate_certificates_for_students.subtask(
+            (
+                entry_id,
+                course_id.to_deprecated_string(),
+                to_list,
+                task_input,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=subtask_id,
+            routing_key=settings.CERTIFICATE_GENERATION_ROUTING_KEY,
+        )
+        return new_subtask
+
+    student_qset = _get_student_queryset(course_id, task_input['statuses'])
+
+    log.info(u"Task %s: Preparing to queue subtasks for generating certificates for course %s, statuses %s",
+             task_id, course_id, task_input['statuses'])
+
+    progress = queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_generate_certificates_subtask,
+        student_qset,
+        [],
+        settings.CERTIFICATE_GENERATION_STUDENTS_PER_TASK,
+    )
+
+    # As with bulk email, the InstructorTask holds the "real" status from here on.
+    return progress
+
+
+@task  # pylint: disable=E1102
+def generate_certificates_for_students(entry_id, course_id, to_list, task_input, subtask_status_dict):
+    """
+    Generates certificates for a list of students.
+
+    Inputs are:
+      * `entry_id`: id of the InstructorTask object to which progress should be recorded.
+      * `course_id`: id of the course, as a deprecated string.
+      * `to_list`: list of students.  Each is represented as a dict with the key
+        'pk', the primary key of the User model.
+      * `task_input`: the task_input of the InstructorTask; see
+        `perform_delegate_certificate_generation`.
+      * `subtask_status_dict` : dict containing values representing current status,
+        as defined by SubtaskStatus.to_dict().
+
+    Students whose certificate status is no longer in task_input['statuses'] are
+    skipped.  The others are graded together and their certificate requests are
+    put on the queue.  Updates the InstructorTask object with status information
+    (generated, failures, skips) and updates number of subtasks completed.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    log.info(u"Preparing to generate certificates for %d students as subtask %s for instructor task %d: status=%s",
+             len(to_list), current_task_id, entry_id, subtask_status)
+
+    # Check that the requested subtask is actually known to the current InstructorTask entry,
+    # and that it has not already been completed, as for bulk email.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    num_previously_processed = subtask_status.attempted + subtask_status.skipped
+    try:
+        with dog_stats_api.timer('certificates.generation.single_task.time.overall', tags=[u'course:{}'.format(course_id)]):
+            with bulk_model_metrics():
+                _generate_certificates(course_key, to_list, task_input, subtask_status)
+    except Exception:
+        # Unexpected exception. Try to write out the failure to the entry before failing.
+        log.exception("Generate-certificates task %s: failed unexpectedly!", current_task_id)
+        # Since we don't know how far the task got, count the students that
+        # haven't been accounted for as having failed, to keep the counts consistent.
+        num_processed = subtask_status.attempted + subtask_status.skipped - num_previously_processed
+        subtask_status.increment(failed=len(to_list) - num_processed, state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    log.info("Generate-certificates task %s: succeeded", current_task_id)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+
+    # return status in a form that can be serialized by Celery into JSON:
+    return subtask_status.to_dict()
+
+
+def _generate_certificates(course_id, to_list, task_input, subtask_status):
+    """
+    Grades the students in `to_list` and requests their certificates,
+    recording the outcome for each student in `subtask_status`.
+    """
+    statuses = certificate_statuses_for_students([item['pk'] for item in to_list], course_id)
+    pending_ids = [student_id for student_id, status in statuses.iteritems() if status in task_input['statuses']]
+    subtask_status.increment(skipped=len(to_list) - len(pending_ids))
+
+    course = get_course_by_id(course_id)
+    xqueue = XQueueCertInterface()
+    if task_input.get('insecure'):
+        xqueue.use_https = False
+
+    students = User.objects.filter(id__in=pending_ids)
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students):
+        if not gradeset:
+            log.warning(u"Unable to grade student %s for certificate in course %s: %s", student.id, course_id, err_msg)
+            subtask_status.increment(failed=1)
+            continue
+        try:
+            xqueue.add_cert(student, course_id, course=course, gradeset=gradeset)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"Unable to add certificate request for student %s in course %s", student.id, course_id)
+            subtask_status.increment(failed=1)
+        else:
+            subtask_status.increment(succeeded=1)
@@ -0,0 +1,97 @@
+"""
+Tests for the certificate generation tasks.
+"""
+import json
+from uuid import uuid4
+
+from mock import patch
+
+from certificates.models import CertificateStatuses, GeneratedCertificate
+from certificates.tasks import generate_certificates_for_students, _get_student_queryset
+from certificates.tests.factories import GeneratedCertificateFactory
+from instructor_task.models import InstructorTask
+from instructor_task.subtasks import SubtaskStatus, initialize_subtask_info
+from instructor_task.tests.factories import InstructorTaskFactory
+from instructor_task.tests.test_base import InstructorTaskCourseTestCase
+
+
+class GenerateCertificatesTaskTest(InstructorTaskCourseTestCase):
+    """
+    Tests for generating certificates in subtasks.
+    """
+    def setUp(self):
+        super(GenerateCertificatesTaskTest, self).setUp()
+        self.initialize_course()
+        self.students = [self.create_student('student{}'.format(index)) for index in range(3)]
+        # The first student already has a certificate
+        GeneratedCertificateFactory.create(
+            user=self.students[0],
+            course_id=self.course.id,
+            status=CertificateStatuses.downloadable,
+        )
+
+    def test_student_queryset_skips_finished_students(self):
+        students = _get_student_queryset(self.course.id, [CertificateStatuses.unavailable])
+        self.assertEqual(set(students), set(self.students[1:]))
+
+    def test_student_queryset_forced_status(self):
+        students = _get_student_queryset(self.course.id, [CertificateStatuses.downloadable])
+        self.assertEqual(list(students), self.students[:1])
+
+    def _run_subtask(self, to_list, gradesets):
+        """
+        Run a certificate generation subtask over `to_list` with the
+        students' grades mocked out as `gradesets`, and return its status.
+        """
+        subtask_id = str(uuid4())
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_type='generate_certificates',
+        )
+        initialize_subtask_info(entry, 'certified', len(to_list), [subtask_id])
+
+        def iterate_grades(_course_id, students):
+            """Yield the mocked grades of the students being graded."""
+            for student in students:
+                yield student, gradesets[student.id], ''
+
+        with patch('certificates.tasks.iterate_grades_for', side_effect=iterate_grades):
+            with patch('certificates.tasks.XQueueCertInterface') as mock_xqueue:
+                generate_certificates_for_students(
+                    entry.id,
+                    self.course.id.to_deprecated_string(),
+                    to_list,
+                    {'statuses': [CertificateStatuses.unavailable]},
+                    SubtaskStatus.create(subtask_id).to_dict(),
+                )
+
+        subtasks = json.loads(InstructorTask.objects.get(id=entry.id).subtasks)
+        return mock_xqueue.return_value, subtasks['status'][subtask_id]
+
+    def test_generate_certificates(self):
+        gradesets = {student.id: {'grade': 'Pass', 'percent': 0.9} for student in self.students}
+        to_list = [{'pk': student.id} for student in self.students]
+        xqueue, status = self._run_subtask(to_list, gradesets)
+
+        self.assertEqual(xqueue.add_cert.call_count, 2)
+        for call_args in xqueue.add_cert.call_args_list:
+            self.assertIn(call_args[0][0], self.students[1:])
+            self.assertEqual(call_args[1]['gradeset'], gradesets[call_args[0][0].id])
+        self.assertEqual(status['succeeded'], 2)
+        self.assertEqual(status['skipped'], 1)
+        self.assertEqual(status['failed'], 0)
+        self.assertEqual(status['state'], 'SUCCESS')
+
+    def test_ungradable_student_fails(self):
+        gradesets = {student.id: {'grade': 'Pass', 'percent': 0.9} for student in self.students}
+        gradesets[self.students[2].id] = {}
+        to_list = [{'pk': student.id} for student in self.students[1:]]
+        xqueue, status = self._run_subtask(to_list, gradesets)
+
+        self.assertEqual(xqueue.add_cert.call_count, 1)
+        self.assertEqual(status['succeeded'], 1)
+        self.assertEqual(status['failed'], 1)
+        self.assertFalse(
+            GeneratedCertificate.objects.filter(user=self.students[2], course_id=self.course.id).exists()
+        )
@@ -7,7 +7,11 @@ from django.test import TestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from student.tests.factories import UserFactory
-from certificates.models import CertificateStatuses, GeneratedCertificate, certificate_status_for_student
+from certificates.models import (
+    CertificateStatuses, GeneratedCertificate, certificate_status_for_student,
+    certificate_statuses_for_students
+)
+from certificates.tests.factories import GeneratedCertificateFactory
 
 
 class CertificatesModelTest(TestCase):
@@ -22,3 +26,19 @@ class CertificatesModelTest(TestCase):
         certificate_status = certificate_status_for_student(student, course.id)
         self.assertEqual(certificate_status['status'], CertificateStatuses.unavailable)
         self.assertEqual(certificate_status['mode'], GeneratedCertificate.MODES.honor)
+
+    def test_certificate_statuses_for_students(self):
+        students = [UserFactory() for __ in range(2)]
+        course = CourseFactory.create(org='edx', number='verified', display_name='Verified Course')
+        GeneratedCertificateFactory.create(
+            user=students[0],
+            course_id=course.id,
+            status=CertificateStatuses.downloadable,
+        )
+
+        with self.assertNumQueries(1):
+            statuses = certificate_statuses_for_students([student.id for student in students], course.id)
+        self.assertEqual(statuses, {
+            students[0].id: CertificateStatuses.downloadable,
+            students[1].id: CertificateStatuses.unavailable,
+        })
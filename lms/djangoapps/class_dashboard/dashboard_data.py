@@ -2,6 +2,7 @@
 Computes the data to display on the Instructor Dashboard
 """
 from util.json_request import JsonResponse
+from util.query import reporting, use_read_replica_if_available
 import json
 
 from courseware import models
@@ -17,6 +18,7 @@ from opaque_keys.edx.locations import Location
 # Used to limit the length of list displayed to the screen.
 MAX_SCREEN_LIST_LENGTH = 250
 
+@reporting
 def get_problem_grade_distribution(course_id):
     """
     Returns the grade distribution per problem for the course
@@ -65,6 +67,7 @@ def get_problem_grade_distribution(course_id):
     return prob_grade_distrib, total_student_count
 
 
+@reporting
 def get_sequential_open_distrib(course_id):
     """
     Returns the number of students that opened each subsection/sequential of the course
@@ -89,6 +92,7 @@ def get_sequential_open_distrib(course_id):
     return sequential_open_distrib
 
 
+@reporting
 def get_problem_set_grade_distrib(course_id, problem_set):
     """
     Returns the grade distribution for the problems specified in `problem_set`.
@@ -425,6 +429,7 @@ def get_array_section_has_problem(course_id):
     return b_section_has_problem
 
 
+@reporting
 def get_students_opened_subsection(request, csv=False):
     """
     Get a list of students that opened a particular subsection.
@@ -436,11 +441,12 @@ def get_students_opened_subsection(request, csv=False):
     module_state_key = Location.from_deprecated_string(request.GET.get('module_id'))
     csv = request.GET.get('csv')
 
-    # Query for "opened a subsection" students
-    students = models.StudentModule.objects.select_related('student').filter(
+    # Query for "opened a subsection" students. The CSV rows are read after
+    # this function returns, so the queryset uses the replica itself.
+    students = use_read_replica_if_available(models.StudentModule.objects.select_related('student').filter(
         module_state_key__exact=module_state_key,
         module_type__exact='sequential',
-    ).values('student__username', 'student__profile__name').order_by('student__profile__name')
+    ).values('student__username', 'student__profile__name').order_by('student__profile__name'))
 
     results = []
     if not csv:
@@ -470,13 +476,16 @@ def get_students_opened_subsection(request, csv=False):
         filename = sanitize_filename(' '.join(tooltip.split(' ')[3:]))
 
         header = [_("Name").encode('utf-8'), _("Username").encode('utf-8')]
-        for student in students:
-            results.append([student['student__profile__name'], student['student__username']])
+        results = (
+            [student['student__profile__name'], student['student__username']]
+            for student in students.iterator()
+        )
 
         response = create_csv_response(filename, header, results)
         return response
 
 
+@reporting
 def get_students_problem_grades(request, csv=False):
     """
     Get a list of students and grades for a particular problem.
@@ -488,12 +497,13 @@ def get_students_problem_grades(request, csv=False):
     module_state_key = Location.from_deprecated_string(request.GET.get('module_id'))
     csv = request.GET.get('csv')
 
-    # Query for "problem grades" students
-    students = models.StudentModule.objects.select_related('student').filter(
+    # Query for "problem grades" students. The CSV rows are read after
+    # this function returns, so the queryset uses the replica itself.
+    students = use_read_replica_if_available(models.StudentModule.objects.select_related('student').filter(
         module_state_key=module_state_key,
         module_type__exact='problem',
         grade__isnull=False,
-    ).values('student__username', 'student__profile__name', 'grade', 'max_grade').order_by('student__profile__name')
+    ).values('student__username', 'student__profile__name', 'grade', 'max_grade').order_by('student__profile__name'))
 
     results = []
     if not csv:
@@ -528,14 +538,16 @@ def get_students_problem_grades(request, csv=False):
         filename = sanitize_filename(tooltip[:tooltip.rfind(' - ')])
 
         header = [_("Name").encode('utf-8'), _("Username").encode('utf-8'), _("Grade").encode('utf-8'), _("Percent").encode('utf-8')]
-        for student in students:
 
-            percent = 0
-            if student['max_grade'] > 0:
-                percent = round(student['grade'] * 100 / student['max_grade'])
-            results.append([student['student__profile__name'], student['student__username'], student['grade'], percent])
+        def student_rows():
+            """Yield the CSV row of each student, without holding them all in memory."""
+            for student in students.iterator():
+                percent = 0
+                if student['max_grade'] > 0:
+                    percent = round(student['grade'] * 100 / student['max_grade'])
+                yield [student['student__profile__name'], student['student__username'], student['grade'], percent]
 
-        response = create_csv_response(filename, header, results)
+        response = create_csv_response(filename, header, student_rows())
         return response
 
 
@@ -245,6 +245,20 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
         # Check response contains 1 line for each user +1 for the header
         self.assertEquals(USER_COUNT + 1, len(response.content.splitlines()))
 
+    def test_students_csv_use_read_replica(self):
+        # The CSV rows are read after the views return, outside their reporting context.
+        for view, url_name, tooltip in [
+                (get_students_opened_subsection, 'get_students_opened_subsection', 'n students opened S1'),
+                (get_students_problem_grades, 'get_students_problem_grades', 'P1 - n Students'),
+        ]:
+            attributes = '?module_id=' + self.item.location.to_deprecated_string() + '&tooltip=' + tooltip + '&csv=true'
+            request = self.request_factory.get(reverse(url_name) + attributes)
+            with patch('class_dashboard.dashboard_data.use_read_replica_if_available') as use_replica:
+                use_replica.return_value.iterator.return_value = []
+                response = view(request)
+                self.assertEquals(1, len(response.content.splitlines()))
+            use_replica.return_value.iterator.assert_called_once_with()
+
     def test_post_metrics_data_subsections_csv(self):
 
         url = reverse('post_metrics_data_csv')
@@ -0,0 +1,353 @@
+"""
+Benchmarks of the modulestore, grading and capa hot paths.
+
+`run_benchmarks` builds synthetic courses of a configurable size in the old
+Mongo and split modulestores, and in an XML modulestore by exporting one of
+them, and times the operations that the courseware and grading depend on.
+The timings are returned as a JSON-serializable dict, so that the results of
+different commits can be compared.
+
+Run them with `paver run_benchmarks`, which uses the lms.envs.benchmark settings.
+"""
+import gettext
+import json
+import logging
+import random
+import shutil
+import tempfile
+from collections import namedtuple
+from time import time
+from uuid import uuid4
+
+import fs.osfs
+from django.contrib.auth.models import User
+from django.test.client import RequestFactory
+
+from capa.capa_problem import LoncapaProblem, LoncapaSystem
+from courseware import grades
+from courseware.models import StudentModule
+from student.models import CourseEnrollment
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml import XMLModuleStore
+from xmodule.modulestore.xml_exporter import export_to_xml
+from xmodule.modulestore.xml_importer import import_from_xml
+
+log = logging.getLogger(__name__)
+
+# The number of children of each kind of block in a synthetic course: the
+# course has `chapters` chapters, each of which has `sequentials` sequentials,
+# and so on down to the problems in each vertical.
+CourseShape = namedtuple('CourseShape', 'chapters sequentials verticals problems')
+
+STORE_TYPES = (ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.xml)
+
+# Number of blocks that the per-block benchmarks (get_item, ...) are run for.
+SAMPLE_SIZE = 100
+
+USER_ID = ModuleStoreEnum.UserID.test
+
+PROBLEM_XML = """
+<problem>
+  <p>Which of these numbers is prime?</p>
+  <multiplechoiceresponse>
+    <choicegroup type="MultipleChoice">
+      <choice correct="false">4</choice>
+      <choice correct="true">7</choice>
+      <choice correct="false">9</choice>
+    </choicegroup>
+  </multiplechoiceresponse>
+  <p>What is 2 + 2?</p>
+  <numericalresponse answer="4">
+    <responseparam type="tolerance" default="0.01"/>
+    <formulaequationinput/>
+  </numericalresponse>
+  <p>What color is a clear sky?</p>
+  <stringresponse answer="blue" type="ci">
+    <textline size="20"/>
+  </stringresponse>
+</problem>
+"""
+
+# The maximum score of PROBLEM_XML: one point per response.
+PROBLEM_MAX_SCORE = 3
+
+
+class BenchmarkRecorder(object):
+    """
+    Times benchmarks, and collects their results.
+
+    Each result is a dict with the name of the benchmark, the store (or
+    subsystem) it was run against, and either the number of runs and their
+    total, min, mean, median and max durations in seconds, or the error that
+    stopped it.
+    """
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def time(self, name, store_type, func, repeat=None):
+        """
+        Time `repeat` calls of `func`, which takes no arguments, and return
+        the value returned by the last one, or None if it failed.
+        """
+        return self.time_each(name, store_type, lambda _: func(), range(repeat or self.repeat))
+
+    def time_each(self, name, store_type, func, items):
+        """
+        Time the call of `func` for each of `items`, and return the value
+        returned by the last one, or None if it failed.
+        """
+        durations = []
+        value = None
+        try:
+            for item in items:
+                start = time()
+                value = func(item)
+                durations.append(time() - start)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(u"Benchmark %s failed on the %s store", name, store_type)
+            self.results.append({
+                'benchmark': name,
+                'store': store_type,
+                'error': u'{}: {}'.format(exc.__class__.__name__, exc),
+            })
+            return None
+
+        self.results.append(_summarize(name, store_type, durations))
+        return value
+
+
+def _summarize(name, store_type, durations):
+    """
+    Return the result of the benchmark `name` given the `durations` of its runs.
+    """
+    durations = sorted(durations)
+    count = len(durations)
+    result = {'benchmark': name, 'store': store_type, 'runs': count}
+    if count:
+        middle = count // 2
+        result.update({
+            'total': sum(durations),
+            'min': durations[0],
+            'mean': sum(durations) / count,
+            'median': durations[middle] if count % 2 else (durations[middle - 1] + durations[middle]) / 2,
+            'max': durations[-1],
+        })
+    return result
+
+
+def build_course(store, store_type, shape):
+    """
+    Create a course of the given `shape` in the `store_type` store of the
+    mixed modulestore `store`, with PROBLEM_XML for each problem.
+
+    Returns the key of the course, and the locations of its verticals and of its problems.
+    """
+    with store.default_store(store_type):
+        course = store.create_course('Benchmark', 'B{}'.format(uuid4().hex[:8]), 'run', USER_ID)
+    course_key = course.id
+
+    verticals = []
+    problems = []
+    with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+        with store.bulk_write_operations(course_key):
+            for chapter_index in xrange(shape.chapters):
+                chapter = _create_child(store, course, 'chapter', chapter_index)
+                for sequential_index in xrange(shape.sequentials):
+                    sequential = _create_child(
+                        store, chapter, 'sequential', sequential_index, graded=True, format='Homework'
+                    )
+                    for vertical_index in xrange(shape.verticals):
+                        vertical = _create_child(store, sequential, 'vertical', vertical_index)
+                        verticals.append(vertical.location.version_agnostic())
+                        for problem_index in xrange(shape.problems):
+                            problem = _create_child(store, vertical, 'problem', problem_index, data=PROBLEM_XML)
+                            problems.append(problem.location.version_agnostic())
+    return course_key, verticals, problems
+
+
+def _create_child(store, parent, block_type, index, **fields):
+    """
+    Create the `index`th child of type `block_type` of the block `parent`.
+    """
+    fields['display_name'] = u'{} {}'.format(block_type.title(), index)
+    return store.create_child(USER_ID, parent.location.version_agnostic(), block_type, fields=fields)
+
+
+def benchmark_modulestore(recorder, store, store_type, course_key, verticals, problems):
+    """
+    Time reading the course built by `build_course` from `store`, and publishing it.
+    """
+    sample = random.Random(0).sample(problems, min(len(problems), SAMPLE_SIZE))
+    with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+        recorder.time('get_course(depth=None)', store_type, lambda: store.get_course(course_key, depth=None))
+        recorder.time_each('get_item', store_type, store.get_item, sample)
+        recorder.time_each('get_parent_location', store_type, store.get_parent_location, sample)
+        recorder.time_each('publish', store_type, lambda location: store.publish(location, USER_ID), verticals)
+
+
+def benchmark_grading(recorder, store_type, course_key, problems, num_students):
+    """
+    Time grading `num_students` students, who have all answered all the `problems` of the course.
+    """
+    students = _create_students(course_key, problems, num_students)
+    course = modulestore().get_course(course_key, depth=None)
+    request_factory = RequestFactory()
+
+    def grade(student):
+        """Grade `student`, as the progress page does."""
+        request = request_factory.get('/')
+        request.user = student
+        request.session = {}
+        return grades.grade(student, request, course)
+
+    recorder.time_each('grade', store_type, grade, students)
+
+
+def _create_students(course_key, problems, num_students):
+    """
+    Create `num_students` students enrolled in the course, with a random
+    score for each of the `problems`.
+    """
+    rand = random.Random(0)
+    students = []
+    for index in xrange(num_students):
+        student = User.objects.create(username=u'benchmark_{}_{}'.format(uuid4().hex[:8], index))
+        CourseEnrollment.enroll(student, course_key)
+        students.append(student)
+        StudentModule.objects.bulk_create([
+            StudentModule(
+                student=student,
+                course_id=course_key,
+                module_state_key=problem,
+                module_type='problem',
+                state=json.dumps({'attempts': 1, 'done': True}),
+                grade=rand.randint(0, PROBLEM_MAX_SCORE),
+                max_grade=PROBLEM_MAX_SCORE,
+            )
+            for problem in problems
+        ])
+    return students
+
+
+def benchmark_xml(recorder, store, store_type, course_key, root_dir):
+    """
+    Time exporting the course built by `build_course` to the directory
+    `store_type` of `root_dir`, and importing it back into `store`.
+    """
+    recorder.time(
+        'export_to_xml', store_type, lambda: export_to_xml(store, None, course_key, root_dir, store_type), repeat=1
+    )
+    target_course_key = course_key.replace(course=course_key.course + '_imported')
+    recorder.time(
+        'import_from_xml',
+        store_type,
+        lambda: import_from_xml(
+            store, USER_ID, root_dir, [store_type], target_course_id=target_course_key,
+            do_import_static=False, create_new_course_if_not_present=True,
+        ),
+        repeat=1,
+    )
+
+
+def benchmark_xml_modulestore(recorder, root_dir, course_dir, problems):
+    """
+    Time loading the course exported to the directory `course_dir` of
+    `root_dir` in an XMLModuleStore, and reading it.
+    """
+    store_type = ModuleStoreEnum.Type.xml
+    xml_store = recorder.time(
+        'XMLModuleStore()',
+        store_type,
+        lambda: XMLModuleStore(root_dir, course_dirs=[course_dir], default_class='xmodule.hidden_module.HiddenDescriptor'),
+        repeat=1,
+    )
+    if xml_store is None or not xml_store.get_courses():
+        return
+
+    course_key = xml_store.get_courses()[0].id
+    sample = [
+        course_key.make_usage_key(problem.block_type, problem.block_id)
+        for problem in random.Random(0).sample(problems, min(len(problems), SAMPLE_SIZE))
+    ]
+    recorder.time('get_course(depth=None)', store_type, lambda: xml_store.get_course(course_key, depth=None))
+    recorder.time_each('get_item', store_type, xml_store.get_item, sample)
+    recorder.time_each('get_parent_location', store_type, xml_store.get_parent_location, sample)
+
+
+def benchmark_capa(recorder, root_dir):
+    """
+    Time building a capa problem, and checking answers to it.
+    """
+    capa_system = LoncapaSystem(
+        ajax_url='/',
+        anonymous_student_id='student',
+        cache=None,
+        can_execute_unsafe_code=lambda: False,
+        DEBUG=False,
+        filestore=fs.osfs.OSFS(root_dir),
+        i18n=gettext.NullTranslations(),
+        node_path='',
+        render_template=lambda template, context: u'',
+        seed=1,
+        STATIC_URL='/static/',
+        xqueue={},
+    )
+
+    def build_problem():
+        """Build the problem, as the capa module does for every request."""
+        return LoncapaProblem(PROBLEM_XML, id='benchmark', capa_system=capa_system, seed=1)
+
+    problem = recorder.time('LoncapaProblem()', 'capa', build_problem)
+    if problem is not None:
+        answers = problem.get_question_answers()
+        recorder.time('LoncapaProblem.grade_answers', 'capa', lambda: problem.grade_answers(answers))
+
+
+def run_benchmarks(shape, num_students, repeat, store_types=STORE_TYPES):
+    """
+    Run the benchmarks against the modulestores `store_types`, on courses of
+    the given `shape` graded for `num_students` students, repeating the
+    benchmarks that don't run once per block `repeat` times.
+
+    Returns the configuration and the results of the benchmarks, as a dict.
+    """
+    recorder = BenchmarkRecorder(repeat)
+    store = modulestore()
+    root_dir = tempfile.mkdtemp()
+
+    built_store_types = [
+        store_type for store_type in (ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+        if store_type in store_types
+    ]
+    if ModuleStoreEnum.Type.xml in store_types and not built_store_types:
+        # The XML course is exported from an old Mongo one.
+        built_store_types = [ModuleStoreEnum.Type.mongo]
+
+    try:
+        benchmark_capa(recorder, root_dir)
+
+        for store_type in built_store_types:
+            course_key, verticals, problems = recorder.time(
+                'build_course', store_type, lambda: build_course(store, store_type, shape), repeat=1
+            ) or (None, None, None)
+            if course_key is None:
+                continue
+            benchmark_modulestore(recorder, store, store_type, course_key, verticals, problems)
+            benchmark_grading(recorder, store_type, course_key, problems, num_students)
+            benchmark_xml(recorder, store, store_type, course_key, root_dir)
+            if store_type == built_store_types[0] and ModuleStoreEnum.Type.xml in store_types:
+                benchmark_xml_modulestore(recorder, root_dir, store_type, problems)
+    finally:
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+    return {
+        'config': {
+            'shape': shape._asdict(),
+            'students': num_students,
+            'repeat': repeat,
+            'stores': list(store_types),
+        },
+        'results': recorder.results,
+    }
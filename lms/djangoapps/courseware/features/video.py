@@ -13,6 +13,7 @@ from django.conf import settings
 from cache_toolbox.core import del_cached_content
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
+from xmodule.video_module.transcripts_utils import Transcript
 
 
 TEST_ROOT = settings.COMMON_TEST_DATA_ROOT
@@ -211,6 +212,7 @@ def upload_file(filename, location):
     content = StaticContent(content_location, filename, mime_type, f.read())
     contentstore().save(content)
     del_cached_content(content.location)
+    Transcript.forget_version(content.location)
 
 
 def navigate_to_an_item_in_a_sequence(number):
@@ -12,9 +12,13 @@ from django.test.client import RequestFactory
 
 from dogapi import dog_stats_api
 
+from capa.util import expand_answer_ids
 from courseware import courses
-from courseware.model_data import FieldDataCache
-from student.models import anonymous_id_for_user
+from courseware.access import has_access
+from courseware.model_data import FieldDataCache, chunks
+from student.models import anonymous_id_for_user, anonymous_ids_for_users, ANONYMOUS_ID_CHUNK_SIZE
+from user_api import user_service
+from util.query import reporting
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
@@ -51,6 +55,7 @@ def yield_dynamic_descriptor_descendents(descriptor, module_creator):
         yield next_descriptor
 
 
+@reporting
 def answer_distributions(course_key):
     """
     Given a course_key, return answer distributions in the form of a dictionary
@@ -116,7 +121,11 @@ def answer_distributions(course_key):
             continue
 
         try:
-            url, display_name = url_and_display_name(module.module_state_key.map_into_course(course_key))
+            usage_key = module.module_state_key.map_into_course(course_key)
+            if state_dict.get('state_version'):
+                # The answer ids are stored shortened, see CapaMixin.set_state_from_lcp
+                raw_answers = expand_answer_ids(raw_answers, usage_key.html_id())
+            url, display_name = url_and_display_name(usage_key)
             # Each problem part has an ID that is derived from the
             # module.module_state_key (with some suffix appended)
             for problem_part_id, raw_answer in raw_answers.items():
@@ -171,112 +180,7 @@ def _grade(student, request, course, keep_raw_scores):
 
     More information on the format is in the docstring for CourseGrader.
     """
-    grading_context = course.grading_context
-    raw_scores = []
-
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    submissions_scores = sub_api.get_scores(
-        course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
-    )
-
-    totaled_scores = {}
-    # This next complicated loop is just to collect the totaled_scores, which is
-    # passed to the grader
-    for section_format, sections in grading_context['graded_sections'].iteritems():
-        format_scores = []
-        for section in sections:
-            section_descriptor = section['section_descriptor']
-            section_name = section_descriptor.display_name_with_default
-
-            # some problems have state that is updated independently of interaction
-            # with the LMS, so they need to always be scored. (E.g. foldit.,
-            # combinedopenended)
-            should_grade_section = any(
-                descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
-            )
-
-            # If there are no problems that always have to be regraded, check to
-            # see if any of our locations are in the scores from the submissions
-            # API. If scores exist, we have to calculate grades for this section.
-            if not should_grade_section:
-                should_grade_section = any(
-                    descriptor.location.to_deprecated_string() in submissions_scores
-                    for descriptor in section['xmoduledescriptors']
-                )
-
-            if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
-
-            # If we haven't seen a single problem in the section, we don't have
-            # to grade it at all! We can assume 0%
-            if should_grade_section:
-                scores = []
-
-                def create_module(descriptor):
-                    '''creates an XModule instance given a descriptor'''
-                    # TODO: We need the request to pass into here. If we could forego that, our arguments
-                    # would be simpler
-                    with manual_transaction():
-                        field_data_cache = FieldDataCache([descriptor], course.id, student)
-                    return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
-
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
-
-                    (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
-                    )
-                    if correct is None and total is None:
-                        continue
-
-                    if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
-                        if total > 1:
-                            correct = random.randrange(max(total - 2, 1), total + 1)
-                        else:
-                            correct = total
-
-                    graded = module_descriptor.graded
-                    if not total > 0:
-                        #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                        graded = False
-
-                    scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
-
-                _, graded_total = graders.aggregate_scores(scores, section_name)
-                if keep_raw_scores:
-                    raw_scores += scores
-            else:
-                graded_total = Score(0.0, 1.0, True, section_name)
-
-            #Add the graded total to totaled_scores
-            if graded_total.possible > 0:
-                format_scores.append(graded_total)
-            else:
-                log.info("Unable to grade a section with a total possible score of zero. " +
-                              str(section_descriptor.location))
-
-        totaled_scores[section_format] = format_scores
-
-    grade_summary = course.grader.grade(totaled_scores, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
-
-    # We round the grade here, to make sure that the grade is an whole percentage and
-    # doesn't get displayed differently than it gets grades
-    grade_summary['percent'] = round(grade_summary['percent'] * 100 + 0.05) / 100
-
-    letter_grade = grade_for_percentage(course.grade_cutoffs, grade_summary['percent'])
-    grade_summary['grade'] = letter_grade
-    grade_summary['totaled_scores'] = totaled_scores  	# make this available, eg for instructor download & debugging
-    if keep_raw_scores:
-        grade_summary['raw_scores'] = raw_scores        # way to get all RAW scores out to instructor
-                                                        # so grader can be double-checked
-    return grade_summary
+    return _CourseScores(student, request, course).grade_summary(keep_raw_scores)
 
 
 def grade_for_percentage(grade_cutoffs, percentage):
@@ -311,9 +215,6 @@ def progress_summary(student, request, course):
         return _progress_summary(student, request, course)
 
 
-# TODO: This method is not very good. It was written in the old course style and
-# then converted over and performance is not good. Once the progress page is redesigned
-# to not have the progress summary this method should be deleted (so it won't be copied).
 def _progress_summary(student, request, course):
     """
     Unwrapped version of "progress_summary".
@@ -335,75 +236,261 @@ def _progress_summary(student, request, course):
     will return None.
 
     """
-    with manual_transaction():
-        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course.id, student, course, depth=None
-        )
-        # TODO: We need the request to pass into here. If we could
-        # forego that, our arguments would be simpler
-        course_module = get_module_for_descriptor(student, request, course, field_data_cache, course.id)
-        if not course_module:
-            # This student must not have access to the course.
-            return None
+    return _CourseScores(student, request, course).progress_summary()
 
-    submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
 
-    chapters = []
-    # Don't include chapters that aren't displayable (e.g. due to error)
-    for chapter_module in course_module.get_display_items():
-        # Skip if the chapter is hidden
-        if chapter_module.hide_from_toc:
-            continue
+@transaction.commit_manually
+def progress_summary_and_grade(student, request, course):
+    """
+    Return the progress summary (see progress_summary) and the grade summary
+    (see grade) of `student` in `course`, computed together, so that each
+    problem is only scored once.
 
-        sections = []
+    If the student does not have access to load the course module, returns
+    (None, None).
+    """
+    with manual_transaction():
+        scores = _CourseScores(student, request, course)
+        courseware_summary = scores.progress_summary()
+        if courseware_summary is None:
+            return None, None
+        return courseware_summary, scores.grade_summary()
+
+
+class _CourseScores(object):
+    """
+    The scores of a student in a course, from which both the progress summary
+    and the grade summary are computed.
+
+    Scores are computed from the descriptors of the course. The grades of the
+    student's StudentModules are fetched at once, and modules are only created
+    for the descriptors which need them: those with dynamic children, those
+    whose score is always recalculated, and the problems the student has no
+    max grade for. The scores of each section are computed once, when first
+    needed.
+    """
+    def __init__(self, student, request, course):
+        self.student = student
+        self.request = request
+        self.course = course
+
+        # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
+        # scores that were registered with the submissions API, which for the moment
+        # means only openassessment (edx-ora2)
+        self.submissions_scores = sub_api.get_scores(
+            course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
+        )
 
-        for section_module in chapter_module.get_display_items():
-            # Skip if the section is hidden
+        self.student_module_scores = {}
+        if student.is_authenticated():
             with manual_transaction():
-                if section_module.hide_from_toc:
-                    continue
+                student_modules = StudentModule.objects.filter(
+                    student=student, course_id=course.id
+                ).values_list('module_state_key', 'grade', 'max_grade')
+                for location_url, grade, max_grade in student_modules:
+                    self.student_module_scores[location_url] = (grade, max_grade)
 
-                graded = section_module.graded
-                scores = []
+        # Section location -> list of (descriptor, correct, total)
+        self._section_scores = {}
+        self._extended_due_dates = None
 
-                module_creator = section_module.xmodule_runtime.get_module
+    def create_module(self, descriptor):
+        """
+        Return the XModule of `descriptor` for the student, or None if they don't have access to it.
+        """
+        # TODO: We need the request to pass into here. If we could forego that, our arguments
+        # would be simpler
+        with manual_transaction():
+            field_data_cache = FieldDataCache([descriptor], self.course.id, self.student)
+        return get_module_for_descriptor(self.student, self.request, descriptor, field_data_cache, self.course.id)
 
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_module, module_creator):
-                    course_id = course.id
+    def section_scores(self, section_descriptor):
+        """
+        Return the (descriptor, correct, total) of each scored descendant of `section_descriptor`,
+        in the order of yield_dynamic_descriptor_descendents.
+        """
+        location = section_descriptor.location
+        if location not in self._section_scores:
+            scores = []
+            with manual_transaction():
+                for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, self.create_module):
                     (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                        self.course.id, self.student, module_descriptor, self.create_module,
+                        scores_cache=self.submissions_scores,
+                        student_module_scores=self.student_module_scores,
                     )
                     if correct is None and total is None:
                         continue
+                    scores.append((module_descriptor, correct, total))
+            self._section_scores[location] = scores
+        return self._section_scores[location]
 
-                    scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+    def extended_due(self, section_descriptor):
+        """
+        Return the due date extension granted to the student for `section_descriptor`, if any.
+        """
+        if 'extended_due' not in section_descriptor.fields or not self.student.is_authenticated():
+            return None
+        if self._extended_due_dates is None:
+            # Extensions are stored in the state of the sequentials, so fetch those at once.
+            with manual_transaction():
+                sequentials = StudentModule.objects.filter(
+                    student=self.student, course_id=self.course.id, module_type='sequential'
+                ).values_list('module_state_key', 'state')
+                self._extended_due_dates = dict(
+                    (location_url, json.loads(state or '{}').get('extended_due'))
+                    for location_url, state in sequentials
+                )
+        value = self._extended_due_dates.get(section_descriptor.location.to_deprecated_string())
+        return section_descriptor.fields['extended_due'].from_json(value)
 
+    def progress_summary(self):
+        """
+        Return the progress summary of the student (see _progress_summary), or
+        None if they don't have access to the course.
+        """
+        course = self.course
+        with manual_transaction():
+            # Checks access to the course, and sets up masquerading, as rendering it would.
+            field_data_cache = FieldDataCache([course], course.id, self.student)
+            course_module = get_module_for_descriptor(self.student, self.request, course, field_data_cache, course.id)
+            if not course_module:
+                # This student must not have access to the course.
+                return None
+
+        chapters = []
+        # Don't include chapters that aren't displayable (e.g. due to error)
+        for chapter_descriptor in course.get_children():
+            # Skip if the chapter is hidden, or the student can't load it
+            if chapter_descriptor.hide_from_toc or not has_access(self.student, 'load', chapter_descriptor, course.id):
+                continue
+
+            sections = []
+
+            for section_descriptor in chapter_descriptor.get_children():
+                # Skip if the section is hidden, or the student can't load it
+                if section_descriptor.hide_from_toc:
+                    continue
+                if not has_access(self.student, 'load', section_descriptor, course.id):
+                    continue
+
+                graded = section_descriptor.graded
+                scores = [
+                    Score(correct, total, graded, module_descriptor.display_name_with_default)
+                    for module_descriptor, correct, total in self.section_scores(section_descriptor)
+                ]
                 scores.reverse()
                 section_total, _ = graders.aggregate_scores(
-                    scores, section_module.display_name_with_default)
+                    scores, section_descriptor.display_name_with_default)
 
-                module_format = section_module.format if section_module.format is not None else ''
+                due = section_descriptor.due
+                extended_due = self.extended_due(section_descriptor) if due else None
+                module_format = section_descriptor.format if section_descriptor.format is not None else ''
                 sections.append({
-                    'display_name': section_module.display_name_with_default,
-                    'url_name': section_module.url_name,
+                    'display_name': section_descriptor.display_name_with_default,
+                    'url_name': section_descriptor.url_name,
                     'scores': scores,
                     'section_total': section_total,
                     'format': module_format,
-                    'due': get_extended_due_date(section_module),
+                    'due': get_extended_due_date({'due': due, 'extended_due': extended_due}),
                     'graded': graded,
                 })
 
-        chapters.append({
-            'course': course.display_name_with_default,
-            'display_name': chapter_module.display_name_with_default,
-            'url_name': chapter_module.url_name,
-            'sections': sections
-        })
+            chapters.append({
+                'course': course.display_name_with_default,
+                'display_name': chapter_descriptor.display_name_with_default,
+                'url_name': chapter_descriptor.url_name,
+                'sections': sections
+            })
 
-    return chapters
+        return chapters
 
+    def should_grade_section(self, section):
+        """
+        Return whether the section of the grading context `section` has to be
+        graded, rather than assumed 0%.
+        """
+        # some problems have state that is updated independently of interaction
+        # with the LMS, so they need to always be scored. (E.g. foldit.,
+        # combinedopenended)
+        if any(descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']):
+            return True
+
+        # If there are no problems that always have to be regraded, check to
+        # see if any of our locations are in the scores from the submissions
+        # API, or if the student has seen any of them.
+        return any(
+            descriptor.location.to_deprecated_string() in self.submissions_scores or
+            descriptor.location.to_deprecated_string() in self.student_module_scores
+            for descriptor in section['xmoduledescriptors']
+        )
 
-def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
+    def grade_summary(self, keep_raw_scores=False):
+        """
+        Return the grade summary of the student (see _grade).
+        """
+        course = self.course
+        grading_context = course.grading_context
+        raw_scores = []
+
+        totaled_scores = {}
+        # This next complicated loop is just to collect the totaled_scores, which is
+        # passed to the grader
+        for section_format, sections in grading_context['graded_sections'].iteritems():
+            format_scores = []
+            for section in sections:
+                section_descriptor = section['section_descriptor']
+                section_name = section_descriptor.display_name_with_default
+
+                # If we haven't seen a single problem in the section, we don't have
+                # to grade it at all! We can assume 0%
+                if self.should_grade_section(section):
+                    scores = []
+                    for module_descriptor, correct, total in self.section_scores(section_descriptor):
+                        if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
+                            if total > 1:
+                                correct = random.randrange(max(total - 2, 1), total + 1)
+                            else:
+                                correct = total
+
+                        graded = module_descriptor.graded
+                        if not total > 0:
+                            #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+                            graded = False
+
+                        scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+
+                    _, graded_total = graders.aggregate_scores(scores, section_name)
+                    if keep_raw_scores:
+                        raw_scores += scores
+                else:
+                    graded_total = Score(0.0, 1.0, True, section_name)
+
+                #Add the graded total to totaled_scores
+                if graded_total.possible > 0:
+                    format_scores.append(graded_total)
+                else:
+                    log.info("Unable to grade a section with a total possible score of zero. " +
+                                  str(section_descriptor.location))
+
+            totaled_scores[section_format] = format_scores
+
+        grade_summary = course.grader.grade(totaled_scores, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
+
+        # We round the grade here, to make sure that the grade is an whole percentage and
+        # doesn't get displayed differently than it gets grades
+        grade_summary['percent'] = round(grade_summary['percent'] * 100 + 0.05) / 100
+
+        letter_grade = grade_for_percentage(course.grade_cutoffs, grade_summary['percent'])
+        grade_summary['grade'] = letter_grade
+        grade_summary['totaled_scores'] = totaled_scores  	# make this available, eg for instructor download & debugging
+        if keep_raw_scores:
+            grade_summary['raw_scores'] = raw_scores        # way to get all RAW scores out to instructor
+                                                            # so grader can be double-checked
+        return grade_summary
+
+
+def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None, student_module_scores=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
     e.g. (5,7) if you got 5 out of 7 points.
@@ -417,6 +504,9 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
            Can return None if user doesn't have access, or if something else went wrong.
     scores_cache: A dict of location names to (earned, possible) point tuples.
            If an entry is found in this cache, it takes precedence.
+    student_module_scores: A dict of location names to the (grade, max_grade) of all the
+           StudentModules of the user in the course. If given, it is used instead of querying
+           the StudentModule of the problem.
     """
     scores_cache = scores_cache or {}
 
@@ -443,18 +533,22 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
-    try:
-        student_module = StudentModule.objects.get(
-            student=user,
-            course_id=course_id,
-            module_state_key=problem_descriptor.location
-        )
-    except StudentModule.DoesNotExist:
-        student_module = None
+    if student_module_scores is not None:
+        grade, max_grade = student_module_scores.get(location_url, (None, None))
+    else:
+        try:
+            student_module = StudentModule.objects.get(
+                student=user,
+                course_id=course_id,
+                module_state_key=problem_descriptor.location
+            )
+            grade, max_grade = student_module.grade, student_module.max_grade
+        except StudentModule.DoesNotExist:
+            grade, max_grade = None, None
 
-    if student_module is not None and student_module.max_grade is not None:
-        correct = student_module.grade if student_module.grade is not None else 0
-        total = student_module.max_grade
+    if max_grade is not None:
+        correct = grade if grade is not None else 0
+        total = max_grade
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
@@ -475,7 +569,7 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     weight = problem_descriptor.weight
     if weight is not None:
         if total == 0:
-            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(student_module))
+            log.exception("Cannot reweight a problem with zero total points. Problem: " + location_url)
             return (correct, total)
         correct = correct * weight / total
         total = weight
@@ -521,25 +615,37 @@ def iterate_grades_for(course_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=['action:{}'.format(course_id)]):
-            try:
-                request.user = student
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course_id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+    for students_chunk in chunks(students, ANONYMOUS_ID_CHUNK_SIZE):
+        # Grading needs each student's per-course anonymous id (to look up
+        # their submissions) and per-student one (to build their modules), so
+        # resolve those for the whole chunk at once instead of per student.
+        anonymous_ids_for_users(students_chunk, course_id)
+        anonymous_ids_for_users(students_chunk, None)
+
+        # Likewise for their course tags, which hold their groups in the
+        # course's user partitions (see split_test).
+        with user_service.course_tags_snapshot():
+            user_service.prefetch_course_tags(students_chunk, course_id)
+
+            for student in students_chunk:
+                with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=['action:{}'.format(course_id)]):
+                    try:
+                        request.user = student
+                        # Grading calls problem rendering, which calls masquerading,
+                        # which checks session vars -- thus the empty session dict below.
+                        # It's not pretty, but untangling that is currently beyond the
+                        # scope of this feature.
+                        request.session = {}
+                        gradeset = grade(student, request, course)
+                        yield student, gradeset, ""
+                    except Exception as exc:  # pylint: disable=broad-except
+                        # Keep marching on even if this student couldn't be graded for
+                        # some reason, but log it for future reference.
+                        log.exception(
+                            'Cannot grade student %s (%s) in course %s because of exception: %s',
+                            student.username,
+                            student.id,
+                            course_id,
+                            exc.message
+                        )
+                        yield student, {}, exc.message
@@ -0,0 +1,135 @@
+"""
+Background writing of the scores LTI tools post to the outcome service of LTI blocks.
+
+LTI tools often post the scores of a whole class at once. Rather than binding
+the block to each user, and writing their StudentModule, in the request, the
+grade handler hands the scores to the LTIOutcomeQueue service, which stores
+them as PendingLTIOutcome rows and acknowledges. A task then writes the pending
+scores of the block in one transaction. Until it runs, later scores of a user
+replace their pending one, so a tool resending scores doesn't cause more writes.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+from courseware import tasks
+from courseware.model_data import FieldDataCache
+from courseware.models import PendingLTIOutcome
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+
+def _scheduled_key(usage_id):
+    """
+    Return the cache key flagging that a task will write the pending outcomes of the block `usage_id`.
+    """
+    return u'lti_outcomes.scheduled.{}'.format(usage_id)
+
+
+class LTIOutcomeQueue(object):
+    """
+    A runtime service queueing the scores posted to LTI blocks.
+    """
+
+    def replace_results(self, block, scores, max_score):
+        """
+        Queue `scores`, a list of (user, score) pairs with scores in the range
+        [0, 1], as the scores of the users in `block`, out of `max_score`. When
+        a user appears several times, their last score wins.
+        """
+        usage_id = block.scope_ids.usage_id
+        latest = dict((user.id, score) for user, score in scores)
+        for user_id, score in latest.iteritems():
+            values = {
+                'score': score * max_score if score is not None and max_score is not None else None,
+                'max_score': max_score,
+            }
+            lookup = dict(usage_id=usage_id, user_id=user_id)
+            outcomes = PendingLTIOutcome.objects.filter(**lookup)
+            if outcomes.update(**values):
+                continue
+            _outcome, created = PendingLTIOutcome.objects.get_or_create(defaults=values, **lookup)
+            if not created:
+                # Another request queued a score in the meantime.
+                outcomes.update(**values)
+        self._schedule(block.course_id, usage_id)
+
+    def _schedule(self, course_key, usage_id):
+        """
+        Start a task writing the pending outcomes of `usage_id`, unless one is already waiting to.
+        """
+        delay = settings.LTI_OUTCOMES_DELAY
+        # The flag expires, in case the task is lost.
+        if cache.add(_scheduled_key(usage_id), True, delay + 60):
+            tasks.apply_lti_outcomes.apply_async(
+                args=[course_key.to_deprecated_string(), unicode(usage_id)],
+                countdown=delay,
+            )
+
+
+def _track_function(event_type, event):
+    """
+    Tracking function of the LTI blocks bound to write outcomes, which have no request to track.
+    """
+    log.debug("LTI outcome event %s: %s", event_type, event)
+
+
+@transaction.commit_on_success
+def apply_pending_outcomes(course_key, usage_key):
+    """
+    Write the pending outcomes of the block `usage_key`, of the course
+    `course_key`, to the StudentModules of their users, and return the number
+    of outcomes which failed to be written. Those stay pending.
+
+    Each outcome is set through the block bound to its user, as the grade
+    handler would, so the grade is published like any other.
+    """
+    # Outcomes queued from now on need another task.
+    cache.delete(_scheduled_key(usage_key))
+
+    # Outcomes queued while these are written wait for the transaction, rather than being dropped with them.
+    outcomes = list(PendingLTIOutcome.objects.select_for_update().filter(usage_id=usage_key))
+    if not outcomes:
+        return
+
+    descriptor = modulestore().get_item(usage_key)
+    users = User.objects.in_bulk([outcome.user_id for outcome in outcomes])
+    done = []
+    for outcome in outcomes:
+        savepoint = transaction.savepoint()
+        try:
+            _apply_outcome(course_key, descriptor, users.get(outcome.user_id), outcome)
+        except Exception:  # pylint: disable=broad-except
+            transaction.savepoint_rollback(savepoint)
+            log.exception("Error writing the LTI outcome of user %s for %s", outcome.user_id, usage_key)
+        else:
+            transaction.savepoint_commit(savepoint)
+            done.append(outcome.id)
+
+    PendingLTIOutcome.objects.filter(id__in=done).delete()
+    return len(outcomes) - len(done)
+
+
+def _apply_outcome(course_key, descriptor, user, outcome):
+    """
+    Write `outcome`, the pending outcome of `user` for `descriptor`, to their StudentModule.
+    """
+    # module_render imports the runtime, which provides this module's LTIOutcomeQueue.
+    from courseware.module_render import get_module_for_descriptor_internal
+
+    if user is None:
+        log.warning("LTI outcome of user %s for %s dropped: no user", outcome.user_id, descriptor.location)
+        return
+    field_data_cache = FieldDataCache([descriptor], course_key, user)
+    module = get_module_for_descriptor_internal(
+        user, descriptor, field_data_cache, course_key, _track_function, '', grade_bucket_type='lti'
+    )
+    if module is None:
+        log.warning("LTI outcome of user %s for %s dropped: no module", user.id, descriptor.location)
+        return
+    module.set_module_score(user.id, outcome.score, outcome.max_score)
+    module.save()
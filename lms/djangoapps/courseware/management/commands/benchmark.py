@@ -0,0 +1,75 @@
+"""
+A Django command that runs the modulestore, grading and capa benchmarks of
+courseware.benchmarks, and writes their results as a JSON object.
+
+It must be run with the benchmark settings, which use an in-memory SQLite
+database and a throwaway Mongo database:
+
+    ./manage.py lms --settings=benchmark benchmark --chapters=10 --output=results.json
+
+"""
+import json
+import subprocess
+import sys
+from datetime import datetime
+from optparse import make_option
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from courseware.benchmarks import CourseShape, STORE_TYPES, run_benchmarks
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    """
+    Run the modulestore, grading and capa benchmarks.
+    """
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--chapters', type='int', default=4, help='Number of chapters in the course'),
+        make_option('--sequentials', type='int', default=4, help='Number of sequentials in each chapter'),
+        make_option('--verticals', type='int', default=4, help='Number of verticals in each sequential'),
+        make_option('--problems', type='int', default=2, help='Number of problems in each vertical'),
+        make_option('--students', type='int', default=10, help='Number of students to grade'),
+        make_option('--repeat', type='int', default=5, help='Number of runs of the whole-course benchmarks'),
+        make_option('--stores', default=','.join(STORE_TYPES), help='Comma-separated modulestores to benchmark'),
+        make_option('--output', help='File to write the results to, rather than stdout'),
+    )
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['NAME'] != ':memory:':
+            # Creating the tables is only safe in a database of our own.
+            raise CommandError("The benchmarks must be run with --settings=benchmark")
+
+        store_types = [store_type.strip() for store_type in options['stores'].split(',')]
+        unknown = set(store_types) - set(STORE_TYPES)
+        if unknown:
+            raise CommandError(u"Unknown modulestores: {}".format(', '.join(sorted(unknown))))
+
+        call_command('syncdb', interactive=False, migrate_all=True, verbosity=0)
+
+        shape = CourseShape(options['chapters'], options['sequentials'], options['verticals'], options['problems'])
+        try:
+            results = run_benchmarks(shape, options['students'], options['repeat'], store_types)
+        finally:
+            modulestore()._drop_database()  # pylint: disable=protected-access
+
+        results['commit'] = _current_commit()
+        results['date'] = datetime.utcnow().isoformat()
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2, sort_keys=True)
+        else:
+            json.dump(results, sys.stdout, indent=2, sort_keys=True)
+
+
+def _current_commit():
+    """Return the hash of the commit being benchmarked, or None if it can't be found."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=settings.REPO_ROOT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -3,11 +3,14 @@ Classes to provide the LMS runtime data storage to XBlocks
 """
 
 import json
+import random
+import time
 from collections import defaultdict
-from itertools import chain
+from itertools import chain, islice
 from .models import (
     StudentModule,
     XModuleUserStateSummaryField,
+    XModuleUserStateSummaryCounter,
     XModuleStudentPrefsField,
     XModuleStudentInfoField
 )
@@ -15,7 +18,9 @@ import logging
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, Location
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
+from django.core.cache import cache
 from django.db import DatabaseError
+from django.db.models import F, Sum
 from django.contrib.auth.models import User
 
 from xblock.runtime import KeyValueStore
@@ -35,9 +40,39 @@ class InvalidWriteError(Exception):
 def chunks(items, chunk_size):
     """
     Yields the values from items in chunks of size chunk_size
+
+    Only one chunk is held in memory at a time, so items can be a
+    generator or a queryset's iterator().
     """
-    items = list(items)
-    return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
+    items = iter(items)
+    chunk = list(islice(items, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, chunk_size))
+
+
+def get_child_descriptors(descriptor, depth=None, descriptor_filter=lambda descriptor: True):
+    """
+    Return a list of all child descriptors down to the specified depth
+    that match the descriptor filter. Includes `descriptor`
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    if descriptor_filter(descriptor):
+        descriptors = [descriptor]
+    else:
+        descriptors = []
+
+    if depth is None or depth > 0:
+        new_depth = depth - 1 if depth is not None else depth
+
+        for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+            descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
+
+    return descriptors
 
 
 class FieldDataCache(object):
@@ -86,29 +121,6 @@ class FieldDataCache(object):
         select_for_update: Flag indicating whether the rows should be locked until end of transaction
         """
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
         descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
 
         return FieldDataCache(descriptors, course_id, user, select_for_update)
@@ -390,3 +402,87 @@ class DjangoKeyValueStore(KeyValueStore):
             return key.field_name in json.loads(field_object.state)
         else:
             return True
+
+
+class UserStateSummaryCounters(object):
+    """
+    A runtime service recording increments to the Scope.user_state_summary
+    fields of a block which map keys to counts, such as the words of a word
+    cloud or the answers of a poll.
+
+    Increments are stored as XModuleUserStateSummaryCounter rows, rather than by
+    rewriting the field's value, so that the learners posting to the same block
+    at the same time don't all read and write one row (and lose each other's
+    updates). The field's value is left as it is, and counts as a base to which
+    the increments are added.
+
+    The totals of the increments are cached for COUNTS_CACHE_TIMEOUT seconds,
+    so they are summed once in that time rather than on every view. Increments
+    are added to the cached totals, so learners see their own answers.
+    """
+
+    # The number of rows each count is spread over
+    SHARDS = 16
+
+    # The number of seconds the totals of a field's increments are cached
+    COUNTS_CACHE_TIMEOUT = 10
+
+    @staticmethod
+    def _cache_key(block, field_name):
+        """
+        Return the cache key of the totals of the increments to the field `field_name` of `block`.
+        """
+        return u'user_state_summary_counters.{}.{}'.format(block.scope_ids.usage_id, field_name)
+
+    def increment(self, block, field_name, key, delta=1):
+        """
+        Add `delta` to the count of `key` in the field `field_name` of `block`.
+        """
+        lookup = dict(
+            usage_id=block.scope_ids.usage_id,
+            field_name=field_name,
+            key_hash=XModuleUserStateSummaryCounter.hash_key(key),
+            shard=random.randrange(self.SHARDS),
+        )
+        counters = XModuleUserStateSummaryCounter.objects.filter(**lookup)
+        if not counters.update(count=F('count') + delta):
+            _counter, created = XModuleUserStateSummaryCounter.objects.get_or_create(
+                defaults={'key': key, 'count': delta}, **lookup
+            )
+            if not created:
+                # Another request created the row in the meantime.
+                counters.update(count=F('count') + delta)
+
+        cache_key = self._cache_key(block, field_name)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            expires, totals = cached
+            # Keep the totals' expiry, so they are summed again in time.
+            timeout = int(expires - time.time())
+            if timeout > 0:
+                totals[key] = totals.get(key, 0) + delta
+                cache.set(cache_key, (expires, totals), timeout)
+
+    def get_counts(self, block, field_name):
+        """
+        Return the value of the field `field_name` of `block` with the
+        recorded increments applied to it.
+        """
+        cache_key = self._cache_key(block, field_name)
+        cached = cache.get(cache_key)
+        if cached is None:
+            # Grouped by the hash too, as the key's collation may merge different keys.
+            totals = dict(
+                (key, total) for __, key, total in XModuleUserStateSummaryCounter.objects.filter(
+                    usage_id=block.scope_ids.usage_id,
+                    field_name=field_name,
+                ).values_list('key_hash', 'key').annotate(total=Sum('count'))
+            )
+            cache.set(cache_key, (time.time() + self.COUNTS_CACHE_TIMEOUT, totals), self.COUNTS_CACHE_TIMEOUT)
+        else:
+            __, totals = cached
+
+        counts = dict(getattr(block, field_name) or {})
+        for key, total in totals.iteritems():
+            counts[key] = counts.get(key, 0) + total
+        return counts
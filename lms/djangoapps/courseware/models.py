@@ -12,12 +12,14 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import hashlib
+
 from django.contrib.auth.models import User
-from django.conf import settings
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from util.query import use_read_replica_if_available
 from xmodule_django.models import CourseKeyField, LocationKeyField
 
 
@@ -70,15 +72,11 @@ class StudentModule(models.Model):
         submitted for a given course. So module_type='problem' and a non-null
         grade. Use a read replica if one exists for this environment.
         """
-        queryset = cls.objects.filter(
+        return use_read_replica_if_available(cls.objects.filter(
             course_id=course_id,
             module_type='problem',
             grade__isnull=False
-        )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
+        ))
 
     def __repr__(self):
         return 'StudentModule<%r>' % ({
@@ -160,6 +158,92 @@ class XModuleUserStateSummaryField(models.Model):
         return unicode(repr(self))
 
 
+class XModuleUserStateSummaryCounter(models.Model):
+    """
+    Stores increments to a Scope.user_state_summary field which maps keys to
+    counts (the words of a word cloud, the answers of a poll, ...).
+
+    Each count is spread over several shard rows, which are updated in place,
+    so that concurrent increments neither rewrite the field's whole value nor
+    wait on the same row. The count of a key is the sum of its shards.
+
+    Rows are looked up by the hash of their key, so keys are matched exactly,
+    whatever their length and the database's collation.
+    """
+
+    class Meta:
+        unique_together = (('usage_id', 'field_name', 'key_hash', 'shard'),)
+
+    # The name of the field
+    field_name = models.CharField(max_length=64)
+
+    # The usage id of the module
+    usage_id = LocationKeyField(max_length=255, db_index=True)
+
+    # The key counted in the field's value
+    key = models.TextField()
+
+    # The SHA-1 hex digest of the UTF-8 encoded key (see hash_key)
+    key_hash = models.CharField(max_length=40)
+
+    shard = models.PositiveSmallIntegerField()
+
+    count = models.IntegerField(default=0)
+
+    @staticmethod
+    def hash_key(key):
+        """
+        Return the key_hash of the rows counting `key`.
+        """
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def __repr__(self):
+        return 'XModuleUserStateSummaryCounter<%r>' % ({
+            'field_name': self.field_name,
+            'usage_id': self.usage_id,
+            'key': self.key,
+            'shard': self.shard,
+            'count': self.count,
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+
+class PendingLTIOutcome(models.Model):
+    """
+    A score posted by an LTI tool to the outcome service of an LTI block, which
+    is yet to be written to the user's StudentModule (see courseware.lti_outcomes).
+
+    There is at most one per user and block: a later score replaces the pending one.
+    """
+
+    class Meta:
+        unique_together = (('usage_id', 'user'),)
+
+    # The usage id of the LTI block
+    usage_id = LocationKeyField(max_length=255, db_index=True)
+
+    user = models.ForeignKey(User)
+
+    # The score, scaled to the weight of the block, and that weight
+    score = models.FloatField(null=True, blank=True)
+    max_score = models.FloatField(null=True, blank=True)
+
+    modified = models.DateTimeField(auto_now=True)
+
+    def __repr__(self):
+        return 'PendingLTIOutcome<%r>' % ({
+            'usage_id': self.usage_id,
+            'user': self.user_id,
+            'score': self.score,
+            'max_score': self.max_score,
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+
 class XModuleStudentPrefsField(models.Model):
     """
     Stores data set in the Scope.preferences scope by an xmodule field
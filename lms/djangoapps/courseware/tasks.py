@@ -0,0 +1,35 @@
+"""
+Celery tasks of the courseware.
+"""
+import logging
+
+from celery import task
+from django.conf import settings
+from opaque_keys.edx.keys import UsageKey
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from courseware import lti_outcomes
+
+log = logging.getLogger(__name__)
+
+
+@task(default_retry_delay=settings.LTI_OUTCOMES_RETRY_DELAY, max_retries=settings.LTI_OUTCOMES_MAX_RETRIES)  # pylint: disable=E1102
+def apply_lti_outcomes(course_id, usage_id):
+    """
+    Write the scores queued for the LTI block with usage id `usage_id`, in the
+    course with id `course_id` (a deprecated string), to the StudentModules of
+    their users.
+
+    The task is retried while some scores can't be written, as the tool was
+    told they were.
+    """
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    usage_key = UsageKey.from_string(usage_id).map_into_course(course_key)
+    try:
+        failed = lti_outcomes.apply_pending_outcomes(course_key, usage_key)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception("Error writing the LTI outcomes for %s", usage_id)
+        raise apply_lti_outcomes.retry(exc=exc)
+    if failed:
+        log.warning("%d LTI outcomes for %s not written, retrying", failed, usage_id)
+        raise apply_lti_outcomes.retry()
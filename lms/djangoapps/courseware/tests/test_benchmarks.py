@@ -0,0 +1,56 @@
+"""
+Tests for the benchmark harness.
+"""
+import shutil
+import tempfile
+import unittest
+
+from courseware.benchmarks import BenchmarkRecorder, benchmark_capa
+
+
+class BenchmarkRecorderTest(unittest.TestCase):
+    """
+    Test BenchmarkRecorder.
+    """
+    def setUp(self):
+        self.recorder = BenchmarkRecorder(repeat=3)
+
+    def test_time(self):
+        calls = []
+        self.assertEqual(self.recorder.time('work', 'mongo', lambda: calls.append(1) or 'done'), 'done')
+        self.assertEqual(len(calls), 3)
+        result, = self.recorder.results
+        self.assertEqual((result['benchmark'], result['store'], result['runs']), ('work', 'mongo', 3))
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertLessEqual(result['median'], result['max'])
+        self.assertAlmostEqual(result['mean'] * 3, result['total'])
+
+    def test_time_each(self):
+        self.assertEqual(self.recorder.time_each('square', 'split', lambda item: item * item, [1, 2, 3, 4]), 16)
+        self.assertEqual(self.recorder.results[0]['runs'], 4)
+
+    def test_failures_are_recorded(self):
+        def fail():
+            """Fail on the first call."""
+            raise ValueError('broken')
+
+        self.assertIsNone(self.recorder.time('broken', 'xml', fail))
+        self.assertEqual(
+            self.recorder.results,
+            [{'benchmark': 'broken', 'store': 'xml', 'error': u'ValueError: broken'}]
+        )
+
+
+class CapaBenchmarkTest(unittest.TestCase):
+    """
+    Test that the capa benchmarks run.
+    """
+    def test_benchmark_capa(self):
+        root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root_dir)
+        recorder = BenchmarkRecorder(repeat=2)
+        benchmark_capa(recorder, root_dir)
+        self.assertEqual(
+            [(result['benchmark'], result.get('runs')) for result in recorder.results],
+            [('LoncapaProblem()', 2), ('LoncapaProblem.grade_answers', 2)]
+        )
@@ -0,0 +1,131 @@
+"""
+Tests for the background writing of LTI outcomes.
+"""
+import json
+from mock import Mock, patch
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from courseware import tasks
+from courseware.lti_outcomes import LTIOutcomeQueue, apply_pending_outcomes
+from courseware.models import PendingLTIOutcome, StudentModule
+from courseware.tests.factories import StudentModuleFactory
+from courseware.tests.modulestore_config import TEST_DATA_MIXED_MODULESTORE
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.lti_2_util import LTI20ModuleMixin
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestLTIOutcomeQueue(ModuleStoreTestCase):
+    """
+    Tests for LTIOutcomeQueue and apply_pending_outcomes.
+    """
+    def setUp(self):
+        cache.clear()
+        self.queue = LTIOutcomeQueue()
+        self.course = CourseFactory.create()
+        self.lti = ItemFactory.create(parent_location=self.course.location, category='lti')
+        self.usage_key = self.lti.location
+        self.block = Mock(course_id=self.course.id)
+        self.block.scope_ids.usage_id = self.usage_key
+        self.users = [UserFactory.create() for _ in range(3)]
+
+    def get_student_module(self, user):
+        """Return the StudentModule of `user` for the block."""
+        return StudentModule.objects.get(student=user, course_id=self.course.id, module_state_key=self.usage_key)
+
+    @patch('courseware.tasks.apply_lti_outcomes.apply_async')
+    def test_replace_results(self, apply_async):
+        first, second, third = self.users
+        self.queue.replace_results(self.block, [(first, 0.5), (second, 0.2), (first, 0.1)], 10.0)
+        self.queue.replace_results(self.block, [(second, 1.0), (third, None)], 10.0)
+
+        # The last score of each user is pending.
+        self.assertEqual(
+            dict(PendingLTIOutcome.objects.values_list('user_id', 'score')),
+            {first.id: 1.0, second.id: 10.0, third.id: None}
+        )
+        # One task writes them all.
+        apply_async.assert_called_once_with(
+            args=[self.course.id.to_deprecated_string(), unicode(self.usage_key)],
+            countdown=5,
+        )
+
+    @patch('courseware.module_render.dog_stats_api')
+    @patch('courseware.tasks.apply_lti_outcomes.apply_async')
+    def test_apply_pending_outcomes(self, __, dog_stats_api):
+        first, second, __ = self.users
+        StudentModuleFactory.create(
+            student=first,
+            course_id=self.course.id,
+            module_state_key=self.usage_key,
+            module_type='lti',
+            state=json.dumps({'module_score': 3.0, 'score_comment': u'Good'}),
+        )
+        self.queue.replace_results(self.block, [(first, 0.5), (second, 0.2)], 10.0)
+
+        apply_pending_outcomes(self.course.id, self.usage_key)
+
+        module = self.get_student_module(first)
+        self.assertEqual((module.grade, module.max_grade), (5.0, 10.0))
+        self.assertEqual(json.loads(module.state), {'module_score': 5.0, 'score_comment': u''})
+        module = self.get_student_module(second)
+        self.assertEqual((module.grade, module.max_grade, module.module_type), (2.0, 10.0, 'lti'))
+        self.assertEqual(json.loads(module.state)['module_score'], 2.0)
+        self.assertFalse(PendingLTIOutcome.objects.exists())
+        # The grades are published like the grade handler's.
+        self.assertEqual(
+            [call[0][0] for call in dog_stats_api.increment.call_args_list],
+            ['lms.courseware.question_answered'] * 2
+        )
+
+    @patch('courseware.tasks.apply_lti_outcomes.apply_async')
+    def test_failing_outcome(self, __):
+        first, second, __ = self.users
+        self.queue.replace_results(self.block, [(first, 0.5), (second, 0.2)], 10.0)
+        set_module_score = LTI20ModuleMixin.set_module_score
+
+        def fail_for_first(module, user_id, *args):
+            """Fail to set the score of `first`."""
+            if user_id == first.id:
+                raise Exception('failed')
+            return set_module_score(module, user_id, *args)
+
+        with patch.object(LTI20ModuleMixin, 'set_module_score', autospec=True, side_effect=fail_for_first):
+            self.assertEqual(apply_pending_outcomes(self.course.id, self.usage_key), 1)
+
+        # The other outcomes are written, and the failed one stays pending.
+        self.assertEqual(self.get_student_module(second).grade, 2.0)
+        self.assertFalse(StudentModule.objects.filter(student=first).exists())
+        self.assertEqual(list(PendingLTIOutcome.objects.values_list('user_id', flat=True)), [first.id])
+
+        # Until the task is retried.
+        apply_pending_outcomes(self.course.id, self.usage_key)
+        self.assertEqual(self.get_student_module(first).grade, 5.0)
+        self.assertFalse(PendingLTIOutcome.objects.exists())
+
+    @patch('courseware.tasks.apply_lti_outcomes.retry', side_effect=Exception('retried'))
+    def test_task_retries(self, retry):
+        args = [self.course.id.to_deprecated_string(), unicode(self.usage_key)]
+        with patch('courseware.lti_outcomes.apply_pending_outcomes', return_value=1):
+            self.assertRaisesRegexp(Exception, 'retried', tasks.apply_lti_outcomes, *args)
+        retry.assert_called_once_with()
+
+        error = Exception('modulestore down')
+        retry.reset_mock()
+        with patch('courseware.lti_outcomes.apply_pending_outcomes', side_effect=error):
+            self.assertRaisesRegexp(Exception, 'retried', tasks.apply_lti_outcomes, *args)
+        retry.assert_called_once_with(exc=error)
+
+    def test_eager_task(self):
+        # Tests run celery tasks eagerly, so the scores are written right away.
+        self.queue.replace_results(self.block, [(self.users[0], 0.5)], 2.0)
+        self.assertEqual(self.get_student_module(self.users[0]).grade, 1.0)
+        self.assertFalse(PendingLTIOutcome.objects.exists())
+
+        # And the next scores start another task.
+        self.queue.replace_results(self.block, [(self.users[0], 1.0)], 2.0)
+        self.assertEqual(self.get_student_module(self.users[0]).grade, 2.0)
@@ -7,7 +7,8 @@ from functools import partial
 
 from courseware.model_data import DjangoKeyValueStore
 from courseware.model_data import InvalidScopeError, FieldDataCache
-from courseware.models import StudentModule
+from courseware.model_data import UserStateSummaryCounters
+from courseware.models import StudentModule, XModuleUserStateSummaryCounter
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
 from student.tests.factories import UserFactory
@@ -16,6 +17,7 @@ from courseware.tests.factories import UserStateSummaryFactory
 from courseware.tests.factories import StudentPrefsFactory, StudentInfoFactory
 
 from xblock.fields import Scope, BlockScope, ScopeIds
+from django.core.cache import cache
 from django.test import TestCase
 from django.db import DatabaseError
 from xblock.core import KeyValueMultiSaveError
@@ -339,3 +341,74 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestUserStateSummaryCounters(TestCase):
+    """Tests for UserStateSummaryCounters"""
+
+    def setUp(self):
+        cache.clear()
+        self.counters = UserStateSummaryCounters()
+        self.block = mock_descriptor()
+        self.block.all_words = {'cat': 2, 'dog': 1}
+
+    def test_get_counts_without_increments(self):
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 2, 'dog': 1})
+        self.block.all_words = None
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {})
+
+    def test_increment(self):
+        for _ in range(3 * UserStateSummaryCounters.SHARDS):
+            self.counters.increment(self.block, 'all_words', 'cat')
+        self.counters.increment(self.block, 'all_words', 'sun', 2)
+        self.counters.increment(self.block, 'all_words', 'dog', -1)
+
+        self.assertEquals(
+            self.counters.get_counts(self.block, 'all_words'),
+            {'cat': 2 + 3 * UserStateSummaryCounters.SHARDS, 'dog': 0, 'sun': 2}
+        )
+        # The field's value isn't changed
+        self.assertEquals(self.block.all_words, {'cat': 2, 'dog': 1})
+        self.assertLessEqual(
+            XModuleUserStateSummaryCounter.objects.filter(key='cat').count(),
+            UserStateSummaryCounters.SHARDS
+        )
+
+    def test_counts_are_per_block_and_field(self):
+        self.counters.increment(self.block, 'all_words', 'cat')
+        self.counters.increment(self.block, 'poll_answers', 'cat')
+        other_block = mock_descriptor()
+        other_block.scope_ids = other_block.scope_ids._replace(usage_id=location('other_usage_id'))
+        other_block.all_words = {}
+
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 3, 'dog': 1})
+        self.assertEquals(self.counters.get_counts(other_block, 'all_words'), {})
+
+    def test_keys_are_exact(self):
+        long_word = u'ab' * 200
+        self.counters.increment(self.block, 'all_words', long_word)
+        self.counters.increment(self.block, 'all_words', long_word[:255])
+        self.counters.increment(self.block, 'all_words', u'cafe')
+        self.counters.increment(self.block, 'all_words', u'caf\xe9', 2)
+        self.counters.increment(self.block, 'all_words', u'Cat')
+
+        cache.clear()
+        self.assertEquals(
+            self.counters.get_counts(self.block, 'all_words'),
+            {'cat': 2, 'dog': 1, long_word: 1, long_word[:255]: 1, u'cafe': 1, u'caf\xe9': 2, u'Cat': 1}
+        )
+
+    def test_totals_are_cached(self):
+        self.counters.increment(self.block, 'all_words', 'cat')
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 3, 'dog': 1})
+
+        # Increments made elsewhere are counted once the totals expire.
+        XModuleUserStateSummaryCounter.objects.update(count=5)
+        with self.assertNumQueries(0):
+            self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 3, 'dog': 1})
+        # But increments made here are counted right away.
+        self.counters.increment(self.block, 'all_words', 'sun')
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 3, 'dog': 1, 'sun': 1})
+
+        cache.clear()
+        self.assertEquals(self.counters.get_counts(self.block, 'all_words'), {'cat': 7, 'dog': 1, 'sun': 1})
@@ -476,6 +476,25 @@ class TestCourseGrader(TestSubmittingProblems):
         self.check_grade_percent(0.67)
         self.assertEqual(self.get_grade_summary()['grade'], 'B')
 
+    def test_progress_summary_and_grade(self):
+        """
+        Check that computing the progress summary and the grade together gives
+        the same results as computing them separately.
+        """
+        self.basic_setup()
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.submit_question_answer('p2', {'2_1': 'Incorrect'})
+
+        fake_request = self.factory.get(
+            reverse('progress', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        )
+        courseware_summary, grade_summary = grades.progress_summary_and_grade(
+            self.student_user, fake_request, self.course
+        )
+        self.assertEqual(courseware_summary, self.get_progress_summary())
+        self.assertEqual(grade_summary, self.get_grade_summary())
+        self.assertEqual(grade_summary['percent'], 0.33)
+
     def test_submissions_api_overrides_scores(self):
         """
         Check that answering incorrectly is graded properly.
@@ -985,7 +1004,8 @@ class TestAnswerDistributions(TestSubmittingProblems):
         )
         for val in ('Correct', True, False, 0, 0.0, 1, 1.0, None):
             state = json.loads(student_module.state)
-            state["student_answers"]['i4x-MITx-100-problem-p1_2_1'] = val
+            # The answer ids are stored shortened
+            state["student_answers"]['_2_1'] = val
             student_module.state = json.dumps(state)
             student_module.save()
 
@@ -22,6 +22,8 @@ from xmodule.exceptions import NotFoundError
 from xmodule.video_module.transcripts_utils import (
     TranscriptException,
     TranscriptsGenerationException,
+    Transcript,
+    save_to_store,
 )
 from opaque_keys.edx.locations import AssetLocation
 
@@ -69,6 +71,7 @@ def _clear_assets(location):
         asset_location = asset['asset_key']
         del_cached_content(asset_location)
         store.delete(asset_location)
+        Transcript.forget_version(asset_location)
 
 
 def _get_subs_id(filename):
@@ -100,6 +103,7 @@ def _upload_file(subs_file, location, filename):
     content = StaticContent(content_location, filename, mime_type, subs_file.read())
     contentstore().save(content)
     del_cached_content(content.location)
+    Transcript.forget_version(content.location)
 
 
 class TestVideo(BaseTestXmodule):
@@ -276,6 +280,21 @@ class TestTranscriptDownloadDispatch(TestVideo):
         self.assertEqual(response.headers['Content-Type'], 'application/x-subrip; charset=utf-8')
         self.assertEqual(response.headers['Content-Disposition'], 'attachment; filename="塞.srt"')
 
+    @patch('xmodule.video_module.VideoModule.get_transcript', return_value=('Subs!', 'test_filename.srt', 'application/x-subrip; charset=utf-8'))
+    def test_download_not_modified(self, __):
+        response = self.item.transcript(request=Request.blank('/download'), dispatch='download')
+        etag = response.headers['ETag']
+
+        request = Request.blank('/download', headers={'If-None-Match': etag})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.status, '304 Not Modified')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.body, '')
+
+        request = Request.blank('/download', headers={'If-None-Match': '"stale"'})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.body, 'Subs!')
+
 
 class TestTranscriptTranslationGetDispatch(TestVideo):
     """
@@ -775,3 +794,30 @@ class TestGetTranscript(TestVideo):
 
         with self.assertRaises(KeyError):
             self.item.get_transcript()
+
+    def test_cached_conversion(self):
+        good_sjson = _create_file(content=json.dumps({'start': [270], 'end': [2720], 'text': ['Hi, welcome to Edx.']}))
+        _upload_sjson_file(good_sjson, self.item.location)
+        self.item.sub = _get_subs_id(good_sjson.name)
+
+        text, __, __ = self.item.get_transcript('txt')
+        self.assertEqual(text, 'Hi, welcome to Edx.')
+
+        # The conversion is cached, the asset isn't read again.
+        with patch('xmodule.contentstore.mongo.MongoContentStore.find') as mock_find:
+            self.assertEqual(self.item.get_transcript('txt')[0], text)
+            self.assertFalse(mock_find.called)
+
+        # Saving the transcript forgets it.
+        save_to_store(
+            json.dumps({'start': [270], 'end': [2720], 'text': ['Bye.']}),
+            'subs_{}.srt.sjson'.format(self.item.sub),
+            'application/json',
+            self.item.location
+        )
+        self.assertEqual(self.item.get_transcript('txt')[0], 'Bye.')
+
+        # And so does deleting it.
+        Transcript.delete_asset(self.item.location, 'subs_{}.srt.sjson'.format(self.item.sub))
+        with self.assertRaises(NotFoundError):
+            self.item.get_transcript('txt')
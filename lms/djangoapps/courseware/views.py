@@ -755,9 +755,8 @@ def _progress(request, course_key, student_id):
     # additional DB lookup (this kills the Progress page in particular).
     student = User.objects.prefetch_related("groups").get(id=student.id)
 
-    courseware_summary = grades.progress_summary(student, request, course)
+    courseware_summary, grade_summary = grades.progress_summary_and_grade(student, request, course)
     studio_url = get_studio_url(course_key, 'settings/grading')
-    grade_summary = grades.grade(student, request, course)
 
     if courseware_summary is None:
         #This means the student didn't have access to the course (which the instructor requested)
@@ -867,7 +866,9 @@ def notification_image_for_tab(course_tab, user, course):
     }
 
     if course_tab.type in tab_notification_handlers:
-        notifications = tab_notification_handlers[course_tab.type](course, user)
+        # Never keep the page waiting on the grading controller: show what we
+        # have cached, and refresh it in the background.
+        notifications = tab_notification_handlers[course_tab.type](course, user, refresh_async=True)
         if notifications and notifications['pending_grading']:
             return notifications['img_path']
 
@@ -132,6 +132,20 @@ def get_threads(request, course_id, discussion_id=None, per_page=THREADS_PER_PAG
     return threads, query_params
 
 
+def get_user_info(request, cc_user):
+    """
+    Return the comments service profile of `cc_user`.
+
+    This is meant to run concurrently with `get_threads`, which may be saving
+    a new default sort key for the same user, so the sort key requested is
+    applied here rather than relying on which request finishes first.
+    """
+    user_info = cc_user.to_dict()
+    if request.GET.get('sort_key'):
+        user_info['default_sort_key'] = request.GET.get('sort_key')
+    return user_info
+
+
 @login_required
 def inline_discussion(request, course_id, discussion_id):
     """
@@ -142,9 +156,11 @@ def inline_discussion(request, course_id, discussion_id):
 
     course = get_course_with_access(request.user, 'load_forum', course_id)
 
-    threads, query_params = get_threads(request, course_id, discussion_id, per_page=INLINE_THREADS_PER_PAGE)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
+    (threads, query_params), user_info = cc.utils.run_concurrently(
+        lambda: get_threads(request, course_id, discussion_id, per_page=INLINE_THREADS_PER_PAGE),
+        lambda: get_user_info(request, cc_user)
+    )
 
     with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
         annotated_content_info = utils.get_metadata_for_threads(course_id, threads, request.user, user_info)
@@ -170,17 +186,18 @@ def forum_form_discussion(request, course_id):
     course = get_course_with_access(request.user, 'load_forum', course_id)
     course_settings = make_course_settings(course, include_category_map=True)
 
+    user = cc.User.from_django_user(request.user)
     try:
-        unsafethreads, query_params = get_threads(request, course_id)   # This might process a search query
+        (unsafethreads, query_params), user_info = cc.utils.run_concurrently(
+            lambda: get_threads(request, course_id),   # This might process a search query
+            lambda: get_user_info(request, user)
+        )
         is_staff = cached_has_permission(request.user, 'openclose_thread', course.id)
         threads = [utils.safe_content(thread, is_staff) for thread in unsafethreads]
     except cc.utils.CommentClientMaintenanceError:
         log.warning("Forum is in maintenance mode")
         return render_to_response('discussion/maintenance.html', {})
 
-    user = cc.User.from_django_user(request.user)
-    user_info = user.to_dict()
-
     with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
         annotated_content_info = utils.get_metadata_for_threads(course_id, threads, request.user, user_info)
 
@@ -232,22 +249,33 @@ def single_thread(request, course_id, discussion_id, thread_id):
     course = get_course_with_access(request.user, 'load_forum', course_id)
     course_settings = make_course_settings(course, include_category_map=True)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
 
     # Currently, the front end always loads responses via AJAX, even for this
     # page; it would be a nice optimization to avoid that extra round trip to
     # the comments service.
-    try:
-        thread = cc.Thread.find(thread_id).retrieve(
-            recursive=request.is_ajax(),
-            user_id=request.user.id,
-            response_skip=request.GET.get("resp_skip"),
-            response_limit=request.GET.get("resp_limit")
+    def retrieve_thread():
+        try:
+            return cc.Thread.find(thread_id).retrieve(
+                recursive=request.is_ajax(),
+                user_id=request.user.id,
+                response_skip=request.GET.get("resp_skip"),
+                response_limit=request.GET.get("resp_limit")
+            )
+        except cc.utils.CommentClientRequestError as e:
+            if e.status_code == 404:
+                raise Http404
+            raise
+
+    if request.is_ajax():
+        user_info, thread = cc.utils.run_concurrently(cc_user.to_dict, retrieve_thread)
+    else:
+        # The thread list for the sidebar consults the database, so it has to
+        # be built on this thread while the other requests are in flight.
+        (threads, query_params), user_info, thread = cc.utils.run_concurrently(
+            lambda: get_threads(request, course_id),
+            lambda: get_user_info(request, cc_user),
+            retrieve_thread
         )
-    except cc.utils.CommentClientRequestError as e:
-        if e.status_code == 404:
-            raise Http404
-        raise
 
     is_staff = cached_has_permission(request.user, 'openclose_thread', course.id)
     if request.is_ajax():
@@ -262,7 +290,6 @@ def single_thread(request, course_id, discussion_id, thread_id):
         })
 
     else:
-        threads, query_params = get_threads(request, course_id)
         threads.append(thread.to_dict())
 
         with newrelic.agent.FunctionTrace(nr_transaction, "add_courseware_context"):
@@ -568,8 +568,6 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
         'goals',
     ]
 
-    student_data = analytics.basic.enrolled_students_features(course_id, query_features)
-
     # Provide human-friendly and translatable names for these features. These names
     # will be displayed in the table generated in data_download.coffee. It is not (yet)
     # used as the header row in the CSV, but could be in the future.
@@ -588,6 +586,7 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
     }
 
     if not csv:
+        student_data = analytics.basic.enrolled_students_features(course_id, query_features)
         response_payload = {
             'course_id': course_id.to_deprecated_string(),
             'students': student_data,
@@ -598,8 +597,10 @@ def get_students_features(request, course_id, csv=False):  # pylint: disable=W06
         }
         return JsonResponse(response_payload)
     else:
-        header, datarows = analytics.csvs.format_dictlist(student_data, query_features)
-        return analytics.csvs.create_csv_response("enrolled_profiles.csv", header, datarows)
+        # Stream the rows rather than building the whole list of students.
+        student_data = analytics.basic.iterate_enrolled_students_features(course_id, query_features)
+        datarows = ([student.get(feature) for feature in query_features] for student in student_data)
+        return analytics.csvs.create_csv_response("enrolled_profiles.csv", query_features, datarows)
 
 
 @ensure_csrf_cookie
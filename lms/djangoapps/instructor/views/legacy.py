@@ -71,6 +71,7 @@ from student.models import (
     anonymous_id_for_user
 )
 import track.views
+from util.query import reporting
 from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
 from django.utils.translation import ugettext as _
@@ -1352,6 +1353,7 @@ class GradeTable(object):
         return self.components.keys()
 
 
+@reporting
 def get_student_grade_summary_data(request, course, get_grades=True, get_raw_scores=False, use_offline=False):
     """
     Return data arrays with student identity and grades for specified course.
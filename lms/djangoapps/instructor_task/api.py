@@ -17,7 +17,8 @@ from instructor_task.tasks import (rescore_problem,
                                    reset_problem_attempts,
                                    delete_problem_state,
                                    send_bulk_course_email,
-                                   calculate_grades_csv)
+                                   calculate_grades_csv,
+                                   generate_certificates)
 
 from instructor_task.api_helper import (check_arguments_for_rescoring,
                                         encode_problem_and_student_input,
@@ -218,3 +219,29 @@ def submit_calculate_grades_csv(request, course_key):
     task_key = ""
 
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_generate_certificates(request, course_key, statuses, insecure=False):
+    """
+    Request certificates to be generated for the students in a course as a background task.
+
+    Certificates are generated only for students whose certificate status is one of
+    `statuses`.  Students are processed in chunks by parallel subtasks, and since each
+    student's certificate status is updated as it is processed, resubmitting the task
+    after a failure picks up only the students that were not processed.
+
+    AlreadyRunningError is raised if certificates are already being generated for the
+    same statuses in the course.
+
+    This method makes sure the InstructorTask entry is committed.
+    When called from any view that is wrapped by TransactionMiddleware,
+    and thus in a "commit-on-success" transaction, an autocommit buried within here
+    will cause any pending transaction to be committed by a successful
+    save here.  Any future database operations will take place in a
+    separate transaction.
+    """
+    task_type = 'generate_certificates'
+    task_class = generate_certificates
+    task_input = {'statuses': sorted(statuses), 'insecure': insecure}
+    task_key = hashlib.md5(",".join(task_input['statuses'])).hexdigest()
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
@@ -12,6 +12,7 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+from contextlib import contextmanager
 from cStringIO import StringIO
 from gzip import GzipFile
 from uuid import uuid4
@@ -19,6 +20,7 @@ import csv
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
 
 from boto.s3.connection import S3Connection
@@ -193,9 +195,9 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. The rows of a report are written out as they are produced, so
+    reports can be generated from a generator without ever holding the whole
+    dataset in memory.
     """
     @classmethod
     def from_config(cls):
@@ -222,6 +224,14 @@ class S3ReportStore(ReportStore):
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
     """
+    # S3 requires every part of a multipart upload but the last to be at least 5MB.
+    MULTIPART_CHUNK_SIZE = 5 * 1024 * 1024
+
+    HEADERS = {
+        "Content-Encoding": "gzip",
+        "Content-Type": "text/csv",
+    }
+
     def __init__(self, bucket_name, root_path):
         self.root_path = root_path
 
@@ -298,18 +308,54 @@ class S3ReportStore(ReportStore):
     def store_rows(self, course_id, filename, rows):
         """
         Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        strings), write a gzip'd csv file of the rows to S3.
+
+        `rows` can be any iterable, e.g. a generator, and is consumed as the
+        file is written. Compressed data is buffered until there are
+        MULTIPART_CHUNK_SIZE bytes of it, which are then sent as one part of a
+        multipart upload, so memory use doesn't grow with the size of the file.
+        Small files that fit in a single chunk are simply `store()`d. S3 only
+        makes the file visible once the upload is complete.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
         """
         output_buffer = StringIO()
         gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csv.writer(gzip_file).writerows(rows)
-        gzip_file.close()
-
-        self.store(course_id, filename, output_buffer)
+        writer = csv.writer(gzip_file)
+        multipart_upload = None
+        num_parts = 0
+        try:
+            for row in rows:
+                writer.writerow(row)
+                if output_buffer.tell() >= self.MULTIPART_CHUNK_SIZE:
+                    if multipart_upload is None:
+                        key = self.key_for(course_id, filename)
+                        multipart_upload = self.bucket.initiate_multipart_upload(key.key, headers=self.HEADERS)
+                    num_parts += 1
+                    self._upload_part(multipart_upload, num_parts, output_buffer)
+            gzip_file.close()
+
+            if multipart_upload is None:
+                self.store(course_id, filename, output_buffer)
+            else:
+                num_parts += 1
+                self._upload_part(multipart_upload, num_parts, output_buffer)
+                multipart_upload.complete_upload()
+        except Exception:
+            # Don't leave the parts uploaded so far lying around in the bucket.
+            if multipart_upload is not None:
+                multipart_upload.cancel_upload()
+            raise
+
+    def _upload_part(self, multipart_upload, part_num, buff):
+        """
+        Upload the contents of `buff` as part number `part_num` of
+        `multipart_upload`, and empty `buff` for the next part.
+        """
+        multipart_upload.upload_part_from_file(StringIO(buff.getvalue()), part_num)
+        buff.seek(0)
+        buff.truncate()
 
     def links_for(self, course_id):
         """
@@ -370,22 +416,41 @@ class LocalFSReportStore(ReportStore):
         assumed to be a StringIO objecd (or anything that can flush its contents
         to string using `.getvalue()`).
         """
-        full_path = self.path_to(course_id, filename)
-        directory = os.path.dirname(full_path)
-        if not os.path.exists(directory):
-            os.mkdir(directory)
-
-        with open(full_path, "wb") as f:
+        with self._open(course_id, filename) as f:
             f.write(buff.getvalue())
 
     def store_rows(self, course_id, filename, rows):
         """
         Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        write this data out. `rows` can be any iterable, e.g. a generator, and
+        each row is written to the file as it is produced.
         """
-        output_buffer = StringIO()
-        csv.writer(output_buffer).writerows(rows)
-        self.store(course_id, filename, output_buffer)
+        with self._open(course_id, filename) as f:
+            csv.writer(f).writerows(rows)
+
+    @contextmanager
+    def _open(self, course_id, filename):
+        """
+        Open a given file for a given course for writing,
+        creating the course's directory if need be.
+
+        The data goes to a hidden temporary file, which only replaces the file
+        once it has all been written, so that links_for never lists a partial
+        report, as with S3.
+        """
+        full_path = self.path_to(course_id, filename)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+
+        temp_file = tempfile.NamedTemporaryFile(dir=directory, prefix='.', suffix='.tmp', delete=False)
+        try:
+            with temp_file:
+                yield temp_file
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+        os.rename(temp_file.name, full_path)
 
     def links_for(self, course_id):
         """
@@ -402,6 +467,7 @@ class LocalFSReportStore(ReportStore):
             [
                 (filename, ("file://" + urllib.quote(os.path.join(course_dir, filename))))
                 for filename in os.listdir(course_dir)
+                if not filename.startswith('.')
             ],
             reverse=True
         )
@@ -27,12 +27,13 @@ from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
     perform_module_state_update,
-    rescore_problem_module_state,
+    perform_delegate_rescoring,
     reset_attempts_module_state,
     delete_problem_module_state,
     push_grades_to_s3,
 )
 from bulk_email.tasks import perform_delegate_email_batches
+from certificates.tasks import perform_delegate_certificate_generation
 
 
 @task(base=BaseInstructorTask)  # pylint: disable=E1102
@@ -56,13 +57,12 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
     def filter_fcn(modules_to_update):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    visit_fcn = partial(perform_delegate_rescoring, xmodule_instance_args, filter_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -139,3 +139,27 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('graded')
     task_fn = partial(push_grades_to_s3, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask)  # pylint: disable=E1102
+def generate_certificates(entry_id, _xmodule_instance_args):
+    """Generates certificates for the students enrolled in a course.
+
+    `entry_id` is the id value of the InstructorTask entry that corresponds to this task.
+    The entry contains the `course_id` that identifies the course, as well as the
+    `task_input`, which contains task-specific input.
+
+    The task_input should be a dict with the following entries:
+
+      'statuses': certificates are generated only for students whose current
+          certificate status is in this list.  (required)
+
+      'insecure': if true, certificate callbacks to the LMS use http.
+
+    `_xmodule_instance_args` provides information needed by _get_module_instance_for_task()
+    to instantiate an xmodule instance.  This is unused here.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('certified')
+    visit_fcn = perform_delegate_certificate_generation
+    return run_main_task(entry_id, visit_fcn, action_name)
@@ -6,11 +6,13 @@ running state of a course.
 import json
 import urllib
 from datetime import datetime
+from functools import partial
 from time import time
 
-from celery import Task, current_task
+from celery import Task, current_task, task
 from celery.utils.log import get_task_logger
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import transaction, reset_queries
 from dogapi import dog_stats_api
@@ -21,10 +23,19 @@ from track.views import task_track
 
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
-from courseware.model_data import FieldDataCache
+from courseware.model_data import FieldDataCache, get_child_descriptors
 from courseware.module_render import get_module_for_descriptor_internal
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    queue_subtasks_for_query,
+    check_subtask_is_valid,
+    update_subtask_status,
+)
+from monitoring.signals import bulk_model_metrics
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from student.models import CourseEnrollment
+from util.query import reporting
 
 # define different loggers for use within tasks and on client side
 TASK_LOG = get_task_logger(__name__)
@@ -195,9 +206,10 @@ def run_main_task(entry_id, task_fcn, action_name):
         TASK_LOG.error(message)
         raise ValueError(message)
 
-    # Now do the work:
+    # Now do the work, counting the many model instances it touches in bulk:
     with dog_stats_api.timer('instructor_tasks.time.overall', tags=['action:{name}'.format(name=action_name)]):
-        task_progress = task_fcn(entry_id, course_id, task_input, action_name)
+        with bulk_model_metrics():
+            task_progress = task_fcn(entry_id, course_id, task_input, action_name)
 
     # Release any queries that the connection has been hanging onto:
     reset_queries()
@@ -244,31 +256,11 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     # get start time for task:
     start_time = time()
 
-    usage_key = course_id.make_usage_key_from_deprecated_string(task_input.get('problem_url'))
-    student_identifier = task_input.get('student')
-
     # find the problem descriptor:
-    module_descriptor = modulestore().get_item(usage_key)
-
-    # find the module in question
-    modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key=usage_key)
-
-    # give the option of updating an individual student. If not specified,
-    # then updates all students who have responded to a problem so far
-    student = None
-    if student_identifier is not None:
-        # if an identifier is supplied, then look for the student,
-        # and let it throw an exception if none is found.
-        if "@" in student_identifier:
-            student = User.objects.get(email=student_identifier)
-        elif student_identifier is not None:
-            student = User.objects.get(username=student_identifier)
-
-    if student is not None:
-        modules_to_update = modules_to_update.filter(student_id=student.id)
+    module_descriptor = _get_problem_descriptor(course_id, task_input)
 
-    if filter_fcn is not None:
-        modules_to_update = filter_fcn(modules_to_update)
+    # find the modules in question
+    modules_to_update = _get_modules_to_update(course_id, task_input, filter_fcn)
 
     # perform the main loop
     num_attempted = 0
@@ -290,8 +282,13 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
                     }
         return progress
 
+    # Writing progress to the result backend after every module makes it the
+    # bottleneck on big problems, so only do so every so many modules or seconds.
+    update_interval = settings.INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL
+    update_seconds = settings.INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS
     task_progress = get_task_progress()
     _get_current_task().update_state(state=PROGRESS, meta=task_progress)
+    last_update_time = time()
     for module_to_update in modules_to_update:
         num_attempted += 1
         # There is no try here:  if there's an error, we let it throw, and the task will
@@ -310,12 +307,216 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
                 raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
 
         # update task status:
-        task_progress = get_task_progress()
-        _get_current_task().update_state(state=PROGRESS, meta=task_progress)
+        if num_attempted % update_interval == 0 or time() - last_update_time >= update_seconds:
+            task_progress = get_task_progress()
+            _get_current_task().update_state(state=PROGRESS, meta=task_progress)
+            last_update_time = time()
 
+    task_progress = get_task_progress()
+    _record_throughput(action_name, num_attempted, time() - start_time)
     return task_progress
 
 
+def _get_problem_descriptor(course_id, task_input):
+    """
+    Returns the descriptor of the problem named by task_input['problem_url'].
+
+    Raises ItemNotFoundError if there is no such problem.
+    """
+    usage_key = course_id.make_usage_key_from_deprecated_string(task_input.get('problem_url'))
+    return modulestore().get_item(usage_key)
+
+
+def _get_modules_to_update(course_id, task_input, filter_fcn):
+    """
+    Returns a query set of the StudentModules of the problem named by
+    task_input['problem_url'], limited to those of task_input['student']
+    if one is specified, and further filtered by `filter_fcn` if it is not None.
+    """
+    usage_key = course_id.make_usage_key_from_deprecated_string(task_input.get('problem_url'))
+    student_identifier = task_input.get('student')
+
+    # find the module in question
+    modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key=usage_key)
+
+    # give the option of updating an individual student. If not specified,
+    # then updates all students who have responded to a problem so far
+    student = None
+    if student_identifier is not None:
+        # if an identifier is supplied, then look for the student,
+        # and let it throw an exception if none is found.
+        if "@" in student_identifier:
+            student = User.objects.get(email=student_identifier)
+        elif student_identifier is not None:
+            student = User.objects.get(username=student_identifier)
+
+    if student is not None:
+        modules_to_update = modules_to_update.filter(student_id=student.id)
+
+    if filter_fcn is not None:
+        modules_to_update = filter_fcn(modules_to_update)
+
+    # The update functions all need the student, so fetch it along with the module.
+    return modules_to_update.select_related('student')
+
+
+def _record_throughput(action_name, num_attempted, duration):
+    """
+    Logs and reports to DataDog how many modules per second were processed
+    when `num_attempted` modules took `duration` seconds.
+    """
+    if num_attempted == 0 or duration <= 0:
+        return
+    throughput = num_attempted / duration
+    TASK_LOG.info(u"Task %s %d modules in %.1f seconds (%.1f per second)", action_name, num_attempted, duration, throughput)
+    dog_stats_api.histogram('instructor_tasks.module.throughput', throughput, tags=[u'action:{name}'.format(name=action_name)])
+
+
+def perform_delegate_rescoring(xmodule_instance_args, filter_fcn, entry_id, course_id, task_input, action_name):
+    """
+    Rescores a problem, splitting the work up into subtasks if there are many submissions.
+
+    Rescoring for one student, or for no more than settings.INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK
+    submissions, is done directly by perform_module_state_update.  Otherwise the
+    StudentModules to rescore are chopped up into batches of that size, and a
+    `rescore_problem_for_students` subtask is queued for each.
+
+    Arguments are as for perform_module_state_update, except that the `xmodule_instance_args`
+    to pass to rescore_problem_module_state take the place of its `update_fcn`.
+    """
+    # Look the problem up first, so that a missing problem fails the task right away.
+    _get_problem_descriptor(course_id, task_input)
+    modules_to_update = _get_modules_to_update(course_id, task_input, filter_fcn)
+    modules_per_task = settings.INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK
+
+    if task_input.get('student') is not None or modules_to_update.count() <= modules_per_task:
+        update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+        return perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_id = entry.task_id
+
+    # As with bulk email, if the task was requeued after its subtasks were
+    # defined, the subtasks already queued will do the work.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already been processed for rescoring!  InstructorTask = %s", task_id, entry)
+        progress = json.loads(entry.task_output)
+        return progress
+
+    def _create_rescore_subtask(to_list, initial_subtask_status):
+        """Creates a subtask to rescore the problem for a given list of StudentModules."""
+        subtask_id = initial_subtask_status.task_id
+        new_subtask = rescore_problem_for_students.subtask(
+            (
+                entry_id,
+                course_id.to_deprecated_string(),
+                to_list,
+                task_input,
+                xmodule_instance_args,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=subtask_id,
+        )
+        return new_subtask
+
+    TASK_LOG.info(u"Task %s: Preparing to queue subtasks for rescoring problem %s in course %s",
+                  task_id, task_input.get('problem_url'), course_id)
+
+    progress = queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_rescore_subtask,
+        modules_to_update,
+        [],
+        modules_per_task,
+    )
+
+    # As with bulk email, the InstructorTask holds the "real" status from here on.
+    return progress
+
+
+@task  # pylint: disable=E1102
+def rescore_problem_for_students(entry_id, course_id, to_list, task_input, xmodule_instance_args, subtask_status_dict):
+    """
+    Rescores a problem for a list of StudentModules.
+
+    Inputs are:
+      * `entry_id`: id of the InstructorTask object to which progress should be recorded.
+      * `course_id`: id of the course, as a deprecated string.
+      * `to_list`: list of StudentModules.  Each is represented as a dict with the key
+        'pk', the primary key of the StudentModule model.
+      * `task_input`: the task_input of the InstructorTask, naming the problem to rescore.
+      * `xmodule_instance_args`: information needed by _get_module_instance_for_task()
+        to instantiate an xmodule instance.
+      * `subtask_status_dict` : dict containing values representing current status,
+        as defined by SubtaskStatus.to_dict().
+
+    The problem descriptor and its descendants are looked up once and reused for
+    every StudentModule.  Updates the InstructorTask object with status information
+    (rescored, failures) and updates number of subtasks completed.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    TASK_LOG.info(u"Preparing to rescore %d modules as subtask %s for instructor task %d: status=%s",
+                  len(to_list), current_task_id, entry_id, subtask_status)
+
+    # Check that the requested subtask is actually known to the current InstructorTask entry,
+    # and that it has not already been completed, as for bulk email.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    num_previously_processed = subtask_status.attempted + subtask_status.skipped
+    try:
+        with dog_stats_api.timer('instructor_tasks.rescore.single_task.time.overall', tags=[u'course:{}'.format(course_id)]):
+            with bulk_model_metrics():
+                _rescore_student_modules(course_key, to_list, task_input, xmodule_instance_args, subtask_status)
+    except Exception:
+        # Unexpected exception. Try to write out the failure to the entry before failing.
+        TASK_LOG.exception(u"Rescore task %s: failed unexpectedly!", current_task_id)
+        # Since we don't know how far the task got, count the modules that
+        # haven't been accounted for as having failed, to keep the counts consistent.
+        num_processed = subtask_status.attempted + subtask_status.skipped - num_previously_processed
+        subtask_status.increment(failed=len(to_list) - num_processed, state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    TASK_LOG.info(u"Rescore task %s: succeeded", current_task_id)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+
+    # return status in a form that can be serialized by Celery into JSON:
+    return subtask_status.to_dict()
+
+
+def _rescore_student_modules(course_id, to_list, task_input, xmodule_instance_args, subtask_status):
+    """
+    Rescores the StudentModules in `to_list`, recording the outcome of each in `subtask_status`.
+    """
+    start_time = time()
+    module_descriptor = _get_problem_descriptor(course_id, task_input)
+    descriptors = get_child_descriptors(module_descriptor)
+    student_modules = StudentModule.objects.filter(id__in=[item['pk'] for item in to_list]).select_related('student')
+
+    num_processed = 0
+    for student_module in student_modules:
+        num_processed += 1
+        update_status = rescore_problem_module_state(
+            xmodule_instance_args, module_descriptor, student_module, descriptors=descriptors
+        )
+        if update_status == UPDATE_STATUS_SUCCEEDED:
+            subtask_status.increment(succeeded=1)
+        elif update_status == UPDATE_STATUS_FAILED:
+            subtask_status.increment(failed=1)
+        else:
+            raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+
+    # Modules deleted since the subtasks were queued have nothing left to rescore.
+    if num_processed < len(to_list):
+        subtask_status.increment(skipped=len(to_list) - num_processed)
+
+    _record_throughput('rescored', num_processed, time() - start_time)
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -343,16 +544,21 @@ def _get_track_function_for_task(student, xmodule_instance_args=None, source_pag
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None):
+                                  grade_bucket_type=None, descriptors=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    `descriptors` is the list of `module_descriptor` and its descendants, for callers that instantiate
+    the same module for many students.  If None, it is looked up.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if descriptors is None:
+        descriptors = get_child_descriptors(module_descriptor)
+    field_data_cache = FieldDataCache(descriptors, course_id, student)
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
     # information:
@@ -378,11 +584,13 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
 
 
 @transaction.autocommit
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, descriptors=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs rescoring on the student's problem submission.
 
+    `descriptors` is passed through to _get_module_instance_for_task.
+
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
     or if the module doesn't support rescoring.
@@ -394,7 +602,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
     course_id = student_module.course_id
     student = student_module.student
     usage_key = student_module.module_state_key
-    instance = _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args, grade_bucket_type='rescore')
+    instance = _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args,
+                                             grade_bucket_type='rescore', descriptors=descriptors)
 
     if instance is None:
         # Either permissions just changed, or someone is trying to be clever
@@ -469,14 +678,16 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     return UPDATE_STATUS_SUCCEEDED
 
 
+@reporting
 def push_grades_to_s3(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
+    `ReportStore.from_config()`) and calling `link_for()` on it. The rows are
+    streamed to the `ReportStore` as students are graded, so memory use does
+    not grow with enrollment; S3 only makes the file visible once it is
+    complete, so any files that are visible in ReportStore will be complete ones.
 
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
@@ -486,10 +697,14 @@ def push_grades_to_s3(_xmodule_instance_args, _entry_id, course_id, _task_input,
     status_interval = 100
 
     enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
-    num_total = enrolled_students.count()
-    num_attempted = 0
-    num_succeeded = 0
-    num_failed = 0
+    # The counts are kept in a dict so that the generator below can update them.
+    counts = {
+        'total': enrolled_students.count(),
+        'attempted': 0,
+        'succeeded': 0,
+        'failed': 0,
+    }
+    # The grade report is uploaded as the grades are calculated, so there is no separate upload step.
     curr_step = "Calculating Grades"
 
     def update_task_progress():
@@ -497,10 +712,10 @@ def push_grades_to_s3(_xmodule_instance_args, _entry_id, course_id, _task_input,
         current_time = datetime.now(UTC)
         progress = {
             'action_name': action_name,
-            'attempted': num_attempted,
-            'succeeded': num_succeeded,
-            'failed': num_failed,
-            'total': num_total,
+            'attempted': counts['attempted'],
+            'succeeded': counts['succeeded'],
+            'failed': counts['failed'],
+            'total': counts['total'],
             'duration_ms': int((current_time - start_time).total_seconds() * 1000),
             'step': curr_step,
         }
@@ -508,57 +723,56 @@ def push_grades_to_s3(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
         return progress
 
-    # Loop over all our students and build our CSV lists in memory
-    header = None
-    rows = []
+    # Error rows are expected to be few, so they are kept in memory to be
+    # written out once the grades are done.
     err_rows = [["id", "username", "error_msg"]]
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
-        # Periodically update task status (this is a cache write)
-        if num_attempted % status_interval == 0:
-            update_task_progress()
-        num_attempted += 1
 
-        if gradeset:
-            # We were able to successfully grade this student for this course.
-            num_succeeded += 1
-            if not header:
-                # Encode the header row in utf-8 encoding in case there are unicode characters
-                header = [section['label'].encode('utf-8') for section in gradeset[u'section_breakdown']]
-                rows.append(["id", "email", "username", "grade"] + header)
-
-            percents = {
-                section['label']: section.get('percent', 0.0)
-                for section in gradeset[u'section_breakdown']
-                if 'label' in section
-            }
-
-            # Not everybody has the same gradable items. If the item is not
-            # found in the user's gradeset, just assume it's a 0. The aggregated
-            # grades for their sections and overall course will be calculated
-            # without regard for the item they didn't have access to, so it's
-            # possible for a student to have a 0.0 show up in their row but
-            # still have 100% for the course.
-            row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append([student.id, student.email, student.username, gradeset['percent']] + row_percents)
-        else:
-            # An empty gradeset means we failed to grade a student.
-            num_failed += 1
-            err_rows.append([student.id, student.username, err_msg])
-
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    curr_step = "Uploading CSVs"
-    update_task_progress()
+    def grade_rows():
+        """Grade each of our students, yielding their CSV rows as we go."""
+        header = None
+        for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students.iterator()):
+            # Periodically update task status (this is a cache write)
+            if counts['attempted'] % status_interval == 0:
+                update_task_progress()
+            counts['attempted'] += 1
+
+            if gradeset:
+                # We were able to successfully grade this student for this course.
+                counts['succeeded'] += 1
+                if not header:
+                    # Encode the header row in utf-8 encoding in case there are unicode characters
+                    header = [section['label'].encode('utf-8') for section in gradeset[u'section_breakdown']]
+                    yield ["id", "email", "username", "grade"] + header
+
+                percents = {
+                    section['label']: section.get('percent', 0.0)
+                    for section in gradeset[u'section_breakdown']
+                    if 'label' in section
+                }
+
+                # Not everybody has the same gradable items. If the item is not
+                # found in the user's gradeset, just assume it's a 0. The aggregated
+                # grades for their sections and overall course will be calculated
+                # without regard for the item they didn't have access to, so it's
+                # possible for a student to have a 0.0 show up in their row but
+                # still have 100% for the course.
+                row_percents = [percents.get(label, 0.0) for label in header]
+                yield [student.id, student.email, student.username, gradeset['percent']] + row_percents
+            else:
+                # An empty gradeset means we failed to grade a student.
+                counts['failed'] += 1
+                err_rows.append([student.id, student.username, err_msg])
 
     # Generate parts of the file name
     timestamp_str = start_time.strftime("%Y-%m-%d-%H%M")
     course_id_prefix = urllib.quote(course_id.to_deprecated_string().replace("/", "_"))
 
-    # Perform the actual upload
+    # Grade the students, streaming their rows into the upload
     report_store = ReportStore.from_config()
     report_store.store_rows(
         course_id,
         u"{}_grade_report_{}.csv".format(course_id_prefix, timestamp_str),
-        rows
+        grade_rows()
     )
 
     # If there are any error rows (don't count the header), write them out as well
@@ -0,0 +1,111 @@
+"""
+Unit tests for the ReportStores that hold instructor report downloads.
+"""
+import csv
+import shutil
+import tempfile
+from cStringIO import StringIO
+from gzip import GzipFile
+from uuid import uuid4
+
+from django.test import TestCase
+from mock import patch
+
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from instructor_task.models import LocalFSReportStore, S3ReportStore
+
+
+def _generate_rows(num_rows):
+    """Yield `num_rows` CSV rows of hard-to-compress data."""
+    for index in xrange(num_rows):
+        yield [index, uuid4().hex, uuid4().hex]
+
+
+def _parse_csv(data):
+    """Return the rows of the CSV file contained in the string `data`."""
+    return [[int(row[0])] + row[1:] for row in csv.reader(StringIO(data))]
+
+
+class TestLocalFSReportStore(TestCase):
+    """Tests for LocalFSReportStore."""
+
+    def setUp(self):
+        self.root_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root_path)
+        self.course_id = SlashSeparatedCourseKey('robot', 'course', 'id')
+        self.report_store = LocalFSReportStore(self.root_path)
+
+    def test_store_rows_from_generator(self):
+        rows = list(_generate_rows(100))
+        self.report_store.store_rows(self.course_id, 'report.csv', iter(rows))
+        with open(self.report_store.path_to(self.course_id, 'report.csv')) as report_file:
+            self.assertEqual(_parse_csv(report_file.read()), rows)
+        self.assertEqual([filename for filename, _ in self.report_store.links_for(self.course_id)], ['report.csv'])
+
+    def test_partial_report_not_listed(self):
+        def rows():
+            """Yield a row, check what is listed meanwhile, then fail."""
+            yield ['header']
+            self.assertEqual(self.report_store.links_for(self.course_id), [])
+            raise IOError('failed')
+
+        with self.assertRaises(IOError):
+            self.report_store.store_rows(self.course_id, 'report.csv', rows())
+        self.assertEqual(self.report_store.links_for(self.course_id), [])
+
+
+@patch('instructor_task.models.Key')
+@patch('instructor_task.models.S3Connection')
+class TestS3ReportStore(TestCase):
+    """Tests for S3ReportStore, with S3 mocked out."""
+
+    def setUp(self):
+        self.course_id = SlashSeparatedCourseKey('robot', 'course', 'id')
+
+    def _get_report_store(self, mock_connection):
+        """Return an S3ReportStore along with its mock bucket."""
+        report_store = S3ReportStore('bucket', 'root')
+        return report_store, mock_connection.return_value.get_bucket.return_value
+
+    def test_small_file_is_stored_directly(self, mock_connection, mock_key):
+        report_store, bucket = self._get_report_store(mock_connection)
+        rows = list(_generate_rows(10))
+        report_store.store_rows(self.course_id, 'report.csv', iter(rows))
+
+        self.assertFalse(bucket.initiate_multipart_upload.called)
+        data = mock_key.return_value.set_contents_from_string.call_args[0][0]
+        self.assertEqual(_parse_csv(GzipFile(fileobj=StringIO(data)).read()), rows)
+
+    @patch.object(S3ReportStore, 'MULTIPART_CHUNK_SIZE', 4096)
+    def test_large_file_is_uploaded_in_parts(self, mock_connection, mock_key):
+        report_store, bucket = self._get_report_store(mock_connection)
+        multipart_upload = bucket.initiate_multipart_upload.return_value
+        parts = []
+        multipart_upload.upload_part_from_file.side_effect = lambda fp, part_num: parts.append((part_num, fp.read()))
+
+        rows = list(_generate_rows(2000))
+        report_store.store_rows(self.course_id, 'report.csv', iter(rows))
+
+        self.assertGreater(len(parts), 2)
+        self.assertEqual([part_num for part_num, _ in parts], range(1, len(parts) + 1))
+        data = ''.join(part_data for _, part_data in parts)
+        self.assertEqual(_parse_csv(GzipFile(fileobj=StringIO(data)).read()), rows)
+        self.assertTrue(multipart_upload.complete_upload.called)
+        self.assertFalse(mock_key.return_value.set_contents_from_string.called)
+
+    @patch.object(S3ReportStore, 'MULTIPART_CHUNK_SIZE', 4096)
+    def test_failed_upload_is_cancelled(self, mock_connection, _mock_key):
+        report_store, bucket = self._get_report_store(mock_connection)
+        multipart_upload = bucket.initiate_multipart_upload.return_value
+
+        def failing_rows():
+            """Yield enough rows to start uploading, then fail."""
+            for row in _generate_rows(2000):
+                yield row
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', failing_rows())
+        self.assertTrue(multipart_upload.cancel_upload.called)
+        self.assertFalse(multipart_upload.complete_upload.called)
@@ -1,6 +1,7 @@
 import datetime
 import json
 import logging
+import time
 
 from django.conf import settings
 
@@ -19,7 +20,13 @@ from .staff_grading_service import StaffGradingService
 
 log = logging.getLogger(__name__)
 
+# Notifications are refreshed from the grading controller once they are this many seconds old.
 NOTIFICATION_CACHE_TIME = 300
+# Notifications older than NOTIFICATION_CACHE_TIME are still shown for this long while
+# they are refreshed, so that pages never wait on a slow grading controller.
+NOTIFICATION_STALE_CACHE_TIME = 60 * 60 * 24
+# A refresh of a user's notifications is queued at most once in this many seconds.
+NOTIFICATION_REFRESH_LOCK_TIME = 60
 KEY_PREFIX = "open_ended_"
 
 NOTIFICATION_TYPES = (
@@ -30,17 +37,89 @@ NOTIFICATION_TYPES = (
 )
 
 
-def staff_grading_notifications(course, user):
+def staff_grading_notifications(course, user, refresh_async=False):
+    """
+    Show staff grading notifications to a given user for a given course.  See `get_notifications`.
+    """
+    return get_notifications("staff", course, user, refresh_async)
+
+
+def peer_grading_notifications(course, user, refresh_async=False):
+    """
+    Show peer grading notifications to a given user for a given course.  See `get_notifications`.
+    """
+    return get_notifications("peer", course, user, refresh_async)
+
+
+def combined_notifications(course, user, refresh_async=False):
+    """
+    Show notifications to a given user for a given course.  See `get_notifications`.
+    @param course: The course object for which we are getting notifications
+    @param user: The user object for which we are getting notifications
+    @return: A dictionary with boolean pending_grading (true if there is pending grading), img_path (for notification
+    image), and response (actual response from grading controller server).
+    """
+    #We don't want to show anonymous users anything.
+    if not user.is_authenticated():
+        return _empty_notifications()
+
+    return get_notifications("combined", course, user, refresh_async)
+
+
+def get_notifications(notification_type, course, user, refresh_async=False):
+    """
+    Get the notifications of type `notification_type` for `user` in `course` from the cache if
+    they are fresh enough, or from the grading controller server if not.
+
+    If `refresh_async` is True, the grading controller is never called while the caller waits:
+    the cached notifications are returned even when they are stale, or no notifications if nothing
+    is cached, and a task is queued to refresh them.
+    """
+    student_id = unique_id_for_user(user)
+    notification_dict, is_fresh = get_value_from_cache(student_id, course.id, notification_type)
+    if is_fresh:
+        return notification_dict
+
+    if not refresh_async:
+        return refresh_notifications(notification_type, course, user)
+
+    lock_key = create_key_name(student_id, course.id, notification_type) + "_refreshing"
+    if cache.add(lock_key, True, NOTIFICATION_REFRESH_LOCK_TIME):
+        # Import here to avoid a circular import.
+        from open_ended_grading.tasks import refresh_notifications_task
+        try:
+            refresh_notifications_task.delay(notification_type, course.id.to_deprecated_string(), user.id)
+        except Exception:  # pylint: disable=broad-except
+            # e.g. the broker is down: the page is still shown, with what is cached.
+            log.exception("Could not queue the refresh of the %s notifications of user %s", notification_type, user.id)
+            cache.delete(lock_key)
+
+    if notification_dict is None:
+        return _empty_notifications()
+    return notification_dict
+
+
+def refresh_notifications(notification_type, course, user):
+    """
+    Get the notifications of type `notification_type` for `user` in `course` from the
+    grading controller server, and store them in the cache.
+    """
+    notification_dict = NOTIFICATION_FETCHERS[notification_type](course, user)
+    set_value_in_cache(unique_id_for_user(user), course.id, notification_type, notification_dict)
+    return notification_dict
+
+
+def _empty_notifications():
+    """Return the notifications to show when there are none."""
+    return {'pending_grading': False, 'img_path': "", 'response': {}}
+
+
+def _fetch_staff_grading_notifications(course, user):
     staff_gs = StaffGradingService(settings.OPEN_ENDED_GRADING_INTERFACE)
     pending_grading = False
     img_path = ""
     course_id = course.id
     student_id = unique_id_for_user(user)
-    notification_type = "staff"
-
-    success, notification_dict = get_value_from_cache(student_id, course_id, notification_type)
-    if success:
-        return notification_dict
 
     try:
         notifications = json.loads(staff_gs.get_notifications(course_id))
@@ -58,14 +137,10 @@ def staff_grading_notifications(course, user):
     if pending_grading:
         img_path = "/static/images/grading_notification.png"
 
-    notification_dict = {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
+    return {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
 
-    set_value_in_cache(student_id, course_id, notification_type, notification_dict)
-
-    return notification_dict
 
-
-def peer_grading_notifications(course, user):
+def _fetch_peer_grading_notifications(course, user):
     system = LmsModuleSystem(
         track_function=None,
         get_module=None,
@@ -81,11 +156,6 @@ def peer_grading_notifications(course, user):
     img_path = ""
     course_id = course.id
     student_id = unique_id_for_user(user)
-    notification_type = "peer"
-
-    success, notification_dict = get_value_from_cache(student_id, course_id, notification_type)
-    if success:
-        return notification_dict
 
     try:
         notifications = json.loads(peer_gs.get_notifications(course_id, student_id))
@@ -102,31 +172,14 @@ def peer_grading_notifications(course, user):
     if pending_grading:
         img_path = "/static/images/grading_notification.png"
 
-    notification_dict = {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
+    return {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
 
-    set_value_in_cache(student_id, course_id, notification_type, notification_dict)
 
-    return notification_dict
-
-
-def combined_notifications(course, user):
-    """
-    Show notifications to a given user for a given course.  Get notifications from the cache if possible,
-    or from the grading controller server if not.
-    @param course: The course object for which we are getting notifications
-    @param user: The user object for which we are getting notifications
-    @return: A dictionary with boolean pending_grading (true if there is pending grading), img_path (for notification
-    image), and response (actual response from grading controller server).
-    """
+def _fetch_combined_notifications(course, user):
     #Set up return values so that we can return them for error cases
     pending_grading = False
     img_path = ""
     notifications = {}
-    notification_dict = {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
-
-    #We don't want to show anonymous users anything.
-    if not user.is_authenticated():
-        return notification_dict
 
     #Define a mock modulesystem
     system = LmsModuleSystem(
@@ -145,12 +198,6 @@ def combined_notifications(course, user):
     student_id = unique_id_for_user(user)
     user_is_staff = has_access(user, 'staff', course)
     course_id = course.id
-    notification_type = "combined"
-
-    #See if we have a stored value in the cache
-    success, notification_dict = get_value_from_cache(student_id, course_id, notification_type)
-    if success:
-        return notification_dict
 
     #Get the time of the last login of the user
     last_login = user.last_login
@@ -174,18 +221,23 @@ def combined_notifications(course, user):
     if pending_grading:
         img_path = "/static/images/grading_notification.png"
 
-    notification_dict = {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
+    return {'pending_grading': pending_grading, 'img_path': img_path, 'response': notifications}
 
-    #Store the notifications in the cache
-    set_value_in_cache(student_id, course_id, notification_type, notification_dict)
 
-    return notification_dict
+NOTIFICATION_FETCHERS = {
+    "staff": _fetch_staff_grading_notifications,
+    "peer": _fetch_peer_grading_notifications,
+    "combined": _fetch_combined_notifications,
+}
 
 
 def get_value_from_cache(student_id, course_id, notification_type):
+    """
+    Return the cached notifications, or None if there are none, along with
+    whether they are still fresh enough to be used without refreshing them.
+    """
     key_name = create_key_name(student_id, course_id, notification_type)
-    success, value = _get_value_from_cache(key_name)
-    return success, value
+    return _get_value_from_cache(key_name)
 
 
 def set_value_in_cache(student_id, course_id, notification_type, value):
@@ -201,16 +253,15 @@ def create_key_name(student_id, course_id, notification_type):
 
 def _get_value_from_cache(key_name):
     value = cache.get(key_name)
-    success = False
     if value is None:
-        return success, value
+        return None, False
     try:
         value = json.loads(value)
-        success = True
-    except:
-        pass
-    return success, value
+        return value['notifications'], value['fresh_until'] > time.time()
+    except (ValueError, TypeError, KeyError):
+        return None, False
 
 
 def _set_value_in_cache(key_name, value):
-    cache.set(key_name, json.dumps(value), NOTIFICATION_CACHE_TIME)
+    cached_value = {'notifications': value, 'fresh_until': time.time() + NOTIFICATION_CACHE_TIME}
+    cache.set(key_name, json.dumps(cached_value), NOTIFICATION_STALE_CACHE_TIME)
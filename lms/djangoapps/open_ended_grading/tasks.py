@@ -0,0 +1,22 @@
+"""
+Celery tasks for refreshing open ended grading notifications in the background.
+"""
+from celery import task
+from django.contrib.auth.models import User
+
+from courseware.courses import get_course
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from open_ended_grading import open_ended_notifications
+
+
+@task  # pylint: disable=E1102
+def refresh_notifications_task(notification_type, course_id, user_id):
+    """
+    Fetch the notifications of type `notification_type` for the user with id
+    `user_id` in the course with id `course_id` (a deprecated string) from the
+    grading controller server, and store them in the cache.
+    """
+    course = get_course(SlashSeparatedCourseKey.from_deprecated_string(course_id))
+    user = User.objects.get(id=user_id)
+    open_ended_notifications.refresh_notifications(notification_type, course, user)
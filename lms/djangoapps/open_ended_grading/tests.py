@@ -6,6 +6,7 @@ Tests for open ended grading interfaces
 
 import json
 import logging
+import time
 
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -31,7 +32,8 @@ from student.roles import CourseStaffRole
 from edxmako.shortcuts import render_to_string
 from student.models import unique_id_for_user
 
-from open_ended_grading import staff_grading_service, views, utils
+from open_ended_grading import staff_grading_service, views, utils, open_ended_notifications
+from util.cache import cache
 
 log = logging.getLogger(__name__)
 
@@ -533,3 +535,73 @@ class TestStudentProblemList(ModuleStoreTestCase):
         self.assertEqual(len(valid_problems), 2)
         # Ensure that human names are being set properly.
         self.assertEqual(valid_problems[0]['grader_type_display_name'], "Instructor Assessment")
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestNotifications(ModuleStoreTestCase):
+    """
+    Test that notifications are served from the cache, and refreshed in the background when stale.
+    """
+
+    def setUp(self):
+        self.course_key = SlashSeparatedCourseKey('edX', 'open_ended', '2012_Fall')
+        self.course = modulestore().get_course(self.course_key)
+        self.user = factories.UserFactory()
+        cache.clear()
+        self.fetched = {'pending_grading': True, 'img_path': '/static/images/grading_notification.png', 'response': {}}
+        self.fetch = Mock(return_value=self.fetched)
+        patcher = patch.dict(open_ended_notifications.NOTIFICATION_FETCHERS, {'peer': self.fetch})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _cache_notifications(self, notifications, age):
+        """Cache `notifications` as if they had been fetched `age` seconds ago."""
+        with patch('open_ended_grading.open_ended_notifications.time.time') as mock_time:
+            mock_time.return_value = time.time() - age
+            open_ended_notifications.set_value_in_cache(
+                unique_id_for_user(self.user), self.course.id, 'peer', notifications
+            )
+
+    def test_fresh_notifications_are_not_fetched(self):
+        cached = {'pending_grading': False, 'img_path': '', 'response': {}}
+        self._cache_notifications(cached, 0)
+        self.assertEqual(open_ended_notifications.peer_grading_notifications(self.course, self.user), cached)
+        self.assertFalse(self.fetch.called)
+
+    def test_stale_notifications_are_fetched(self):
+        self._cache_notifications({'pending_grading': False, 'img_path': '', 'response': {}}, 3600)
+        self.assertEqual(open_ended_notifications.peer_grading_notifications(self.course, self.user), self.fetched)
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_stale_notifications_are_served_while_refreshing(self):
+        cached = {'pending_grading': False, 'img_path': '', 'response': {}}
+        self._cache_notifications(cached, 3600)
+        # Celery runs the refresh task right away in tests.
+        notifications = open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertEqual(notifications, cached)
+        self.assertEqual(self.fetch.call_count, 1)
+        # The refreshed notifications are served from then on.
+        notifications = open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertEqual(notifications, self.fetched)
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_missing_notifications_are_refreshed_in_background(self):
+        notifications = open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertFalse(notifications['pending_grading'])
+        self.assertEqual(self.fetch.call_count, 1)
+        # Only one refresh is queued at a time.
+        cache.delete(open_ended_notifications.create_key_name(unique_id_for_user(self.user), self.course.id, 'peer'))
+        open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertEqual(self.fetch.call_count, 1)
+
+    @patch('open_ended_grading.tasks.refresh_notifications_task.delay', side_effect=Exception('broker down'))
+    def test_queue_failure(self, delay):
+        cached = {'pending_grading': False, 'img_path': '', 'response': {}}
+        self._cache_notifications(cached, 3600)
+        # The stale notifications are still shown.
+        notifications = open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertEqual(notifications, cached)
+        self.assertFalse(self.fetch.called)
+        # And the next page tries to queue the refresh again.
+        open_ended_notifications.peer_grading_notifications(self.course, self.user, refresh_async=True)
+        self.assertEqual(delay.call_count, 2)
@@ -1,17 +1,23 @@
 """ Objects and functions related to generating CSV reports """
 
+from collections import defaultdict, namedtuple
+from datetime import datetime
 from decimal import Decimal
+import pytz
 import unicodecsv
 
+from django.db.models import Count, Q, Sum
 from django.utils.translation import ugettext as _
 
-from courseware.courses import get_course_by_id
 from course_modes.models import CourseMode
 from shoppingcart.models import CertificateItem, OrderItem
 from student.models import CourseEnrollment
 from util.query import use_read_replica_if_available
 from xmodule.modulestore.django import modulestore
 
+# The id, university and display name (prefixed with the course number) of a course
+CourseSummary = namedtuple('CourseSummary', ['id', 'university', 'name'])
+
 
 class Report(object):
     """
@@ -78,7 +84,7 @@ class RefundReport(Report):
 
         query = query1 | query2
 
-        for item in query:
+        for item in query.iterator():
             yield [
                 item.order_id,
                 item.user.profile.name,
@@ -115,7 +121,7 @@ class ItemizedPurchaseReport(Report):
                 fulfilled_time__lt=self.end_date,
             ).order_by("fulfilled_time"))
 
-        for item in query:
+        for item in query.iterator():
             yield [
                 item.fulfilled_time,
                 item.order_id,  # pylint: disable=no-member
@@ -152,16 +158,26 @@ class CertificateStatusReport(Report):
     gross revenue, gross revenue over the minimum, and total dollars refunded.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
+        summaries = course_summaries_between(self.start_word, self.end_word)
+        if not summaries:
+            return
+        enrollment_counts = enrollment_counts_by_course()
+        min_prices = verified_min_prices_by_course('usd')
+        certificates = verified_certificate_totals_by_course()
+
+        for summary in summaries:
             # If the first letter of the university is between start_word and end_word, then we include
             # it in the report.  These comparisons are unicode-safe.
-            cur_course = get_course_by_id(course_id)
-            university = cur_course.org
-            course = cur_course.number + " " + cur_course.display_name_with_default  # TODO add term (i.e. Fall 2013)?
-            counts = CourseEnrollment.enrollment_counts(course_id)
+            course_id = summary.id.to_deprecated_string()
+            university = summary.university
+            course = summary.name  # TODO add term (i.e. Fall 2013)?
+            counts = enrollment_counts[course_id]
             total_enrolled = counts['total']
             audit_enrolled = counts['audit']
             honor_enrolled = counts['honor']
+            purchased = certificates[course_id, 'purchased']
+            refunded = certificates[course_id, 'refunded']
+            min_price = min_prices.get(course_id, 0)
 
             if counts['verified'] == 0:
                 verified_enrolled = 0
@@ -169,17 +185,14 @@ class CertificateStatusReport(Report):
                 gross_rev_over_min = Decimal(0.00)
             else:
                 verified_enrolled = counts['verified']
-                gross_rev = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-                gross_rev_over_min = gross_rev - (CourseMode.min_course_price_for_verified_for_currency(course_id, 'usd') * verified_enrolled)
+                gross_rev = purchased.unit_cost
+                gross_rev_over_min = gross_rev - (min_price * verified_enrolled)
 
-            num_verified_over_the_minimum = CertificateItem.verified_certificates_contributing_more_than_minimum(course_id)
+            num_verified_over_the_minimum = purchased.count_over(min_price)
 
             # should I be worried about is_active here?
-            number_of_refunds = CertificateItem.verified_certificates_count(course_id, 'refunded')
-            if number_of_refunds == 0:
-                dollars_refunded = Decimal(0.00)
-            else:
-                dollars_refunded = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
+            number_of_refunds = refunded.count
+            dollars_refunded = refunded.unit_cost
 
             course_announce_date = ""
             course_reg_start_date = ""
@@ -234,15 +247,22 @@ class UniversityRevenueShareReport(Report):
     total payments collected, service fees, number of refunds, and total amount of refunds.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
-            cur_course = get_course_by_id(course_id)
-            university = cur_course.org
-            course = cur_course.number + " " + cur_course.display_name_with_default
-            total_payments_collected = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-            service_fees = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'service_fee')
-            num_refunds = CertificateItem.verified_certificates_count(course_id, "refunded")
-            amount_refunds = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
-            num_transactions = (num_refunds * 2) + CertificateItem.verified_certificates_count(course_id, "purchased")
+        summaries = course_summaries_between(self.start_word, self.end_word)
+        if not summaries:
+            return
+        certificates = verified_certificate_totals_by_course()
+
+        for summary in summaries:
+            course_id = summary.id.to_deprecated_string()
+            university = summary.university
+            course = summary.name
+            purchased = certificates[course_id, 'purchased']
+            refunded = certificates[course_id, 'refunded']
+            total_payments_collected = purchased.unit_cost
+            service_fees = purchased.service_fee
+            num_refunds = refunded.count
+            amount_refunds = refunded.unit_cost
+            num_transactions = (num_refunds * 2) + purchased.count
 
             yield [
                 university,
@@ -266,15 +286,99 @@ class UniversityRevenueShareReport(Report):
         ]
 
 
+def course_summaries_between(start_word, end_word):
+    """
+    Returns a list of the CourseSummary of all valid courses whose ids fall alphabetically between
+    start_word and end_word. These comparisons are unicode-safe.
+
+    The courses are only loaded once, by the modulestore's get_courses.
+    """
+    summaries = []
+    for course in modulestore().get_courses():
+        course_id = course.id.to_deprecated_string()
+        if start_word.lower() <= course_id.lower() <= end_word.lower():
+            summaries.append(CourseSummary(
+                course.id,
+                course.org,
+                course.number + " " + course.display_name_with_default,
+            ))
+    return summaries
+
+
 def course_ids_between(start_word, end_word):
     """
     Returns a list of all valid course_ids that fall alphabetically between start_word and end_word.
     These comparisons are unicode-safe.
     """
+    return [summary.id for summary in course_summaries_between(start_word, end_word)]
 
-    valid_courses = []
-    for course in modulestore().get_courses():
-        course_id = course.id.to_deprecated_string()
-        if start_word.lower() <= course_id.lower() <= end_word.lower():
-            valid_courses.append(course.id)
-    return valid_courses
+
+# The aggregates below are computed for all the courses at once, each with one GROUP BY
+# query, and are keyed by course id strings (values() doesn't convert them to CourseKeys).
+
+def enrollment_counts_by_course():
+    """
+    Returns a dictionary mapping course ids to the counts CourseEnrollment.enrollment_counts
+    would return for them.
+    """
+    query = use_read_replica_if_available(
+        CourseEnrollment.objects.filter(is_active=True).values('course_id', 'mode').order_by().annotate(Count('mode')))
+    counts = defaultdict(lambda: defaultdict(int))
+    for item in query:
+        course_counts = counts[item['course_id']]
+        course_counts[item['mode']] = item['mode__count']
+        course_counts['total'] += item['mode__count']
+    return counts
+
+
+def verified_min_prices_by_course(currency):
+    """
+    Returns a dictionary mapping course ids to the value
+    CourseMode.min_course_price_for_verified_for_currency would return for them, for the
+    courses which have a non-expired verified mode in `currency`.
+    """
+    query = use_read_replica_if_available(
+        CourseMode.objects.filter(
+            Q(expiration_datetime__isnull=True) | Q(expiration_datetime__gte=datetime.now(pytz.UTC)),
+            mode_slug='verified',
+            currency=currency,
+        ).values_list('course_id', 'min_price'))
+    return dict(query)
+
+
+class VerifiedCertificateTotals(object):
+    """
+    The number of verified certificates of a course with a given status, and the sums of their
+    unit costs and service fees.
+    """
+    def __init__(self):
+        self.count = 0
+        self.unit_cost = Decimal(0.00)
+        self.service_fee = Decimal(0.00)
+        self.counts_by_unit_cost = defaultdict(int)
+
+    def count_over(self, price):
+        """
+        Returns the number of these certificates whose unit cost is more than `price`.
+        """
+        return sum(count for unit_cost, count in self.counts_by_unit_cost.iteritems() if unit_cost > price)
+
+
+def verified_certificate_totals_by_course():
+    """
+    Returns a dictionary mapping (course id, status) pairs to the VerifiedCertificateTotals of the
+    verified certificates of that course with that status.
+    """
+    query = use_read_replica_if_available(
+        CertificateItem.objects.filter(
+            mode='verified',
+            status__in=['purchased', 'refunded'],
+        ).values('course_id', 'status', 'unit_cost').order_by().annotate(Count('id'), Sum('unit_cost'), Sum('service_fee')))
+    totals = defaultdict(VerifiedCertificateTotals)
+    for item in query:
+        course_totals = totals[item['course_id'], item['status']]
+        course_totals.count += item['id__count']
+        course_totals.unit_cost += item['unit_cost__sum']
+        course_totals.service_fee += item['service_fee__sum']
+        course_totals.counts_by_unit_cost[item['unit_cost']] += item['id__count']
+    return totals
@@ -177,6 +177,21 @@ class ReportTypeTests(ModuleStoreTestCase):
         csv = csv_file.getvalue()
         self.assertEqual(csv.replace('\r\n', '\n').strip(), self.CORRECT_UNI_REVENUE_SHARE_CSV.strip())
 
+    def test_course_reports_query_count(self):
+        """
+        The per-course figures are computed with a fixed number of queries, whatever the number of courses
+        """
+        CourseFactory.create(org='MITx', number='1000', display_name=u'Robot Super Course 2')
+        report = initialize_report("certificate_status", self.now - self.FIVE_MINS, self.now + self.FIVE_MINS, 'A', 'Z')
+        with self.assertNumQueries(3):
+            rows = list(report.rows())
+        self.assertEqual(len(rows), 2)
+
+        report = initialize_report("university_revenue_share", self.now - self.FIVE_MINS, self.now + self.FIVE_MINS, 'A', 'Z')
+        with self.assertNumQueries(1):
+            rows = list(report.rows())
+        self.assertEqual(len(rows), 2)
+
 
 @override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
 class ItemizedPurchaseReportTest(ModuleStoreTestCase):
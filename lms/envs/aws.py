@@ -117,6 +117,9 @@ STATIC_ROOT_BASE = ENV_TOKENS.get('STATIC_ROOT_BASE', None)
 if STATIC_ROOT_BASE:
     STATIC_ROOT = path(STATIC_ROOT_BASE)
 
+# MAKO_PRECOMPILED_ROOT is where the precompile_templates command puts the compiled templates
+MAKO_PRECOMPILED_ROOT = ENV_TOKENS.get('MAKO_PRECOMPILED_ROOT', MAKO_PRECOMPILED_ROOT)
+
 
 # STATIC_URL_BASE specifies the base url to use for static files
 STATIC_URL_BASE = ENV_TOKENS.get('STATIC_URL_BASE', None)
@@ -196,6 +199,10 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BE
 # We have to reset the value here, since we have changed the value of the queue name.
 BULK_EMAIL_ROUTING_KEY = HIGH_PRIORITY_QUEUE
 
+LTI_OUTCOMES_DELAY = ENV_TOKENS.get('LTI_OUTCOMES_DELAY', LTI_OUTCOMES_DELAY)
+LTI_OUTCOMES_RETRY_DELAY = ENV_TOKENS.get('LTI_OUTCOMES_RETRY_DELAY', LTI_OUTCOMES_RETRY_DELAY)
+LTI_OUTCOMES_MAX_RETRIES = ENV_TOKENS.get('LTI_OUTCOMES_MAX_RETRIES', LTI_OUTCOMES_MAX_RETRIES)
+
 # Theme overrides
 THEME_NAME = ENV_TOKENS.get('THEME_NAME', None)
 
@@ -234,6 +241,8 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", COMMENTS_SERVICE_POOL_SIZE)
+COMMENTS_SERVICE_CACHE_TIMEOUT = ENV_TOKENS.get("COMMENTS_SERVICE_CACHE_TIMEOUT", COMMENTS_SERVICE_CACHE_TIMEOUT)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -319,8 +328,8 @@ AWS_STORAGE_BUCKET_NAME = AUTH_TOKENS.get('AWS_STORAGE_BUCKET_NAME', 'edxuploads
 FILE_UPLOAD_STORAGE_BUCKET_NAME = ENV_TOKENS.get('FILE_UPLOAD_STORAGE_BUCKET_NAME', FILE_UPLOAD_STORAGE_BUCKET_NAME)
 FILE_UPLOAD_STORAGE_PREFIX = ENV_TOKENS.get('FILE_UPLOAD_STORAGE_PREFIX', FILE_UPLOAD_STORAGE_PREFIX)
 
-# If there is a database called 'read_replica', you can use the use_read_replica_if_available
-# function in util/query.py, which is useful for very large database reads
+# If there is a database called 'read_replica', reporting queries are sent to it
+# (see util/query.py), which is useful for very large database reads
 DATABASES = AUTH_TOKENS['DATABASES']
 
 XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
@@ -384,11 +393,31 @@ EVENT_TRACKING_BACKENDS.update(AUTH_TOKENS.get("EVENT_TRACKING_BACKENDS", {}))
 # Student identity verification settings
 VERIFY_STUDENT = AUTH_TOKENS.get("VERIFY_STUDENT", VERIFY_STUDENT)
 
+# Query budgets
+QUERY_BUDGETS = ENV_TOKENS.get('QUERY_BUDGETS', QUERY_BUDGETS)
+
 # Grades download
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
 
+# Certificate generation
+CERTIFICATE_GENERATION_STUDENTS_PER_TASK = ENV_TOKENS.get(
+    'CERTIFICATE_GENERATION_STUDENTS_PER_TASK', CERTIFICATE_GENERATION_STUDENTS_PER_TASK
+)
+CERTIFICATE_GENERATION_ROUTING_KEY = HIGH_MEM_QUEUE
+
+# Problem rescoring
+INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK', INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK
+)
+INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL', INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL
+)
+INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS', INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS
+)
+
 ##### ORA2 ######
 # Prefix for uploads of example-based assessment AI classifiers
 # This can be used to separate uploads for different environments
@@ -0,0 +1,69 @@
+"""
+Settings for running the modulestore, grading and capa benchmarks
+(`paver run_benchmarks`).
+
+They extend the test settings with an in-memory SQLite database, whose tables
+the benchmark command creates, and with old Mongo and split modulestores in a
+throwaway database of the local mongod.
+"""
+
+# We intentionally define lots of variables that aren't used, and
+# want to import all variables from base settings files
+# pylint: disable=W0401, W0614
+
+from .test import *
+from uuid import uuid4
+
+# Don't record every SQL query made, which would skew the timings.
+DEBUG = False
+TEMPLATE_DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+BENCHMARK_DOC_STORE_CONFIG = {
+    'host': 'localhost',
+    'db': 'benchmark_xmodule_{}'.format(uuid4().hex[:8]),
+    'collection': 'modulestore',
+}
+
+BENCHMARK_MODULESTORE_OPTIONS = {
+    'default_class': 'xmodule.hidden_module.HiddenDescriptor',
+    'fs_root': TEST_ROOT / "data",
+    'render_template': 'edxmako.shortcuts.render_to_string',
+}
+
+MODULESTORE = {
+    'default': {
+        'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
+        'OPTIONS': {
+            'mappings': {},
+            'stores': [
+                {
+                    'NAME': 'draft',
+                    'ENGINE': 'xmodule.modulestore.mongo.draft.DraftModuleStore',
+                    'DOC_STORE_CONFIG': BENCHMARK_DOC_STORE_CONFIG,
+                    'OPTIONS': BENCHMARK_MODULESTORE_OPTIONS,
+                },
+                {
+                    'NAME': 'split',
+                    'ENGINE': 'xmodule.modulestore.split_mongo.split_draft.DraftVersioningModuleStore',
+                    'DOC_STORE_CONFIG': BENCHMARK_DOC_STORE_CONFIG,
+                    'OPTIONS': BENCHMARK_MODULESTORE_OPTIONS,
+                },
+            ]
+        }
+    }
+}
+
+CONTENTSTORE = {
+    'ENGINE': 'xmodule.contentstore.mongo.MongoContentStore',
+    'DOC_STORE_CONFIG': {
+        'host': 'localhost',
+        'db': BENCHMARK_DOC_STORE_CONFIG['db'],
+    }
+}
@@ -170,6 +170,9 @@ FEATURES = {
     # Enable instructor dash to submit background tasks
     'ENABLE_INSTRUCTOR_BACKGROUND_TASKS': True,
 
+    # Write the scores LTI tools post in background tasks (see courseware.lti_outcomes)
+    'ENABLE_LTI_OUTCOME_QUEUE': True,
+
     # Enable instructor to assign individual due dates
     'INDIVIDUAL_DUE_DATES': False,
 
@@ -256,6 +259,10 @@ FEATURES = {
     # Turn off Advanced Security by default
     'ADVANCED_SECURITY': False,
 
+    # Count the SQL queries, Mongo operations and memcached calls of each request
+    # and celery task, and log those that go over their QUERY_BUDGETS
+    'ENABLE_QUERY_BUDGETS': False,
+
     # Show a "Download your certificate" on the Progress page if the lowest
     # nonzero grade cutoff is met
     'SHOW_PROGRESS_SUCCESS_BUTTON': False,
@@ -320,6 +327,9 @@ OPENID_PROVIDER_TRUSTED_ROOTS = ['cs50.net', '*.cs50.net']
 # templates
 from tempdir import mkdtemp_clean
 MAKO_MODULE_DIR = mkdtemp_clean('mako')
+# Where the precompile_templates command puts the compiled templates, so that they
+# don't have to be compiled again by each new worker. Unused when None.
+MAKO_PRECOMPILED_ROOT = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [PROJECT_ROOT / 'templates',
                           COMMON_ROOT / 'templates',
@@ -811,6 +821,8 @@ TEMPLATE_LOADERS = (
 
 MIDDLEWARE_CLASSES = (
     'request_cache.middleware.RequestCache',
+    # Goes near the top, to count the queries made by the other middleware too
+    'monitoring.middleware.QueryBudgetMiddleware',
     'microsite_configuration.middleware.MicrositeMiddleware',
     'django_comment_client.middleware.AjaxExceptionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -1186,6 +1198,18 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+################################ LTI ##########################################
+
+# Delay in seconds between the first score an LTI tool posts to a block and
+# the task writing it. The scores posted in the meantime are written by the
+# same task, and only the last score of each user is.
+LTI_OUTCOMES_DELAY = 5
+
+# Delay in seconds before the task writing LTI scores is retried, when some
+# could not be written, and the maximum number of retries.
+LTI_OUTCOMES_RETRY_DELAY = 60
+LTI_OUTCOMES_MAX_RETRIES = 5
+
 
 ############################## Video ##########################################
 
@@ -1381,6 +1405,36 @@ REGISTRATION_EXTRA_FIELDS = {
 CERT_NAME_SHORT = "Certificate"
 CERT_NAME_LONG = "Certificate of Achievement"
 
+###################### Certificate Generation ######################
+# Number of students each certificate generation subtask grades and certifies.
+CERTIFICATE_GENERATION_STUDENTS_PER_TASK = 100
+
+# Certificate generation grades students, so it belongs with grade downloads.
+CERTIFICATE_GENERATION_ROUTING_KEY = HIGH_MEM_QUEUE
+
+###################### Problem Rescoring ######################
+# Number of StudentModules each rescoring subtask rescores.  Rescoring a
+# problem with no more submissions than this is done in the main task.
+INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK = 500
+
+# Instructor tasks that update problem state report their progress to the
+# result backend once every INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL modules,
+# or after INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS, whichever comes first.
+INSTRUCTOR_TASK_PROGRESS_UPDATE_INTERVAL = 100
+INSTRUCTOR_TASK_PROGRESS_UPDATE_SECONDS = 5
+
+###################### Query budgets ######################
+# Maximum number of SQL queries, Mongo operations and memcached calls per
+# request or celery task, keyed by view or task name, such as
+# {'courseware.views.progress': {'sql': 50, 'mongo': 100, 'memcache': 200}}.
+# Only checked when FEATURES['ENABLE_QUERY_BUDGETS'] is set.
+QUERY_BUDGETS = {}
+
+###################### Read replica ######################
+# Send the reads of reporting code (instructor analytics, grade reports, ...)
+# to the database called 'read_replica', when DATABASES has one.
+DATABASE_ROUTERS = ['util.query.ReadReplicaRouter']
+
 ###################### Grade Downloads ######################
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
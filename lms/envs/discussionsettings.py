@@ -3,3 +3,12 @@
 # pylint: disable=W0614
 
 DISCUSSION_ALLOWED_UPLOAD_FILE_TYPES = ('.jpg', '.jpeg', '.gif', '.bmp', '.png', '.tiff')
+
+# Size of the keep-alive connection pool each process holds open to the
+# comments service.
+COMMENTS_SERVICE_POOL_SIZE = 10
+
+# Seconds to cache idempotent comments service reads (user metadata and thread
+# lists). Writes made through the comment client invalidate the affected
+# entries; 0 disables the cache.
+COMMENTS_SERVICE_CACHE_TIMEOUT = 10
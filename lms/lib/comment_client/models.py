@@ -1,6 +1,9 @@
 import logging
 
-from .utils import extract, perform_request, CommentClientRequestError
+from .utils import (
+    extract, perform_request, invalidate_cache, CommentClientRequestError,
+    course_cache_namespace, user_cache_namespace
+)
 
 
 log = logging.getLogger(__name__)
@@ -94,6 +97,24 @@ class Model(object):
         tags.append(u'model_class:{}'.format(self.__class__.__name__))
         return tags
 
+    @property
+    def _cache_namespaces(self):
+        """
+        Returns the response cache namespaces that a write to this model can
+        make stale: the threads of its course and the state of its author.
+        """
+        namespaces = []
+        if self.attributes.get('course_id'):
+            namespaces.append(course_cache_namespace(self.attributes['course_id']))
+        if self.attributes.get('user_id'):
+            namespaces.append(user_cache_namespace(self.attributes['user_id']))
+        return namespaces
+
+    def _invalidate_cache(self):
+        namespaces = self._cache_namespaces
+        if namespaces:
+            invalidate_cache(*namespaces)
+
     @classmethod
     def find(cls, id):
         return cls(id=id)
@@ -146,6 +167,7 @@ class Model(object):
             )
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cache()
         self.after_save(self)
 
     def delete(self):
@@ -153,6 +175,7 @@ class Model(object):
         response = perform_request('delete', url, metric_tags=self._metric_tags, metric_action='model.delete')
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cache()
 
     @classmethod
     def url_with_id(cls, params={}):
@@ -0,0 +1,106 @@
+"""
+Tests for the comments service request helpers.
+"""
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import translation
+from mock import Mock, patch
+
+from lms.lib.comment_client import utils
+from lms.lib.comment_client.user import User
+
+
+def _mock_response(data):
+    return Mock(status_code=200, text=json.dumps(data), json=Mock(return_value=data))
+
+
+class SessionTestCase(TestCase):
+    """Tests for the pooled comments service session"""
+
+    def test_session_is_reused(self):
+        self.assertIs(utils.get_session(), utils.get_session())
+
+    @patch('lms.lib.comment_client.utils.os.getpid')
+    def test_new_session_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        parent_session = utils.get_session()
+        mock_getpid.return_value = 2
+        self.assertIsNot(parent_session, utils.get_session())
+
+
+class RunConcurrentlyTestCase(TestCase):
+    """Tests for run_concurrently"""
+
+    def test_results_in_order(self):
+        self.assertEqual(
+            utils.run_concurrently(lambda: 1, lambda: 2, lambda: 3),
+            [1, 2, 3]
+        )
+
+    def test_no_callables(self):
+        self.assertEqual(utils.run_concurrently(), [])
+
+    def test_first_error_is_raised(self):
+        def fail(exc):
+            def _fail():
+                raise exc
+            return _fail
+
+        with self.assertRaises(ValueError):
+            utils.run_concurrently(lambda: 1, fail(ValueError()), fail(KeyError()))
+
+    def test_language_is_propagated(self):
+        with translation.override('eo'):
+            languages = utils.run_concurrently(translation.get_language, translation.get_language)
+        self.assertEqual(languages, ['eo', 'eo'])
+
+
+@override_settings(COMMENTS_SERVICE_CACHE_TIMEOUT=60)
+@patch('lms.lib.comment_client.utils.requests.Session.request')
+class ResponseCacheTestCase(TestCase):
+    """Tests for caching idempotent comments service requests"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, namespaces=None):
+        return utils.perform_request('get', 'http://localhost/dummy', {'a': 1}, cache_namespaces=namespaces)
+
+    def test_uncached_without_namespaces(self, mock_request):
+        mock_request.return_value = _mock_response({'value': 1})
+        self._get()
+        self._get()
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_cached(self, mock_request):
+        mock_request.return_value = _mock_response({'value': 1})
+        self.assertEqual(self._get(['ns']), {'value': 1})
+        mock_request.return_value = _mock_response({'value': 2})
+        self.assertEqual(self._get(['ns']), {'value': 1})
+        self.assertEqual(mock_request.call_count, 1)
+
+    @override_settings(COMMENTS_SERVICE_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self, mock_request):
+        mock_request.return_value = _mock_response({'value': 1})
+        self._get(['ns'])
+        self._get(['ns'])
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_invalidate(self, mock_request):
+        mock_request.return_value = _mock_response({'value': 1})
+        self._get(['ns', 'other'])
+        utils.invalidate_cache('other')
+        mock_request.return_value = _mock_response({'value': 2})
+        self.assertEqual(self._get(['ns', 'other']), {'value': 2})
+
+    def test_user_write_invalidates_user(self, mock_request):
+        mock_request.return_value = _mock_response({'id': '1', 'default_sort_key': 'date'})
+        self.assertEqual(User(id='1').to_dict()['default_sort_key'], 'date')
+
+        mock_request.return_value = _mock_response({'id': '1', 'default_sort_key': 'votes'})
+        user = User(id='1', default_sort_key='votes')
+        user.save()
+        self.assertEqual(User(id='1').to_dict()['default_sort_key'], 'votes')
@@ -2,6 +2,7 @@ import logging
 
 from eventtracking import tracker
 from .utils import merge_dict, strip_blank, strip_none, extract, perform_request
+from .utils import course_cache_namespace, user_cache_namespace, invalidate_cache
 from .utils import CommentClientRequestError
 import models
 import settings
@@ -50,13 +51,19 @@ class Thread(models.Model):
             url = cls.url(action='get_all', params=extract(params, 'commentable_id'))
             if params.get('commentable_id'):
                 del params['commentable_id']
+        # Listings carry per-user read state, so they go stale with writes by
+        # the requesting user as well as with any write to the course.
+        cache_namespaces = [course_cache_namespace(query_params['course_id'])]
+        if params.get('user_id'):
+            cache_namespaces.append(user_cache_namespace(params['user_id']))
         response = perform_request(
             'get',
             url,
             params,
             metric_tags=[u'course_id:{}'.format(query_params['course_id'])],
             metric_action='thread.search',
-            paged_results=True
+            paged_results=True,
+            cache_namespaces=cache_namespaces
         )
         if query_params.get('text'):
             search_query = query_params['text']
@@ -129,6 +136,9 @@ class Thread(models.Model):
             metric_tags=self._metric_tags
         )
         self._update_from_response(response)
+        if request_params.get('user_id') and request_params['mark_as_read']:
+            # Reading the thread changes its unread state in the user's listings.
+            invalidate_cache(user_cache_namespace(request_params['user_id']))
 
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
@@ -146,6 +156,7 @@ class Thread(models.Model):
             metric_tags=self._metric_tags
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -167,6 +178,7 @@ class Thread(models.Model):
             metric_action='thread.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
     def pin(self, user, thread_id):
         url = _url_for_pin_thread(thread_id)
@@ -179,6 +191,7 @@ class Thread(models.Model):
             metric_action='thread.pin'
         )
         self._update_from_response(response)
+        self._invalidate_cache()
 
     def un_pin(self, user, thread_id):
         url = _url_for_un_pin_thread(thread_id)
@@ -191,6 +204,7 @@ class Thread(models.Model):
             metric_action='thread.unpin'
         )
         self._update_from_response(response)
+        self._invalidate_cache()
 
 
 def _url_for_flag_abuse_thread(thread_id):
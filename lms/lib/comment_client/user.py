@@ -1,4 +1,4 @@
-from .utils import merge_dict, perform_request, CommentClientRequestError
+from .utils import merge_dict, perform_request, CommentClientRequestError, user_cache_namespace
 
 import models
 import settings
@@ -28,6 +28,10 @@ class User(models.Model):
                    external_id=str(user.id),
                    username=user.username)
 
+    @property
+    def _cache_namespaces(self):
+        return [user_cache_namespace(self.id)] if self.id else []
+
     def follow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
         response = perform_request(
@@ -37,6 +41,7 @@ class User(models.Model):
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._invalidate_cache()
 
     def unfollow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -47,6 +52,7 @@ class User(models.Model):
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._invalidate_cache()
 
     def vote(self, voteable, value):
         if voteable.type == 'thread':
@@ -64,6 +70,8 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
+        self._invalidate_cache()
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -81,6 +89,8 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
+        self._invalidate_cache()
 
     def active_threads(self, query_params={}):
         if not self.course_id:
@@ -127,6 +137,7 @@ class User(models.Model):
                 retrieve_params,
                 metric_action='model.retrieve',
                 metric_tags=self._metric_tags,
+                cache_namespaces=self._cache_namespaces,
             )
         except CommentClientRequestError as e:
             if e.status_code == 404:
@@ -1,14 +1,29 @@
 from contextlib import contextmanager
 from dogapi import dog_stats_api
+import hashlib
+import json
 import logging
+import os
+import sys
+import threading
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# Generation keys outlive the cached responses they version by a wide margin;
+# if one does expire, a fresh generation simply orphans the old entries.
+CACHE_GENERATION_TIMEOUT = 60 * 60 * 24
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -50,9 +65,143 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def get_session():
+    """
+    Return the keep-alive ``requests.Session`` shared by this process.
+
+    The session pools its connections to the comments service, so consecutive
+    requests (and concurrent ones issued through `run_concurrently`) reuse
+    open sockets instead of paying for a new TCP handshake each time. A forked
+    worker builds its own session rather than sharing sockets with its parent.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            pool_size = getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 10)
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def run_concurrently(*funcs):
+    """
+    Call each of the zero-argument callables `funcs` and return a list of their
+    results, in order.
+
+    The first callable runs on the calling thread and the others each get a
+    thread of their own, so independent comments service requests overlap and
+    the total latency approaches that of the slowest one. Anything that uses
+    the database or other thread-bound state must go in the first callable.
+    The active language is carried over to the other threads so that
+    responses are localized consistently.
+
+    If any callable raises, the first exception (in argument order) is
+    re-raised once all of them have finished.
+    """
+    language = get_language()
+    results = [None] * len(funcs)
+    errors = [None] * len(funcs)
+
+    def _run(index):
+        try:
+            results[index] = funcs[index]()
+        except Exception:  # pylint: disable=broad-except
+            errors[index] = sys.exc_info()
+
+    def _run_in_thread(index):
+        if language:
+            translation.activate(language)
+        try:
+            _run(index)
+        finally:
+            translation.deactivate()
+
+    threads = [threading.Thread(target=_run_in_thread, args=(index,)) for index in range(1, len(funcs))]
+    for thread in threads:
+        thread.start()
+    if funcs:
+        _run(0)
+    for thread in threads:
+        thread.join()
+
+    for exc_info in errors:
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+    return results
+
+
+def _generation_key(namespace):
+    return u'comment_client.generation.{}'.format(namespace)
+
+
+def _cache_generations(namespaces):
+    """
+    Return the current generation token for each of `namespaces`, creating
+    tokens for namespaces that don't have one yet.
+    """
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid4().hex, CACHE_GENERATION_TIMEOUT)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate_cache(*namespaces):
+    """
+    Drop every cached response that was stored under any of `namespaces`.
+
+    Rather than tracking individual keys, each namespace carries a generation
+    token that is folded into the cache keys of its responses; replacing the
+    token makes all of them unreachable at once.
+    """
+    cache.set_many(
+        {_generation_key(namespace): uuid4().hex for namespace in namespaces},
+        CACHE_GENERATION_TIMEOUT
+    )
+
+
+def _response_cache_key(url, params, raw, namespaces):
+    key_data = json.dumps(
+        [url, sorted(params.items()), raw, get_language(), _cache_generations(namespaces)],
+        default=unicode
+    )
+    return u'comment_client.response.{}'.format(hashlib.md5(key_data).hexdigest())
+
+
+def user_cache_namespace(user_id):
+    """
+    Cache namespace for responses that depend on the state of one forum user.
+    """
+    return u'user:{}'.format(user_id)
+
+
+def course_cache_namespace(course_id):
+    """
+    Cache namespace for responses that depend on the threads of one course.
+    """
+    if hasattr(course_id, 'to_deprecated_string'):
+        course_id = course_id.to_deprecated_string()
+    return u'course:{}'.format(course_id)
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+                    metric_action=None, metric_tags=None, paged_results=False,
+                    cache_namespaces=None):
+    """
+    Issue a request to the comments service and return the decoded response.
 
+    Passing `cache_namespaces` for an idempotent GET serves it from the cache
+    for COMMENTS_SERVICE_CACHE_TIMEOUT seconds, until any of those namespaces
+    is invalidated by a write (see `invalidate_cache`).
+    """
     if metric_tags is None:
         metric_tags = []
 
@@ -62,6 +211,16 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    cache_key = None
+    cache_timeout = getattr(settings, "COMMENTS_SERVICE_CACHE_TIMEOUT", 0)
+    if cache_namespaces and cache_timeout and method == 'get':
+        cache_key = _response_cache_key(url, data_or_params, raw, cache_namespaces)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            dog_stats_api.increment('comment_client.request.cache_hit', tags=metric_tags)
+            return cached
+
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -76,7 +235,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = get_session().request(
             method,
             url,
             data=data,
@@ -102,7 +261,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         raise CommentClient500Error(response.text)
     else:
         if raw:
-            return response.text
+            data = response.text
         else:
             try:
                 data = response.json()
@@ -129,7 +288,9 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
-            return data
+        if cache_key is not None:
+            cache.set(cache_key, data, cache_timeout)
+        return data
 
 
 class CommentClientError(Exception):
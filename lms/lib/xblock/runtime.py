@@ -6,10 +6,13 @@ import re
 
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from courseware.lti_outcomes import LTIOutcomeQueue
+from courseware.model_data import UserStateSummaryCounters
+from request_cache.middleware import RequestCache
 from user_api import user_service
 from xmodule.modulestore.django import modulestore
 from xmodule.x_module import ModuleSystem
-from xmodule.partitions.partitions_service import PartitionService
+from xmodule.partitions.partitions_service import PartitionMap, PartitionService
 
 
 def _quote_slashes(match):
@@ -133,8 +136,33 @@ class LmsPartitionService(PartitionService):
     """
     @property
     def course_partitions(self):
-        course = modulestore().get_course(self._course_id)
-        return course.user_partitions
+        return self.partition_map.user_partitions
+
+    @property
+    def partition_map(self):
+        """
+        Return the PartitionMap of the course, compiled once per request for all of
+        the modules rendered, rather than read from the modulestore by each of them.
+
+        Outside of requests (e.g. in grading tasks), the request cache is never
+        cleared, so the map is only kept by this service, and partitions added to
+        the course later are seen.
+        """
+        if self._partition_map is None:
+            if RequestCache.in_request():
+                maps = RequestCache.get_request_cache().data.setdefault('course_partition_maps', {})
+                if self._course_id not in maps:
+                    maps[self._course_id] = self._compile_partition_map()
+                self._partition_map = maps[self._course_id]
+            else:
+                self._partition_map = self._compile_partition_map()
+        return self._partition_map
+
+    def _compile_partition_map(self):
+        """
+        Return a PartitionMap of the partitions of the course, read from the modulestore.
+        """
+        return PartitionMap(modulestore().get_course(self._course_id).user_partitions)
 
 
 class UserTagsService(object):
@@ -147,11 +175,13 @@ class UserTagsService(object):
 
     def __init__(self, runtime):
         self.runtime = runtime
+        self._current_user = None
 
     def _get_current_user(self):
         """Returns the real, not anonymized, current user."""
-        real_user = self.runtime.get_real_user(self.runtime.anonymous_student_id)
-        return real_user
+        if self._current_user is None:
+            self._current_user = self.runtime.get_real_user(self.runtime.anonymous_student_id)
+        return self._current_user
 
     def get_tag(self, scope, key):
         """
@@ -193,4 +223,7 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
             course_id=kwargs.get('course_id', None),
             track_function=kwargs.get('track_function', None),
         )
+        services['user_state_summary_counters'] = UserStateSummaryCounters()
+        if settings.FEATURES.get('ENABLE_LTI_OUTCOME_QUEUE'):
+            services['lti_outcomes'] = LTIOutcomeQueue()
         super(LmsModuleSystem, self).__init__(**kwargs)
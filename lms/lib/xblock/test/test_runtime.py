@@ -5,11 +5,13 @@ Tests of the LMS XBlock Runtime and associated utilities
 from django.contrib.auth.models import User
 from django.conf import settings
 from ddt import ddt, data
-from mock import Mock
+from mock import Mock, patch
 from unittest import TestCase
 from urlparse import urlparse
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
-from lms.lib.xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem
+from lms.lib.xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem, LmsPartitionService
+from request_cache.middleware import RequestCache
+from xmodule.partitions.partitions import Group, UserPartition
 
 TEST_STRINGS = [
     '',
@@ -151,3 +153,43 @@ class TestUserServiceAPI(TestCase):
         # Try to get tag in wrong scope
         with self.assertRaises(ValueError):
             self.runtime.service(self.mock_block, 'user_tags').get_tag('fake_scope', self.key)
+
+
+@patch('lms.lib.xblock.runtime.modulestore')
+class TestLmsPartitionService(TestCase):
+    """Test where LmsPartitionService keeps the partitions of the course"""
+
+    def setUp(self):
+        self.course_id = SlashSeparatedCourseKey("org", "course", "run")
+        self.partition = UserPartition(0, 'Test Partition', 'for testing', [Group(0, 'Group 0')])
+        self.changed_partition = UserPartition(
+            0, 'Test Partition', 'for testing', [Group(0, 'Group 0'), Group(1, 'Group 1')]
+        )
+        RequestCache().clear_request_cache()
+
+    def create_service(self):
+        """Return a new service, as created for each module"""
+        return LmsPartitionService(user_tags_service=Mock(), course_id=self.course_id, track_function=Mock())
+
+    def test_outside_request(self, mock_modulestore):
+        mock_modulestore.return_value.get_course.return_value = Mock(user_partitions=[self.partition])
+        self.assertFalse(self.create_service().partition_map.has_group(0, 1))
+
+        # e.g. a group added in Studio while a grading task runs
+        mock_modulestore.return_value.get_course.return_value = Mock(user_partitions=[self.changed_partition])
+        self.assertTrue(self.create_service().partition_map.has_group(0, 1))
+
+    def test_in_request(self, mock_modulestore):
+        request_cache = RequestCache()
+        request_cache.process_request(None)
+        try:
+            mock_modulestore.return_value.get_course.return_value = Mock(user_partitions=[self.partition])
+            self.assertFalse(self.create_service().partition_map.has_group(0, 1))
+
+            # the map is compiled once per request
+            mock_modulestore.return_value.get_course.return_value = Mock(user_partitions=[self.changed_partition])
+            self.assertFalse(self.create_service().partition_map.has_group(0, 1))
+        finally:
+            request_cache.process_response(None, None)
+
+        self.assertTrue(self.create_service().partition_map.has_group(0, 1))
@@ -31,6 +31,9 @@ def run():
     if settings.FEATURES.get('ENABLE_THIRD_PARTY_AUTH', False):
         enable_third_party_auth()
 
+    # Now that the theme and microsite templates are looked up too
+    edxmako.paths.use_precompiled_templates()
+
 
 def add_mimetypes():
     """
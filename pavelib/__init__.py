@@ -1,4 +1,4 @@
 """
 paver commands
 """
-from . import assets, servers, docs, prereqs, quality, tests, js_test, i18n, bok_choy, acceptance_test
+from . import assets, servers, docs, prereqs, quality, tests, js_test, i18n, bok_choy, acceptance_test, benchmarks
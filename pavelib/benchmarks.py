@@ -0,0 +1,42 @@
+"""
+Run the modulestore, grading and capa benchmarks.
+"""
+from __future__ import print_function
+from paver.easy import sh, task, cmdopts, needs
+from .utils.cmd import django_cmd
+from .utils.envs import Env
+
+BENCHMARK_OPTIONS = ('chapters', 'sequentials', 'verticals', 'problems', 'students', 'repeat', 'stores')
+
+
+@task
+@needs('pavelib.prereqs.install_python_prereqs')
+@cmdopts([
+    ("chapters=", None, "Number of chapters in the course"),
+    ("sequentials=", None, "Number of sequentials in each chapter"),
+    ("verticals=", None, "Number of verticals in each sequential"),
+    ("problems=", None, "Number of problems in each vertical"),
+    ("students=", None, "Number of students to grade"),
+    ("repeat=", None, "Number of runs of the whole-course benchmarks"),
+    ("stores=", None, "Comma-separated modulestores to benchmark (mongo,split,xml)"),
+    ("output=", "o", "JSON file to write the results to"),
+])
+def run_benchmarks(options):
+    """
+    Run the modulestore, grading and capa benchmarks against synthetic
+    courses, and write their results as JSON, by default to
+    reports/benchmarks/<commit>.json. Requires a local mongod.
+    """
+    output = getattr(options, 'output', None)
+    if not output:
+        report_dir = (Env.REPORT_DIR / 'benchmarks').makedirs_p()
+        commit = sh('git rev-parse --short HEAD', capture=True).strip()
+        output = report_dir / '{}.json'.format(commit)
+
+    args = [
+        '--{}={}'.format(name, getattr(options, name))
+        for name in BENCHMARK_OPTIONS
+        if getattr(options, name, None)
+    ]
+    sh(django_cmd('lms', 'benchmark', 'benchmark', '--output={}'.format(output), *args))
+    print("Benchmark results written to {}".format(output))